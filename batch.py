@@ -0,0 +1,105 @@
+"""Batch translation helpers for `main.py --batch`.
+
+A batch is either a TOML manifest or a glob of web roots:
+
+  # batch.toml
+  workers = 8                 # optional, defaults to --jobs / CPU count
+  out_root = "out"            # optional, default output root for projects without `out`
+
+  [[project]]
+  name = "sku-a"              # optional, defaults to the web root's directory name
+  web = "skus/a/web"          # relative paths are resolved against the manifest
+  out = "out/sku-a"           # optional, defaults to <out_root>/<name>
+
+  python main.py --batch batch.toml
+  python main.py --batch "skus/*/web" --batch-out out --jobs 16
+"""
+from __future__ import annotations
+
+import glob
+from pathlib import Path
+
+try:
+  import tomllib
+except ImportError:  # Python < 3.11
+  try:
+    import tomli as tomllib
+  except ImportError:
+    tomllib = None
+
+
+class BatchProject:
+  def __init__(self, name: str, web_dir: Path, out_dir: Path):
+    self.name = name
+    self.web_dir = web_dir
+    self.out_dir = out_dir
+
+
+def project_name(web_dir: Path) -> str:
+  """`skus/a/web` -> `a`; any other directory keeps its own name."""
+  return web_dir.parent.name if web_dir.name == "web" and web_dir.parent.name else web_dir.name
+
+
+def load_batch(spec: str, out_root: Path) -> tuple[list[BatchProject], int | None]:
+  """Resolve a manifest path or glob into projects, plus the manifest's worker count if any."""
+  path = Path(spec)
+  if path.suffix == ".toml" and path.is_file():
+    return _load_manifest(path, out_root)
+  roots = sorted(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_dir())
+  return [BatchProject(project_name(r), r.resolve(), (out_root / project_name(r)).resolve()) for r in roots], None
+
+
+def _load_manifest(path: Path, out_root: Path) -> tuple[list[BatchProject], int | None]:
+  if tomllib is None:
+    raise RuntimeError("Reading TOML manifests needs Python 3.11+ or the 'tomli' package")
+  with path.open("rb") as fh:
+    data = tomllib.load(fh)
+  base = path.resolve().parent
+  root = base / data["out_root"] if "out_root" in data else out_root
+  projects = []
+  for entry in data.get("project", []):
+    if "web" not in entry:
+      raise ValueError(f"{path}: every [[project]] needs a 'web' key")
+    web_dir = (base / entry["web"]).resolve()
+    name = entry.get("name") or project_name(web_dir)
+    out_dir = (base / entry["out"]).resolve() if "out" in entry else (root / name).resolve()
+    projects.append(BatchProject(name, web_dir, out_dir))
+  workers = data.get("workers")
+  return projects, int(workers) if workers else None
+
+
+def check_unique_outputs(projects: list[BatchProject]) -> None:
+  seen: dict[Path, str] = {}
+  for project in projects:
+    if project.out_dir in seen:
+      raise ValueError(f"Projects '{seen[project.out_dir]}' and '{project.name}' share output {project.out_dir}")
+    seen[project.out_dir] = project.name
+
+
+def print_summary(results: list[dict], wall_s: float, workers: int) -> None:
+  """Per-project timings followed by aggregate totals and failures."""
+  stages = ["html", "js", "generate_c", "images", "fonts", "write", "snapshot"]
+  header = f"{'project':<24} {'status':<6} {'total':>9} " + " ".join(f"{s:>10}" for s in stages)
+  print(header)
+  print("-" * len(header))
+  for res in sorted(results, key=lambda r: r["name"]):
+    cols = " ".join(f"{res['timings'].get(s, 0.0):>8.1f}ms" for s in stages)
+    status = "ok" if res["ok"] else "FAIL"
+    print(f"{res['name'][:24]:<24} {status:<6} {res['total_ms']:>7.1f}ms {cols}")
+  failures = [r for r in results if not r["ok"]]
+  busy_s = sum(r["total_ms"] for r in results) / 1000.0
+  written = sum(r.get("written", 0) for r in results)
+  print("-" * len(header))
+  print(
+    f"[batch] {len(results)} project(s), {len(failures)} failed, {written} file(s) written; "
+    f"wall {wall_s:.2f}s, busy {busy_s:.2f}s on {workers} worker(s), "
+    f"parallel speedup {busy_s / wall_s if wall_s > 0 else 0.0:.1f}x"
+  )
+  totals: dict[str, int] = {}
+  for res in results:
+    for key, value in res.get("stats", {}).items():
+      totals[key] = totals.get(key, 0) + value
+  if totals:
+    print("[batch] generator totals: " + ", ".join(f"{k}={v}" for k, v in sorted(totals.items())))
+  for res in failures:
+    print(f"[batch] FAILED {res['name']}: {res['error']}")
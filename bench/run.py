@@ -0,0 +1,160 @@
+"""Translator benchmarks: time and memory per stage on synthetic pages, with baseline gating.
+
+  python bench/run.py                                  # run the preset scenarios, print a table
+  python bench/run.py --out results.json               # also write the results as JSON
+  python bench/run.py --out bench/baseline.json        # record a baseline
+  python bench/run.py --baseline bench/baseline.json   # fail (exit 1) on regressions
+  python bench/run.py --nodes 5000 --buttons 500 --layout absolute --codegen table
+
+Runs fully offline: only the Python translator (util.py) is exercised, no LVGL checkout needed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synth import PageSpec, make_html, make_js  # noqa: E402
+from util import GenOptions, SimpleParser, iter_c, parse_messages_text  # noqa: E402
+
+STAGES = ("html", "js", "generate_c")
+PRESETS = {
+  "flow-small": (PageSpec(nodes=20, buttons=20, layout="flow"), "unrolled"),
+  "flow-large": (PageSpec(nodes=2000, buttons=2000, layout="flow", messages=200), "unrolled"),
+  "abs-medium": (PageSpec(nodes=1000, buttons=500, layout="absolute"), "unrolled"),
+  "abs-large": (PageSpec(nodes=10000, buttons=5000, layout="absolute", style_density=0.8), "unrolled"),
+  "abs-large-table": (PageSpec(nodes=10000, buttons=5000, layout="absolute", style_density=0.8), "table"),
+}
+
+
+def _stages(html: str, js: str, options: GenOptions):
+  """Yield (stage, callable) pairs; each callable returns its result for the next stage."""
+  state: dict = {}
+
+  def parse_html():
+    parser = SimpleParser()
+    parser.feed(html)
+    state["nodes"] = parser.nodes
+    return len(parser.nodes)
+
+  def parse_js():
+    state["messages"] = parse_messages_text(js)
+    return len(state["messages"])
+
+  def generate():
+    # Count bytes instead of keeping the text: measures the emitter, not a string buffer.
+    return sum(len(chunk.encode("utf-8")) for chunk in iter_c(state["nodes"], state["messages"], options))
+
+  return [("html", parse_html), ("js", parse_js), ("generate_c", generate)]
+
+
+def run_scenario(spec: PageSpec, codegen: str, repeat: int) -> dict:
+  html, js = make_html(spec), make_js(spec)
+  options = GenOptions(codegen=codegen)
+  times = {stage: float("inf") for stage in STAGES}
+  c_bytes = 0
+  for _ in range(repeat):
+    for stage, fn in _stages(html, js, options):
+      start = time.perf_counter()
+      value = fn()
+      times[stage] = min(times[stage], (time.perf_counter() - start) * 1000.0)
+      if stage == "generate_c":
+        c_bytes = value
+  peaks = {}
+  for stage, fn in _stages(html, js, options):
+    tracemalloc.start()
+    fn()
+    peaks[stage] = tracemalloc.get_traced_memory()[1] / 1024.0
+    tracemalloc.stop()
+  return {
+    "spec": dict(spec.as_dict(), codegen=codegen),
+    "input_bytes": len(html.encode("utf-8")) + len(js.encode("utf-8")),
+    "c_bytes": c_bytes,
+    "stages": {s: {"time_ms": round(times[s], 3), "peak_kb": round(peaks[s], 1)} for s in STAGES},
+  }
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> list[str]:
+  """Regressions of more than `threshold` (fraction) against the baseline; tiny timings are ignored."""
+  problems = []
+  for name, res in results.items():
+    base = baseline.get("results", {}).get(name)
+    if base is None:
+      continue
+    for stage in STAGES:
+      now, then = res["stages"][stage], base["stages"].get(stage)
+      if not then:
+        continue
+      if now["time_ms"] > then["time_ms"] * (1 + threshold) and now["time_ms"] - then["time_ms"] > min_ms:
+        problems.append(f"{name}/{stage}: time {then['time_ms']:.1f} -> {now['time_ms']:.1f} ms")
+      if now["peak_kb"] > then["peak_kb"] * (1 + threshold) and now["peak_kb"] - then["peak_kb"] > 64:
+        problems.append(f"{name}/{stage}: peak {then['peak_kb']:.0f} -> {now['peak_kb']:.0f} KiB")
+    if res["c_bytes"] > base["c_bytes"] * (1 + threshold):
+      problems.append(f"{name}: emitted C {base['c_bytes']} -> {res['c_bytes']} bytes")
+  return problems
+
+
+def print_table(results: dict) -> None:
+  header = f"{'scenario':<18} {'C bytes':>10} " + " ".join(f"{s + ' ms':>14} {s + ' KiB':>15}" for s in STAGES)
+  print(header)
+  print("-" * len(header))
+  for name, res in results.items():
+    cols = " ".join(f"{res['stages'][s]['time_ms']:>14.2f} {res['stages'][s]['peak_kb']:>15.1f}" for s in STAGES)
+    print(f"{name:<18} {res['c_bytes']:>10} {cols}")
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Benchmark SimpleParser / parse_messages / generate_c.")
+  parser.add_argument("--scenario", action="append", choices=sorted(PRESETS), help="Run only these presets (repeatable).")
+  parser.add_argument("--nodes", type=int, help="Custom scenario: number of text nodes.")
+  parser.add_argument("--buttons", type=int, default=0, help="Custom scenario: number of buttons.")
+  parser.add_argument("--layout", choices=("flow", "absolute"), default="flow")
+  parser.add_argument("--style-density", type=float, default=0.5, help="Fraction of nodes carrying color/font styles.")
+  parser.add_argument("--messages", type=int, default=3)
+  parser.add_argument("--codegen", choices=("unrolled", "table"), default="unrolled")
+  parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the minimum is reported.")
+  parser.add_argument("--out", type=Path, help="Write results JSON here.")
+  parser.add_argument("--baseline", type=Path, help="Baseline JSON; exit 1 if any stage regresses past --threshold.")
+  parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression as a fraction (default 0.25).")
+  parser.add_argument("--min-ms", type=float, default=2.0, help="Ignore time regressions smaller than this (default 2 ms).")
+  args = parser.parse_args()
+
+  if args.nodes is not None:
+    spec = PageSpec(args.nodes, args.buttons, args.layout, args.style_density, args.messages)
+    scenarios = {"custom": (spec, args.codegen)}
+  else:
+    names = args.scenario or list(PRESETS)
+    scenarios = {name: PRESETS[name] for name in names}
+
+  results = {}
+  for name, (spec, codegen) in scenarios.items():
+    print(f"[bench] {name} ...", flush=True)
+    results[name] = run_scenario(spec, codegen, max(1, args.repeat))
+  print_table(results)
+
+  payload = {
+    "meta": {"python": platform.python_version(), "platform": platform.platform(), "repeat": args.repeat},
+    "results": results,
+  }
+  if args.out:
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"[bench] results written to {args.out}")
+  if args.baseline:
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    problems = compare(results, baseline, args.threshold, args.min_ms)
+    if problems:
+      for problem in problems:
+        print(f"[bench] REGRESSION {problem}")
+      sys.exit(1)
+    print(f"[bench] no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+  main()
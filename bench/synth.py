@@ -0,0 +1,85 @@
+"""Synthetic index.html / app.js generator for the translator benchmarks."""
+from __future__ import annotations
+
+import random
+
+PALETTE = ["#ff0000", "#00ff88", "#3366cc", "#ffffff", "#222222", "rgb(12, 34, 56)", "#abc"]
+FONT_SIZES = [14, 16, 18, 20, 24, 30, 36]
+
+
+class PageSpec:
+  def __init__(
+    self,
+    nodes: int = 100,
+    buttons: int = 20,
+    layout: str = "flow",
+    style_density: float = 0.5,
+    messages: int = 3,
+    seed: int = 1,
+  ):
+    if layout not in ("flow", "absolute"):
+      raise ValueError(f"layout must be 'flow' or 'absolute', not {layout!r}")
+    self.nodes = nodes
+    self.buttons = buttons
+    self.layout = layout
+    self.style_density = style_density
+    self.messages = messages
+    self.seed = seed
+
+  def as_dict(self) -> dict:
+    return {
+      "nodes": self.nodes,
+      "buttons": self.buttons,
+      "layout": self.layout,
+      "style_density": self.style_density,
+      "messages": self.messages,
+      "seed": self.seed,
+    }
+
+
+def _style(rng: random.Random, spec: PageSpec, idx: int, is_button: bool) -> str:
+  parts = []
+  if spec.layout == "absolute":
+    parts += ["position:absolute", f"left:{(idx * 37) % 1000}px", f"top:{(idx * 53) % 580}px"]
+    if is_button:
+      parts += [f"width:{60 + idx % 40}px", f"height:{30 + idx % 20}px"]
+  if rng.random() < spec.style_density:
+    parts.append(f"color:{rng.choice(PALETTE)}")
+    parts.append(f"font-size:{rng.choice(FONT_SIZES)}px")
+    if is_button:
+      parts.append(f"background-color:{rng.choice(PALETTE)}")
+  return ";".join(parts)
+
+
+def make_html(spec: PageSpec) -> str:
+  """Text nodes cycle through h1-h3/p/span; buttons are interleaved evenly."""
+  rng = random.Random(spec.seed)
+  text_tags = ["h1", "p", "span", "h2", "p", "h3"]
+  total = spec.nodes + spec.buttons
+  every = max(1, total // spec.buttons) if spec.buttons else 0
+  out = ["<!DOCTYPE html>", "<html><head><meta charset=\"UTF-8\"><title>bench</title></head><body>"]
+  texts = buttons = 0
+  for idx in range(total):
+    is_button = bool(every) and buttons < spec.buttons and (idx % every == every - 1 or texts >= spec.nodes)
+    style = _style(rng, spec, idx, is_button)
+    attr = f' style="{style}"' if style else ""
+    if is_button:
+      out.append(f"  <button{attr}>Btn {buttons} &amp; \"{idx}\"</button>")
+      buttons += 1
+    else:
+      tag = text_tags[texts % len(text_tags)]
+      out.append(f"  <{tag}{attr}>Text {texts}: 状态 {rng.randint(0, 9999)}</{tag}>")
+      texts += 1
+  out.append("</body></html>")
+  return "\n".join(out) + "\n"
+
+
+def make_js(spec: PageSpec) -> str:
+  quotes = ['"', "'"]
+  items = ", ".join(f"{quotes[i % 2]}message {i}{quotes[i % 2]}" for i in range(spec.messages))
+  return (
+    "const display = document.getElementById('display');\n"
+    f"const messages = [{items}];\n"
+    "let idx = 0;\n"
+    "display.addEventListener('click', () => { idx = (idx + 1) % messages.length; });\n"
+  )
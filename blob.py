@@ -0,0 +1,770 @@
+"""Binary UI blob (`main.py --ui-format blob`): the UI as data instead of code.
+
+The widget tree, styles, strings and `messages` are serialized into one
+little-endian, versioned blob. A generic C loader (ui_blob.c, the same for every
+UI) validates it at startup and builds the screens from it, so pushing a new
+ui.blob to the device changes text and layout without recompiling. The firmware
+links the blob it was generated with as a fallback (ui_blob_data.c) and
+prefers the file named by $UI_BLOB (default ./ui.blob), which it mmaps.
+
+Layout (all offsets from the start of the blob, every section 4-byte aligned):
+
+  header     48 bytes, HEADER below; CRC-32 of everything after it
+  screens    SCREEN[screen_count]   name, first widget, widget count, flow flag
+  widgets    WIDGET[widget_count]   geometry, text, parent, styles, click action
+  styles     STYLE[style_count]     deduplicated; widgets use 1-based indexes
+  strings    uint32[string_count]   offsets of NUL-terminated UTF-8 in the pool
+  messages   uint16[message_count]  string ids
+  pool       the string data; labels point straight into it (zero-copy)
+
+Only the flex layout without button matrices is expressible; `--codegen`,
+`--events`, `--layout` and `--btnmatrix-threshold` do not apply. `verify_blob`
+is the round-trip check main.py runs on every blob it writes (and on any file
+with `--verify-blob`): decode, compare with the model, re-encode to the
+identical bytes.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import NamedTuple
+
+from util import BUTTON_TAGS, FONT_SIZES, IMAGE_TAGS, TEXT_TAGS, Node, ResolvedStyle, Screen, _Page, image_symbol
+
+MAGIC = b"LVUB"
+VERSION = 1
+NONE = 0xFFFF  # no string (grids)
+CONTENT = -0x8000  # width/height: LV_SIZE_CONTENT
+
+HEADER = struct.Struct("<4sHHII6H5I")
+SCREEN = struct.Struct("<HHHBx")
+WIDGET = struct.Struct("<4h5H3B3x")
+STYLE = struct.Struct("<IIBBBB")
+
+KIND_LABEL, KIND_BUTTON, KIND_IMAGE, KIND_GRID = range(4)
+F_POS, F_SIZE, F_W_PCT, F_H_PCT, F_DISPLAY = 0x01, 0x02, 0x04, 0x08, 0x10
+ACT_NONE, ACT_NEXT_MESSAGE, ACT_SHOW_TEXT, ACT_SCREEN = range(4)
+S_TEXT_COLOR, S_BG_COLOR, S_FONT, S_PAD_ALL, S_PAD_BOTTOM = 0x01, 0x02, 0x04, 0x08, 0x10
+
+
+class BlobError(ValueError):
+  pass
+
+
+class BlobStyle(NamedTuple):
+  text_color: int | None = None
+  bg_color: int | None = None
+  font: int | None = None
+  pad_all: int | None = None
+  pad_bottom: int | None = None
+
+
+class BlobWidget(NamedTuple):
+  kind: int
+  text: str | None  # caption, or the image symbol
+  x: int = 0
+  y: int = 0
+  w: int = 0
+  h: int = 0
+  flags: int = 0
+  parent: int = 0  # 0 = the screen, n = the n-th widget of the same screen (a grid)
+  text_style: BlobStyle | None = None
+  bg_style: BlobStyle | None = None
+  action: int = ACT_NONE
+  arg: str | int | None = None  # ACT_SHOW_TEXT: the text; ACT_SCREEN: screen index
+
+
+class BlobScreen(NamedTuple):
+  name: str
+  flow: bool  # centered flex column (title, display label, images, buttons)
+  widgets: tuple[BlobWidget, ...]
+
+
+class BlobUI(NamedTuple):
+  screens: tuple[BlobScreen, ...]
+  messages: tuple[str, ...]
+
+
+def _geometry(box: ResolvedStyle) -> dict:
+  """Same rules as the generated lv_obj_set_size/lv_obj_set_pos calls."""
+  geo = {"flags": 0}
+  if box.w is not None or box.h is not None:
+    geo.update(flags=F_SIZE, w=CONTENT if box.w is None else box.w, h=CONTENT if box.h is None else box.h)
+  if box.x is not None or box.y is not None:
+    geo.update(flags=geo["flags"] | F_POS, x=box.x or 0, y=box.y or 0)
+  return geo
+
+
+def _text_style(box: ResolvedStyle) -> BlobStyle | None:
+  return BlobStyle(text_color=box.color, font=box.font) if box.color is not None or box.font is not None else None
+
+
+def build_ui(nodes: list[Node], messages: list[str], screens: list[Screen] | None = None) -> BlobUI:
+  """The blob model of a parsed UI, with the page layout decisions of the C generator."""
+  parts = screens or [Screen("main", nodes)]
+  ids = {screen.name: i for i, screen in enumerate(parts)} if screens else {}
+
+  def action(node: Node | None, text: str) -> dict:
+    target = node.attrs.get("data-screen") if node is not None else None
+    if target in ids:
+      return {"action": ACT_SCREEN, "arg": ids[target]}
+    return {"action": ACT_NEXT_MESSAGE} if messages else {"action": ACT_SHOW_TEXT, "arg": text}
+
+  result = []
+  for screen in parts:
+    page = _Page(screen.nodes)
+    widgets = []
+    if page.use_absolute:
+      display_pending = True
+      for node in page.nodes:
+        box = node.resolved
+        if node.tag in TEXT_TAGS:
+          geo = _geometry(box)
+          geo["flags"] |= F_DISPLAY if display_pending else 0
+          widgets.append(BlobWidget(KIND_LABEL, node.text, text_style=_text_style(box), **geo))
+          display_pending = False
+        elif node.tag in BUTTON_TAGS:
+          bg = BlobStyle(bg_color=box.bg_color) if box.bg_color is not None else None
+          widgets.append(BlobWidget(
+            KIND_BUTTON, node.text, text_style=_text_style(box), bg_style=bg, **_geometry(box), **action(node, node.text)
+          ))
+        elif node.tag in IMAGE_TAGS:
+          widgets.append(BlobWidget(KIND_IMAGE, image_symbol(node), **_geometry(box)))
+      if not page.has_text:
+        widgets.append(BlobWidget(KIND_LABEL, page.first_text, flags=F_POS | F_DISPLAY))
+    else:
+      widgets.append(BlobWidget(KIND_LABEL, page.title, text_style=BlobStyle(text_color=0x8AB4FF)))
+      widgets.append(BlobWidget(KIND_LABEL, page.first_text, flags=F_DISPLAY, text_style=BlobStyle(pad_bottom=12)))
+      widgets += [BlobWidget(KIND_IMAGE, image_symbol(n), **_geometry(n.resolved)) for n in page.images]
+      if page.multi_buttons:
+        widgets.append(BlobWidget(KIND_GRID, None, w=100, h=100, flags=F_SIZE | F_W_PCT | F_H_PCT))
+        grid = len(widgets)
+        for node in page.nodes:
+          if node.tag in BUTTON_TAGS:
+            widgets.append(BlobWidget(
+              KIND_BUTTON, node.text, w=page.btn_w_pct, h=page.btn_h_pct, flags=F_SIZE | F_W_PCT | F_H_PCT,
+              parent=grid, **action(node, node.text),
+            ))
+      else:
+        widgets.append(BlobWidget(
+          KIND_BUTTON, page.btn_text, w=CONTENT, h=CONTENT, flags=F_SIZE, bg_style=BlobStyle(pad_all=10),
+          **action(page.button, page.btn_text),
+        ))
+    result.append(BlobScreen(screen.name, not page.use_absolute, tuple(widgets)))
+  return BlobUI(tuple(result), tuple(messages))
+
+
+def _align4(n: int) -> int:
+  return (n + 3) & ~3
+
+
+def encode(ui: BlobUI) -> bytes:
+  strings: dict[str, int] = {}
+  styles: dict[BlobStyle, int] = {}
+
+  def sid(text: str) -> int:
+    return strings.setdefault(text, len(strings))
+
+  def style_ref(style: BlobStyle | None) -> int:
+    return 0 if style is None else styles.setdefault(style, len(styles)) + 1
+
+  screens, widgets = [], []
+  try:
+    for screen in ui.screens:
+      screens.append(SCREEN.pack(sid(screen.name), len(widgets), len(screen.widgets), int(screen.flow)))
+      for w in screen.widgets:
+        arg = sid(w.arg) if w.action == ACT_SHOW_TEXT else w.arg if w.action == ACT_SCREEN else 0
+        text = NONE if w.text is None else sid(w.text)
+        widgets.append(WIDGET.pack(
+          w.x, w.y, w.w, w.h, text, w.parent, style_ref(w.text_style), style_ref(w.bg_style), arg, w.kind, w.flags, w.action,
+        ))
+    messages = [sid(m) for m in ui.messages]
+    style_recs = []
+    for style in styles:
+      flags = sum(bit for bit, value in zip((S_TEXT_COLOR, S_BG_COLOR, S_FONT, S_PAD_ALL, S_PAD_BOTTOM), style) if value is not None)
+      style_recs.append(STYLE.pack(
+        style.text_color or 0, style.bg_color or 0, style.font or 0, flags, style.pad_all or 0, style.pad_bottom or 0,
+      ))
+  except struct.error as exc:
+    raise BlobError(f"value out of range for the blob format: {exc}") from None
+  counts = (len(screens), len(widgets), len(style_recs), len(strings), len(messages))
+  if max(counts) >= NONE:
+    raise BlobError(f"too many entries for 16-bit ids: {counts}")
+  screens_off = HEADER.size
+  widgets_off = screens_off + SCREEN.size * len(screens)
+  styles_off = widgets_off + WIDGET.size * len(widgets)
+  strings_off = styles_off + STYLE.size * len(style_recs)
+  messages_off = strings_off + 4 * len(strings)
+  pool_off = _align4(messages_off + 2 * len(messages))
+  offsets, pool = [], bytearray()
+  for text in strings:
+    offsets.append(pool_off + len(pool))
+    pool += text.encode("utf-8") + b"\0"
+  body = b"".join([
+    *screens, *widgets, *style_recs,
+    struct.pack(f"<{len(offsets)}I", *offsets),
+    struct.pack(f"<{len(messages)}H", *messages).ljust(pool_off - messages_off, b"\0"),
+    bytes(pool).ljust(_align4(len(pool)), b"\0"),
+  ])
+  size = HEADER.size + len(body)
+  header = HEADER.pack(
+    MAGIC, VERSION, HEADER.size, size, zlib.crc32(body), *counts, 0,
+    screens_off, widgets_off, styles_off, strings_off, messages_off,
+  )
+  return header + body
+
+
+def _section(size: int, off: int, count: int, item: int, name: str) -> None:
+  if off % 4 or off < HEADER.size or off + count * item > size:
+    raise BlobError(f"{name} section out of bounds")
+
+
+def decode(data: bytes) -> BlobUI:
+  """Parse and validate a blob: the C loader's checks, plus UTF-8 text (the loader hands strings to LVGL unchecked)."""
+  if len(data) < HEADER.size:
+    raise BlobError("shorter than the header")
+  magic, version, header_size, size, crc, *rest = HEADER.unpack_from(data)
+  n_screens, n_widgets, n_styles, n_strings, n_messages, _flags, *offs = rest
+  screens_off, widgets_off, styles_off, strings_off, messages_off = offs
+  if magic != MAGIC:
+    raise BlobError("not a UI blob")
+  if version != VERSION or header_size != HEADER.size:
+    raise BlobError(f"blob version {version}, loader expects {VERSION}")
+  if size > len(data):
+    raise BlobError(f"truncated: header says {size} bytes, have {len(data)}")
+  if zlib.crc32(data[HEADER.size:size]) != crc:
+    raise BlobError("checksum mismatch")
+  _section(size, screens_off, n_screens, SCREEN.size, "screens")
+  _section(size, widgets_off, n_widgets, WIDGET.size, "widgets")
+  _section(size, styles_off, n_styles, STYLE.size, "styles")
+  _section(size, strings_off, n_strings, 4, "strings")
+  _section(size, messages_off, n_messages, 2, "messages")
+
+  strings = []
+  for (off,) in struct.iter_unpack("<I", data[strings_off:strings_off + 4 * n_strings]):
+    end = data.find(b"\0", off, size)
+    if off >= size or end < 0:
+      raise BlobError(f"string at {off} is not terminated inside the blob")
+    try:
+      strings.append(data[off:end].decode("utf-8"))
+    except UnicodeDecodeError as exc:
+      raise BlobError(f"string at {off} is not UTF-8: {exc.reason}") from None
+
+  def string(sid: int) -> str:
+    if sid >= n_strings:
+      raise BlobError(f"string id {sid} out of range")
+    return strings[sid]
+
+  styles = []
+  for text_color, bg_color, font, flags, pad_all, pad_bottom in STYLE.iter_unpack(data[styles_off:styles_off + STYLE.size * n_styles]):
+    values = (text_color, bg_color, font, pad_all, pad_bottom)
+    bits = (S_TEXT_COLOR, S_BG_COLOR, S_FONT, S_PAD_ALL, S_PAD_BOTTOM)
+    styles.append(BlobStyle(*(v if flags & bit else None for v, bit in zip(values, bits))))
+
+  def style(ref: int) -> BlobStyle | None:
+    if ref > n_styles:
+      raise BlobError(f"style {ref} out of range")
+    return styles[ref - 1] if ref else None
+
+  records = list(WIDGET.iter_unpack(data[widgets_off:widgets_off + WIDGET.size * n_widgets]))
+  screens = []
+  for name, first, count, flow in SCREEN.iter_unpack(data[screens_off:screens_off + SCREEN.size * n_screens]):
+    if first + count > n_widgets:
+      raise BlobError(f"screen {string(name)!r} widgets out of range")
+    widgets = []
+    for i, (x, y, w, h, text, parent, text_style, bg_style, arg, kind, flags, action) in enumerate(records[first:first + count]):
+      if kind > KIND_GRID or action > ACT_SCREEN:
+        raise BlobError(f"unknown widget kind {kind} / action {action}")
+      if parent and (parent > i or records[first + parent - 1][9] != KIND_GRID):
+        raise BlobError(f"widget {first + i}: parent {parent} is not an earlier grid")
+      if action == ACT_SCREEN and arg >= n_screens:
+        raise BlobError(f"widget {first + i}: screen {arg} out of range")
+      value = string(arg) if action == ACT_SHOW_TEXT else arg if action == ACT_SCREEN else None
+      widgets.append(BlobWidget(
+        kind, None if text == NONE else string(text), x, y, w, h, flags, parent, style(text_style), style(bg_style), action, value,
+      ))
+    screens.append(BlobScreen(string(name), bool(flow), tuple(widgets)))
+  messages = tuple(string(sid) for (sid,) in struct.iter_unpack("<H", data[messages_off:messages_off + 2 * n_messages]))
+  return BlobUI(tuple(screens), messages)
+
+
+def verify_blob(data: bytes, ui: BlobUI | None = None) -> list[str]:
+  """Round-trip check: `data` decodes (to `ui`, when given) and re-encodes to the same bytes."""
+  try:
+    decoded = decode(data)
+  except BlobError as exc:
+    return [f"decode: {exc}"]
+  problems = []
+  if ui is not None and decoded != ui:
+    for i, (ours, theirs) in enumerate(zip(ui.screens, decoded.screens)):
+      if ours != theirs:
+        problems.append(f"screen {i} ({ours.name}) differs after decoding")
+    if len(ui.screens) != len(decoded.screens) or ui.messages != decoded.messages:
+      problems.append("screen count or messages differ after decoding")
+  if encode(decoded) != data:
+    problems.append("re-encoding the decoded blob gives different bytes")
+  return problems
+
+
+def describe(data: bytes) -> str:
+  _magic, version, _hs, size, crc, screens, widgets, styles, strings, messages, *_ = HEADER.unpack_from(data)
+  return (
+    f"v{version}, {size} bytes, crc32 {crc:08x}: {screens} screen(s), {widgets} widgets, "
+    f"{styles} styles, {strings} strings, {messages} messages"
+  )
+
+
+def data_source(data: bytes) -> str:
+  """ui_blob_data.c: the blob linked into the firmware as the fallback UI."""
+  rows = [", ".join(f"0x{b:02x}" for b in data[i:i + 16]) for i in range(0, len(data), 16)]
+  body = ",\n".join(f"  {row}" for row in rows)
+  return (
+    "/* Generated by main.py --ui-format blob: the UI this firmware was built with. */\n"
+    "#include <stdint.h>\n\n"
+    "#if defined(__GNUC__)\n__attribute__((aligned(4)))\n#endif\n"
+    f"const uint8_t ui_blob_default[{len(data)}] = {{\n{body}\n}};\n"
+    "const uint32_t ui_blob_default_size = sizeof(ui_blob_default);\n"
+  )
+
+
+def app_source(images: list[str], screens: bool, perf: bool) -> str:
+  """ui_app.c for blob mode: register images, load $UI_BLOB (or the linked blob) and show screen 0."""
+  lines = ['#include "ui_app.h"', "#include <stdio.h>", "#include <stdlib.h>", '#include "ui_blob.h"']
+  if images:
+    lines.append('#include "images/ui_images.h"')
+  if perf:
+    lines.append('#include "ui_perf.h"')
+  lines += [
+    "",
+    "#ifndef UI_BLOB_PATH",
+    '#define UI_BLOB_PATH "ui.blob" /* $UI_BLOB overrides it at run time */',
+    "#endif",
+    "",
+    "extern const uint8_t ui_blob_default[];",
+    "extern const uint32_t ui_blob_default_size;",
+    "",
+  ]
+  if images:
+    lines.append("static const ui_blob_image_t ui_blob_images[] = {")
+    lines += [f'  {{"{sym}", &{sym}}},' for sym in images]
+    lines += ["};", ""]
+  lines.append("void ui_build(void) {")
+  if perf:
+    lines.append("  UI_PERF_SCOPE_BEGIN();")
+  if images:
+    lines.append("  ui_images_init();")
+    lines.append("  ui_blob_set_images(ui_blob_images, sizeof(ui_blob_images) / sizeof(ui_blob_images[0]));")
+  lines += [
+    '  const char * path = getenv("UI_BLOB");',
+    "  if (path == NULL) path = UI_BLOB_PATH;",
+    "  int err = ui_blob_load_file(path);",
+    "  if (err != UI_BLOB_OK) {",
+    '    printf("[ui] %s: %s; using the built-in UI\\n", path, ui_blob_strerror(err));',
+    "    err = ui_blob_load(ui_blob_default, ui_blob_default_size);",
+    "  }",
+    "  if (err == UI_BLOB_OK) {",
+    "    ui_blob_show_screen(0);",
+    "  } else {",
+    '    printf("[ui] built-in UI: %s\\n", ui_blob_strerror(err));',
+    "  }",
+  ]
+  if perf:
+    lines.append("  UI_PERF_BUILD_END();")
+  lines.append("}")
+  if screens:
+    lines += ["", "void ui_show_screen(int id) {", "  ui_blob_show_screen(id);", "}"]
+  return "\n".join(lines) + "\n"
+
+
+LOADER_H = """\
+/* Generic loader for ui.blob files written by main.py --ui-format blob (see blob.py). */
+#pragma once
+#include <stdint.h>
+#include "lvgl.h"
+
+#define UI_BLOB_VERSION @VERSION@
+
+enum {
+  UI_BLOB_OK = 0,
+  UI_BLOB_E_IO = -1,       /* cannot open or map the file */
+  UI_BLOB_E_FORMAT = -2,   /* not a blob, or misaligned */
+  UI_BLOB_E_VERSION = -3,  /* written for another loader version */
+  UI_BLOB_E_SIZE = -4,     /* truncated */
+  UI_BLOB_E_CHECKSUM = -5,
+  UI_BLOB_E_RANGE = -6,    /* an offset, id or index points outside the blob */
+  UI_BLOB_E_NOMEM = -7,
+};
+
+typedef struct {
+  const char * symbol;     /* image_symbol() name stored in the blob */
+  const void * src;        /* lv_img_set_src() argument */
+} ui_blob_image_t;
+
+/* Images are compiled into the firmware; blobs refer to them by symbol. */
+void ui_blob_set_images(const ui_blob_image_t * images, uint32_t count);
+/* Validate `data` (4-byte aligned, kept alive by the caller) and replace the current UI. */
+int ui_blob_load(const void * data, uint32_t size);
+/* mmap `path` read-only and load it; the mapping lives until the next successful load. */
+int ui_blob_load_file(const char * path);
+/* Build screen `id` on first use, then show it and hide the previous one. */
+void ui_blob_show_screen(int id);
+const char * ui_blob_strerror(int err);
+"""
+
+LOADER_C = """\
+/* Generic loader for ui.blob (see blob.py for the format). The blob is validated
+ * once in ui_blob_load(); building then trusts it and labels point into it. */
+#include "ui_blob.h"
+#include <string.h>
+#if defined(__unix__) || defined(__APPLE__)
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#define UI_BLOB_MMAP 1
+#endif
+
+enum { UI_BLOB_LABEL, UI_BLOB_BUTTON, UI_BLOB_IMAGE, UI_BLOB_GRID };
+enum { UI_BLOB_F_POS = 0x01, UI_BLOB_F_SIZE = 0x02, UI_BLOB_F_W_PCT = 0x04, UI_BLOB_F_H_PCT = 0x08, UI_BLOB_F_DISPLAY = 0x10 };
+enum { UI_BLOB_ACT_NONE, UI_BLOB_ACT_NEXT_MESSAGE, UI_BLOB_ACT_SHOW_TEXT, UI_BLOB_ACT_SCREEN };
+enum { UI_BLOB_S_TEXT_COLOR = 0x01, UI_BLOB_S_BG_COLOR = 0x02, UI_BLOB_S_FONT = 0x04, UI_BLOB_S_PAD_ALL = 0x08, UI_BLOB_S_PAD_BOTTOM = 0x10 };
+#define UI_BLOB_NONE 0xFFFF
+#define UI_BLOB_CONTENT INT16_MIN
+
+typedef struct {
+  char magic[4];           /* "LVUB" */
+  uint16_t version;
+  uint16_t header_size;
+  uint32_t size;
+  uint32_t checksum;       /* CRC-32 of bytes [header_size, size) */
+  uint16_t screen_count, widget_count, style_count, string_count, message_count, flags;
+  uint32_t screens_off, widgets_off, styles_off, strings_off, messages_off;
+} ui_blob_header_t;
+
+typedef struct {
+  uint16_t name;
+  uint16_t first_widget;
+  uint16_t widget_count;
+  uint8_t flow;
+  uint8_t reserved;
+} ui_blob_screen_t;
+
+typedef struct {
+  int16_t x, y, w, h;
+  uint16_t text;           /* string id, UI_BLOB_NONE for grids */
+  uint16_t parent;         /* 0 = screen, n = n-th widget of the same screen (a grid) */
+  uint16_t text_style;     /* 1-based, 0 = none */
+  uint16_t bg_style;
+  uint16_t arg;            /* SHOW_TEXT: string id; SCREEN: screen index */
+  uint8_t kind;
+  uint8_t flags;
+  uint8_t action;
+  uint8_t reserved[3];
+} ui_blob_widget_t;
+
+typedef struct {
+  uint32_t text_color;
+  uint32_t bg_color;
+  uint8_t font;
+  uint8_t flags;
+  uint8_t pad_all;
+  uint8_t pad_bottom;
+} ui_blob_style_t;
+
+typedef char ui_blob_layout_check[(sizeof(ui_blob_header_t) == 48 && sizeof(ui_blob_screen_t) == 8 &&
+                                   sizeof(ui_blob_widget_t) == 24 && sizeof(ui_blob_style_t) == 12) ? 1 : -1];
+
+static const uint8_t * blob;
+static const ui_blob_header_t * hdr;
+static const ui_blob_screen_t * screens;
+static const ui_blob_widget_t * widgets;
+static const ui_blob_style_t * styles;
+static const uint32_t * strings;
+static const uint16_t * messages;
+static lv_obj_t ** roots;       /* per screen, NULL until built */
+static lv_obj_t ** displays;    /* per screen display label */
+static lv_obj_t * display_label;
+static int active = -1;
+static uint32_t msg_idx;
+static const ui_blob_image_t * images;
+static uint32_t image_count;
+#if UI_BLOB_MMAP
+static void * mapping;
+static size_t mapping_size;
+#endif
+
+static uint32_t ui_blob_crc32(const uint8_t * p, uint32_t n) {
+  uint32_t crc = 0xFFFFFFFFu;
+  while (n--) {
+    crc ^= *p++;
+    for (int k = 0; k < 8; k++) crc = (crc >> 1) ^ (0xEDB88320u & (0u - (crc & 1u)));
+  }
+  return ~crc;
+}
+
+static int ui_blob_section(const ui_blob_header_t * h, uint32_t off, uint32_t count, uint32_t item) {
+  return off % 4 == 0 && off >= h->header_size && off <= h->size && count <= (h->size - off) / item;
+}
+
+static int ui_blob_check(const uint8_t * data, uint32_t size) {
+  const ui_blob_header_t * h = (const ui_blob_header_t *)data;
+  if (size < sizeof(*h) || ((uintptr_t)data & 3u) || memcmp(h->magic, "LVUB", 4) != 0) return UI_BLOB_E_FORMAT;
+  if (h->version != UI_BLOB_VERSION || h->header_size != sizeof(*h)) return UI_BLOB_E_VERSION;
+  if (h->size > size || h->size < sizeof(*h)) return UI_BLOB_E_SIZE;
+  if (ui_blob_crc32(data + h->header_size, h->size - h->header_size) != h->checksum) return UI_BLOB_E_CHECKSUM;
+  if (!ui_blob_section(h, h->screens_off, h->screen_count, sizeof(ui_blob_screen_t)) ||
+      !ui_blob_section(h, h->widgets_off, h->widget_count, sizeof(ui_blob_widget_t)) ||
+      !ui_blob_section(h, h->styles_off, h->style_count, sizeof(ui_blob_style_t)) ||
+      !ui_blob_section(h, h->strings_off, h->string_count, sizeof(uint32_t)) ||
+      !ui_blob_section(h, h->messages_off, h->message_count, sizeof(uint16_t))) return UI_BLOB_E_RANGE;
+  const uint32_t * offs = (const uint32_t *)(data + h->strings_off);
+  for (uint32_t i = 0; i < h->string_count; i++) {
+    if (offs[i] >= h->size || memchr(data + offs[i], 0, h->size - offs[i]) == NULL) return UI_BLOB_E_RANGE;
+  }
+  const uint16_t * msgs = (const uint16_t *)(data + h->messages_off);
+  for (uint32_t i = 0; i < h->message_count; i++) {
+    if (msgs[i] >= h->string_count) return UI_BLOB_E_RANGE;
+  }
+  if (h->screen_count == 0) return UI_BLOB_E_RANGE;
+  const ui_blob_screen_t * scr = (const ui_blob_screen_t *)(data + h->screens_off);
+  const ui_blob_widget_t * wid = (const ui_blob_widget_t *)(data + h->widgets_off);
+  for (uint32_t s = 0; s < h->screen_count; s++) {
+    if (scr[s].name >= h->string_count || (uint32_t)scr[s].first_widget + scr[s].widget_count > h->widget_count) return UI_BLOB_E_RANGE;
+    for (uint32_t i = 0; i < scr[s].widget_count; i++) {
+      const ui_blob_widget_t * w = &wid[scr[s].first_widget + i];
+      if (w->kind > UI_BLOB_GRID || w->action > UI_BLOB_ACT_SCREEN) return UI_BLOB_E_RANGE;
+      if (w->text != UI_BLOB_NONE ? w->text >= h->string_count : w->kind != UI_BLOB_GRID) return UI_BLOB_E_RANGE;
+      if (w->parent && (w->parent > i || wid[scr[s].first_widget + w->parent - 1].kind != UI_BLOB_GRID)) return UI_BLOB_E_RANGE;
+      if (w->text_style > h->style_count || w->bg_style > h->style_count) return UI_BLOB_E_RANGE;
+      if (w->action == UI_BLOB_ACT_SHOW_TEXT && w->arg >= h->string_count) return UI_BLOB_E_RANGE;
+      if (w->action == UI_BLOB_ACT_SCREEN && w->arg >= h->screen_count) return UI_BLOB_E_RANGE;
+    }
+  }
+  return UI_BLOB_OK;
+}
+
+static const char * ui_blob_string(uint16_t id) {
+  return (const char *)blob + strings[id];
+}
+
+static const lv_font_t * ui_blob_font(uint8_t size) {
+  switch (size) {
+@FONTS@
+  default: return NULL;
+  }
+}
+
+static void ui_blob_apply_style(lv_obj_t * obj, const ui_blob_style_t * st) {
+  if (st->flags & UI_BLOB_S_TEXT_COLOR) lv_obj_set_style_text_color(obj, lv_color_hex(st->text_color), 0);
+  if (st->flags & UI_BLOB_S_BG_COLOR) lv_obj_set_style_bg_color(obj, lv_color_hex(st->bg_color), 0);
+  if (st->flags & UI_BLOB_S_FONT) {
+    const lv_font_t * font = ui_blob_font(st->font);
+    if (font) lv_obj_set_style_text_font(obj, font, 0);
+  }
+  if (st->flags & UI_BLOB_S_PAD_ALL) lv_obj_set_style_pad_all(obj, st->pad_all, 0);
+  if (st->flags & UI_BLOB_S_PAD_BOTTOM) lv_obj_set_style_pad_bottom(obj, st->pad_bottom, 0);
+}
+
+static const void * ui_blob_image(const char * symbol) {
+  for (uint32_t i = 0; i < image_count; i++) {
+    if (strcmp(images[i].symbol, symbol) == 0) return images[i].src;
+  }
+  return NULL;
+}
+
+static lv_coord_t ui_blob_size(int16_t v, int pct) {
+  if (v == UI_BLOB_CONTENT) return LV_SIZE_CONTENT;
+  return pct ? lv_pct(v) : v;
+}
+
+static void ui_blob_click_cb(lv_event_t * e) {
+  const ui_blob_widget_t * w = (const ui_blob_widget_t *)lv_event_get_user_data(e);
+  switch (w->action) {
+  case UI_BLOB_ACT_NEXT_MESSAGE:
+    if (hdr->message_count == 0 || display_label == NULL) return;
+    msg_idx = (msg_idx + 1) % hdr->message_count;
+    lv_label_set_text_static(display_label, ui_blob_string(messages[msg_idx]));
+    break;
+  case UI_BLOB_ACT_SHOW_TEXT:
+    if (display_label) lv_label_set_text_static(display_label, ui_blob_string(w->arg));
+    break;
+  case UI_BLOB_ACT_SCREEN:
+    ui_blob_show_screen(w->arg);
+    break;
+  }
+}
+
+static lv_obj_t * ui_blob_root(void) {
+  lv_obj_t * scr = lv_obj_create(lv_layer_top());
+  lv_obj_remove_style_all(scr);
+  lv_obj_set_size(scr, lv_pct(100), lv_pct(100));
+  lv_obj_set_style_bg_color(scr, lv_color_hex(0x0b1d36), 0);
+  lv_obj_set_style_bg_opa(scr, LV_OPA_COVER, 0);
+  lv_obj_clear_flag(scr, LV_OBJ_FLAG_SCROLLABLE);
+  lv_obj_add_flag(scr, LV_OBJ_FLAG_CLICKABLE);
+  return scr;
+}
+
+static void ui_blob_build(const ui_blob_screen_t * s, lv_obj_t * scr) {
+  lv_obj_t ** objs = lv_mem_alloc(sizeof(lv_obj_t *) * (s->widget_count ? s->widget_count : 1));
+  if (objs == NULL) return;
+  if (s->flow) {
+    lv_obj_set_flex_flow(scr, LV_FLEX_FLOW_COLUMN);
+    lv_obj_set_flex_align(scr, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER);
+    lv_obj_set_style_pad_all(scr, 20, 0);
+  }
+  for (uint32_t i = 0; i < s->widget_count; i++) {
+    const ui_blob_widget_t * w = &widgets[s->first_widget + i];
+    lv_obj_t * parent = w->parent ? objs[w->parent - 1] : scr;
+    lv_obj_t * obj = NULL;
+    lv_obj_t * label = NULL;
+    objs[i] = NULL;
+    if (parent == NULL) continue;
+    if (w->kind == UI_BLOB_LABEL) {
+      obj = label = lv_label_create(parent);
+    } else if (w->kind == UI_BLOB_BUTTON) {
+      obj = lv_btn_create(parent);
+      label = lv_label_create(obj);
+      lv_obj_center(label);
+    } else if (w->kind == UI_BLOB_IMAGE) {
+      const void * src = ui_blob_image(ui_blob_string(w->text));
+      if (src == NULL) continue; /* not compiled into this firmware */
+      obj = lv_img_create(parent);
+      lv_img_set_src(obj, src);
+    } else {
+      obj = lv_obj_create(parent);
+      lv_obj_remove_style_all(obj);
+      lv_obj_set_style_bg_opa(obj, LV_OPA_TRANSP, 0);
+      lv_obj_set_style_pad_all(obj, 4, 0);
+      lv_obj_set_style_pad_row(obj, 4, 0);
+      lv_obj_set_style_pad_column(obj, 4, 0);
+      lv_obj_set_flex_flow(obj, LV_FLEX_FLOW_ROW_WRAP);
+      lv_obj_set_flex_align(obj, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_START, LV_FLEX_ALIGN_START);
+      lv_obj_set_flex_grow(obj, 1);
+    }
+    objs[i] = obj;
+    if (label) lv_label_set_text_static(label, ui_blob_string(w->text));
+    if (w->flags & UI_BLOB_F_SIZE) {
+      lv_obj_set_size(obj, ui_blob_size(w->w, w->flags & UI_BLOB_F_W_PCT), ui_blob_size(w->h, w->flags & UI_BLOB_F_H_PCT));
+    }
+    if (w->flags & UI_BLOB_F_POS) lv_obj_set_pos(obj, w->x, w->y);
+    if (w->bg_style) ui_blob_apply_style(obj, &styles[w->bg_style - 1]);
+    if (w->text_style) ui_blob_apply_style(label ? label : obj, &styles[w->text_style - 1]);
+    if ((w->flags & UI_BLOB_F_DISPLAY) && label) display_label = label;
+    if (w->action != UI_BLOB_ACT_NONE) lv_obj_add_event_cb(obj, ui_blob_click_cb, LV_EVENT_CLICKED, (void *)w);
+  }
+  lv_mem_free(objs);
+}
+
+static void ui_blob_unload(void) {
+  if (roots) {
+    for (uint32_t i = 0; i < hdr->screen_count; i++) {
+      if (roots[i]) lv_obj_del(roots[i]);
+    }
+    lv_mem_free(roots);
+    lv_mem_free(displays);
+  }
+  roots = displays = NULL;
+  display_label = NULL;
+  active = -1;
+  msg_idx = 0;
+}
+
+void ui_blob_set_images(const ui_blob_image_t * list, uint32_t count) {
+  images = list;
+  image_count = count;
+}
+
+int ui_blob_load(const void * data, uint32_t size) {
+  int err = ui_blob_check((const uint8_t *)data, size);
+  if (err != UI_BLOB_OK) return err;
+  const ui_blob_header_t * h = (const ui_blob_header_t *)data;
+  lv_obj_t ** new_roots = lv_mem_alloc(sizeof(lv_obj_t *) * h->screen_count);
+  lv_obj_t ** new_displays = lv_mem_alloc(sizeof(lv_obj_t *) * h->screen_count);
+  if (new_roots == NULL || new_displays == NULL) {
+    if (new_roots) lv_mem_free(new_roots);
+    if (new_displays) lv_mem_free(new_displays);
+    return UI_BLOB_E_NOMEM;
+  }
+  ui_blob_unload();
+  memset(new_roots, 0, sizeof(lv_obj_t *) * h->screen_count);
+  memset(new_displays, 0, sizeof(lv_obj_t *) * h->screen_count);
+  blob = (const uint8_t *)data;
+  hdr = h;
+  screens = (const ui_blob_screen_t *)(blob + h->screens_off);
+  widgets = (const ui_blob_widget_t *)(blob + h->widgets_off);
+  styles = (const ui_blob_style_t *)(blob + h->styles_off);
+  strings = (const uint32_t *)(blob + h->strings_off);
+  messages = (const uint16_t *)(blob + h->messages_off);
+  roots = new_roots;
+  displays = new_displays;
+  return UI_BLOB_OK;
+}
+
+int ui_blob_load_file(const char * path) {
+#if UI_BLOB_MMAP
+  int fd = open(path, O_RDONLY);
+  if (fd < 0) return UI_BLOB_E_IO;
+  struct stat st;
+  if (fstat(fd, &st) != 0 || st.st_size <= 0 || (uint64_t)st.st_size > UINT32_MAX) {
+    close(fd);
+    return UI_BLOB_E_IO;
+  }
+  void * map = mmap(NULL, (size_t)st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+  close(fd);
+  if (map == MAP_FAILED) return UI_BLOB_E_IO;
+  int err = ui_blob_load(map, (uint32_t)st.st_size);
+  if (err != UI_BLOB_OK) {
+    munmap(map, (size_t)st.st_size);
+    return err;
+  }
+  if (mapping) munmap(mapping, mapping_size); /* the old UI was deleted by ui_blob_load */
+  mapping = map;
+  mapping_size = (size_t)st.st_size;
+  return UI_BLOB_OK;
+#else
+  (void)path;
+  return UI_BLOB_E_IO;
+#endif
+}
+
+void ui_blob_show_screen(int id) {
+  if (hdr == NULL || id < 0 || id >= hdr->screen_count || id == active) return;
+  if (roots[id] == NULL) {
+    roots[id] = ui_blob_root();
+    display_label = NULL;
+    ui_blob_build(&screens[id], roots[id]);
+    displays[id] = display_label;
+  } else {
+    lv_obj_clear_flag(roots[id], LV_OBJ_FLAG_HIDDEN);
+  }
+  if (active >= 0) lv_obj_add_flag(roots[active], LV_OBJ_FLAG_HIDDEN);
+  active = id;
+  display_label = displays[id];
+}
+
+const char * ui_blob_strerror(int err) {
+  switch (err) {
+  case UI_BLOB_OK: return "ok";
+  case UI_BLOB_E_IO: return "cannot open or map the file";
+  case UI_BLOB_E_FORMAT: return "not a UI blob";
+  case UI_BLOB_E_VERSION: return "unsupported blob version";
+  case UI_BLOB_E_SIZE: return "truncated blob";
+  case UI_BLOB_E_CHECKSUM: return "checksum mismatch";
+  case UI_BLOB_E_RANGE: return "corrupt blob (offset or index out of range)";
+  case UI_BLOB_E_NOMEM: return "out of LVGL memory";
+  default: return "unknown error";
+  }
+}
+"""
+
+
+def loader_header() -> str:
+  return LOADER_H.replace("@VERSION@", str(VERSION))
+
+
+def loader_source() -> str:
+  fonts = "\n".join(
+    f"#if LV_FONT_MONTSERRAT_{size}\n  case {size}: return &lv_font_montserrat_{size};\n#endif" for size in FONT_SIZES
+  )
+  return LOADER_C.replace("@FONTS@", fonts)
@@ -0,0 +1,45 @@
+"""Pieces shared by the asset converters (imgconv, fontconv).
+
+Both emit C byte arrays and cache each converted asset as a C body plus a JSON
+meta file under $LVGL_WEB_<KIND>_CACHE or ~/.cache/lvgl_web/<kind>. Each
+converter keeps its own CONVERTER_VERSION in the cache key; bump it when the
+emitted C changes so stale cache entries are not reused.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+HEX = [f"0x{i:02x}" for i in range(256)]
+
+
+def byte_lines(data: bytes, per_line: int = 16) -> str:
+  return ",\n".join(
+    "  " + ", ".join(map(HEX.__getitem__, data[i:i + per_line])) for i in range(0, len(data), per_line)
+  )
+
+
+def env_cache_dir(env_var: str, kind: str) -> Path:
+  env = os.environ.get(env_var)
+  if env:
+    return Path(env).expanduser()
+  base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+  return Path(base) / "lvgl_web" / kind
+
+
+def load_entry(text_path: Path, meta_path: Path) -> tuple[str, dict] | None:
+  """(text, meta) of a cache entry, or None when it is missing or unreadable."""
+  try:
+    return text_path.read_text(encoding="utf-8"), json.loads(meta_path.read_text(encoding="utf-8"))
+  except (OSError, ValueError):
+    return None
+
+
+def store_entry(text_path: Path, text: str, meta_path: Path, meta: dict) -> None:
+  """Write both files atomically, so a concurrent reader never sees a partial entry."""
+  text_path.parent.mkdir(parents=True, exist_ok=True)
+  for target, content in ((text_path, text), (meta_path, json.dumps(meta, sort_keys=True))):
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, target)
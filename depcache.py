@@ -0,0 +1,176 @@
+"""Shared git dependency cache for `main.py --build`.
+
+Each dependency is fetched once into a bare mirror shared by all projects:
+
+  <cache>/<name>.git          # bare repo, shallow-fetched per ref into refs/deps/<ref>
+  <cache>/resolved.json       # {"<name>@<ref>": "<commit>"}, the integrity record
+
+and checked out into a project's `.deps/<name>` as a detached `git worktree`
+of that mirror, so objects are stored once. The first resolution of a ref is
+recorded and every later checkout must match it (or the pinned `commit`), so a
+moved tag or tampered mirror fails loudly; branch refs such as `master` stay
+pinned to their first resolution until `refresh=True`. `offline=True` never touches the
+network and resolves only from the cache. URLs may be anything git accepts,
+including `file://` paths to local bare repos.
+
+The cache defaults to $LVGL_WEB_DEPS_CACHE or ~/.cache/lvgl_web/deps.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+  import fcntl
+except ImportError:  # not POSIX: no cross-process locking
+  fcntl = None
+
+RESOLVED_NAME = "resolved.json"
+
+
+class Dependency:
+  def __init__(self, name: str, urls: list[str], ref: str, commit: str | None = None):
+    self.name = name
+    self.urls = list(dict.fromkeys(urls))  # drop duplicate fallbacks, keep order
+    self.ref = ref
+    self.commit = commit
+
+  @property
+  def key(self) -> str:
+    return f"{self.name}@{self.ref}"
+
+
+class DependencyError(RuntimeError):
+  pass
+
+
+def default_cache_dir() -> Path:
+  env = os.environ.get("LVGL_WEB_DEPS_CACHE")
+  if env:
+    return Path(env).expanduser()
+  base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+  return Path(base) / "lvgl_web" / "deps"
+
+
+def _git(*args: str, cwd: Path | None = None) -> str:
+  proc = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+  if proc.returncode != 0:
+    raise DependencyError(f"git {' '.join(args)} failed: {proc.stderr.strip()}")
+  return proc.stdout.strip()
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+  """Serialize processes sharing one mirror (parallel builds of different projects)."""
+  if fcntl is None:
+    yield
+    return
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with open(path, "w") as fh:
+    fcntl.flock(fh, fcntl.LOCK_EX)
+    try:
+      yield
+    finally:
+      fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _update_resolved(cache: Path, key: str, commit: str) -> None:
+  with _locked(cache / f"{RESOLVED_NAME}.lock"):
+    path = cache / RESOLVED_NAME
+    data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    data[key] = commit
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _recorded(cache: Path, key: str) -> str | None:
+  path = cache / RESOLVED_NAME
+  if not path.exists():
+    return None
+  return json.loads(path.read_text(encoding="utf-8")).get(key)
+
+
+def _has_commit(mirror: Path, commit: str) -> bool:
+  return subprocess.run(
+    ["git", "--git-dir", str(mirror), "cat-file", "-e", f"{commit}^{{commit}}"], capture_output=True
+  ).returncode == 0
+
+
+def resolve(dep: Dependency, cache: Path, offline: bool = False, refresh: bool = False) -> str:
+  """Make sure the mirror holds `dep.ref` and return its verified commit hash."""
+  mirror = cache / f"{dep.name}.git"
+  expected = dep.commit or (None if refresh else _recorded(cache, dep.key))
+  with _locked(cache / f"{dep.name}.lock"):
+    if expected and mirror.exists() and _has_commit(mirror, expected):
+      return expected
+    if offline:
+      raise DependencyError(
+        f"{dep.key} is not in the dependency cache {cache}; run once without --offline to populate it"
+      )
+    if not mirror.exists():
+      _git("init", "--bare", "--quiet", str(mirror))
+    errors = []
+    for url in dep.urls:
+      print(f"[deps] fetching {dep.key} from {url}")
+      try:
+        _git("--git-dir", str(mirror), "fetch", "--depth=1", "--quiet", url, f"+{dep.ref}:refs/deps/{dep.ref}")
+        break
+      except DependencyError as exc:
+        errors.append(str(exc))
+    else:
+      raise DependencyError(f"all fetch attempts failed for {dep.key}: " + "; ".join(errors))
+    commit = _git("--git-dir", str(mirror), "rev-parse", f"refs/deps/{dep.ref}^{{commit}}")
+  if expected and commit != expected:
+    raise DependencyError(f"{dep.key} resolved to {commit}, expected {expected}")
+  _update_resolved(cache, dep.key, commit)
+  return commit
+
+
+def checkout(dep: Dependency, commit: str, cache: Path, dest: Path) -> None:
+  """Check `commit` out at `dest` as a worktree of the shared mirror, reusing a matching checkout."""
+  mirror = cache / f"{dep.name}.git"
+  if dest.exists():
+    head = None
+    if (dest / ".git").exists():
+      try:
+        head = _git("-C", str(dest), "rev-parse", "HEAD")
+      except DependencyError:
+        pass
+    if head == commit:
+      print(f"[deps] {dep.name} already at {commit[:12]} in {dest}")
+      return
+    print(f"[deps] replacing {dest} ({head[:12] if head else 'not a checkout'} != {commit[:12]})")
+    shutil.rmtree(dest)
+  dest.parent.mkdir(parents=True, exist_ok=True)
+  with _locked(cache / f"{dep.name}.lock"):
+    _git("--git-dir", str(mirror), "worktree", "prune")
+    _git("--git-dir", str(mirror), "worktree", "add", "--detach", "--quiet", str(dest.resolve()), commit)
+  head = _git("-C", str(dest), "rev-parse", "HEAD")
+  if head != commit:
+    raise DependencyError(f"{dest} checked out {head}, expected {commit}")
+  print(f"[deps] {dep.name} {dep.ref} -> {dest} ({commit[:12]})")
+
+
+def ensure_deps(
+  deps: list[Dependency],
+  deps_dir: Path,
+  cache: Path,
+  offline: bool = False,
+  refresh: bool = False,
+) -> dict[str, str]:
+  """Resolve and check out all dependencies concurrently; returns {name: commit}."""
+  def one(dep: Dependency) -> tuple[str, str]:
+    commit = resolve(dep, cache, offline, refresh)
+    checkout(dep, commit, cache, deps_dir / dep.name)
+    return dep.name, commit
+
+  cache.mkdir(parents=True, exist_ok=True)
+  with ThreadPoolExecutor(max_workers=max(1, len(deps))) as pool:
+    return dict(pool.map(one, deps))
@@ -0,0 +1,186 @@
+"""Display profiles: panel geometry, draw buffers, refresh mode and rotation.
+
+A profile drives the generated main.c (draw buffers, disp_drv flags), lv_drv_conf.h
+(resolution, DISP_* switches) and lv_conf.h (refresh period). Pick a built-in with
+`--display NAME` (`--list-displays` prints them with their memory cost) or load a
+TOML file with `--display panel.toml`:
+
+  base = "partial"          # optional built-in to start from
+  name = "my-panel"
+  width = 800               # physical panel resolution
+  height = 480
+  ram_kib = 192             # draw buffer budget; buffer lines are derived from it
+  lines = 40                # optional: fixed buffer lines instead of ram_kib
+  buffers = 2               # 1 = render and flush take turns, 2 = overlap them
+  refresh = "partial"       # or "full" (needs screen-sized buffers)
+  rotation = 90             # 0, 90, 180 or 270
+  rotate = "hw"             # "hw": the panel/framebuffer is already rotated, "sw": LVGL rotates every flush
+  refr_period_ms = 16       # optional LV_DISP_DEF_REFR_PERIOD
+  note = "..."
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+try:
+  import tomllib
+except ImportError:  # Python < 3.11
+  try:
+    import tomli as tomllib
+  except ImportError:
+    tomllib = None
+
+DEFAULT_PROFILE = "legacy"
+_FIELDS = ("name", "width", "height", "ram_kib", "lines", "buffers", "refresh", "rotation", "rotate", "refr_period_ms", "note")
+
+
+class DisplayProfile:
+  def __init__(
+    self,
+    name: str,
+    width: int = 1024,
+    height: int = 600,
+    ram_kib: int | None = 256,
+    lines: int | None = None,
+    buffers: int = 2,
+    refresh: str = "partial",
+    rotation: int = 0,
+    rotate: str = "hw",
+    refr_period_ms: int | None = None,
+    note: str = "",
+  ):
+    if buffers not in (1, 2):
+      raise ValueError(f"display {name}: buffers must be 1 or 2, not {buffers}")
+    if refresh not in ("partial", "full"):
+      raise ValueError(f"display {name}: refresh must be 'partial' or 'full', not {refresh!r}")
+    if rotation not in (0, 90, 180, 270):
+      raise ValueError(f"display {name}: rotation must be 0, 90, 180 or 270, not {rotation}")
+    if rotate not in ("hw", "sw"):
+      raise ValueError(f"display {name}: rotate must be 'hw' or 'sw', not {rotate!r}")
+    if refresh == "partial" and lines is None and not ram_kib:
+      raise ValueError(f"display {name}: set either lines or ram_kib")
+    self.name = name
+    self.width = width
+    self.height = height
+    self.ram_kib = ram_kib
+    self.lines = lines
+    self.buffers = buffers
+    self.refresh = refresh
+    self.rotation = rotation
+    self.rotate = rotate
+    self.refr_period_ms = refr_period_ms
+    self.note = note
+
+  @property
+  def sw_rotated(self) -> bool:
+    return self.rotate == "sw" and self.rotation != 0
+
+  def resolution(self) -> tuple[int, int]:
+    """disp_drv hor_res/ver_res: physical for software rotation, already rotated for hardware rotation."""
+    if self.rotate == "hw" and self.rotation in (90, 270):
+      return self.height, self.width
+    return self.width, self.height
+
+  def ui_resolution(self) -> tuple[int, int]:
+    """Screen size the UI is laid out on: LVGL swaps hor_res/ver_res itself for software rotation by 90/270."""
+    width, height = self.resolution()
+    if self.sw_rotated and self.rotation in (90, 270):
+      return height, width
+    return width, height
+
+  def buffer_lines(self, color_depth: int) -> int:
+    width, height = self.resolution()
+    if self.lines is not None:
+      return max(1, min(height, self.lines))
+    if self.refresh == "full":
+      return height  # LVGL ignores full_refresh unless the buffers cover the whole screen
+    px_bytes = max(1, color_depth // 8)
+    return max(1, min(height, self.ram_kib * 1024 // (self.buffers * width * px_bytes)))
+
+  def buffer_bytes(self, color_depth: int) -> int:
+    width, _ = self.resolution()
+    return self.buffers * width * self.buffer_lines(color_depth) * max(1, color_depth // 8)
+
+  def memory_note(self, color_depth: int) -> str:
+    width, height = self.resolution()
+    lines = self.buffer_lines(color_depth)
+    text = (
+      f"{self.buffers} x {width}x{lines} px x {max(1, color_depth // 8)} B = "
+      f"{self.buffer_bytes(color_depth) / 1024:.0f} KiB of draw buffers ({lines * 100 // height}% of the screen each)"
+    )
+    if self.sw_rotated and self.rotation in (90, 270):
+      text += " + LV_DISP_ROT_MAX_BUF rotation scratch"
+    return text
+
+
+BUILTIN_PROFILES = {
+  p.name: p for p in (
+    DisplayProfile(
+      "legacy", lines=80, ram_kib=None, refresh="full", rotation=90, rotate="sw",
+      note="Previous fixed setup. LVGL drops full_refresh because the buffers are not screen-sized, "
+           "and every flushed pixel is rotated by 90 degrees on the CPU.",
+    ),
+    DisplayProfile(
+      "partial", ram_kib=256,
+      note="Landscape, partial refresh: only invalidated areas are redrawn; "
+           "the second buffer lets LVGL render the next chunk while one is flushed.",
+    ),
+    DisplayProfile(
+      "partial-single", ram_kib=96, buffers=1,
+      note="Smallest RAM footprint; rendering waits for every flush to finish.",
+    ),
+    DisplayProfile(
+      "full", ram_kib=None, refresh="full",
+      note="Two screen-sized buffers, whole-frame redraw on every change. "
+           "Tear-free, but only pays off when the flush is a cheap page flip.",
+    ),
+    DisplayProfile(
+      "portrait-hw", ram_kib=256, rotation=90, rotate="hw",
+      note="Portrait with the panel controller or framebuffer doing the rotation; "
+           "LVGL renders in portrait geometry directly, no per-pixel rotation cost.",
+    ),
+    DisplayProfile(
+      "portrait-sw", ram_kib=256, rotation=90, rotate="sw",
+      note="Portrait on a panel that cannot rotate: partial refresh, but each flushed area is rotated on the CPU.",
+    ),
+  )
+}
+
+
+def load_profile(spec: str | None) -> DisplayProfile:
+  """A built-in profile name, or a TOML file overriding a built-in (`base`, default "partial")."""
+  spec = spec or DEFAULT_PROFILE
+  if spec in BUILTIN_PROFILES:
+    return BUILTIN_PROFILES[spec]
+  path = Path(spec)
+  if path.suffix != ".toml" or not path.is_file():
+    raise ValueError(f"Unknown display profile {spec!r} (built-ins: {', '.join(BUILTIN_PROFILES)}; or a .toml file)")
+  if tomllib is None:
+    raise RuntimeError("Reading display profiles needs Python 3.11+ or the 'tomli' package")
+  with path.open("rb") as fh:
+    data = tomllib.load(fh)
+  base = data.pop("base", "partial")
+  if base not in BUILTIN_PROFILES:
+    raise ValueError(f"{path}: unknown base profile {base!r}")
+  unknown = set(data) - set(_FIELDS)
+  if unknown:
+    raise ValueError(f"{path}: unknown display keys {', '.join(sorted(unknown))}")
+  fields = {key: getattr(BUILTIN_PROFILES[base], key) for key in _FIELDS}
+  fields.update(name=path.stem, note="")
+  if "ram_kib" in data and "lines" not in data:
+    fields["lines"] = None
+  if data.get("refresh") == "full" and "lines" not in data:
+    fields["lines"] = None
+  fields.update(data)
+  return DisplayProfile(**fields)
+
+
+def describe_profiles(color_depth: int) -> list[str]:
+  lines = []
+  for profile in BUILTIN_PROFILES.values():
+    width, height = profile.resolution()
+    rotation = f", rotated {profile.rotation} ({profile.rotate})" if profile.rotation else ""
+    lines.append(f"{profile.name}: {width}x{height}, {profile.refresh} refresh{rotation}")
+    lines.append(f"    {profile.memory_note(color_depth)}")
+    lines.append(f"    {profile.note}")
+  return lines
@@ -0,0 +1,180 @@
+"""Subset glyph fonts for `main.py --fonts subset`.
+
+Rasterizes only the code points the UI actually draws (see util.font_usage) from a
+TTF/OTF with Pillow's FreeType binding and emits an LVGL v8 `lv_font_t` in the
+`lv_font_fmt_txt` format, the same layout lv_font_conv produces: an
+`bpp`-bit anti-aliased bitmap per glyph, packed without row padding, and
+sparse cmaps with one 16-bit offset list per 64K window of code points. This is
+what makes CJK text practical: a screen with 40 distinct Hanzi carries 40
+glyphs instead of a complete font.
+
+Converted sources are cached by (font file hash, size, bpp, code points) in
+$LVGL_WEB_FONT_CACHE or ~/.cache/lvgl_web/font. Pillow is only needed on a miss.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from convcache import byte_lines, env_cache_dir, load_entry, store_entry
+
+try:
+  from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+  Image = ImageDraw = ImageFont = None
+
+CONVERTER_VERSION = 2  # part of every cache key, see convcache
+# unicode_list entries are uint16 offsets from range_start and range_length is a
+# uint16 as well, so a window must span at most 0xFFFF code points (offsets <= 0xFFFE).
+CMAP_WINDOW = 0xFFFF
+
+
+class ConvertedFont:
+  def __init__(self, source: str, meta: dict):
+    self.source = source
+    self.meta = meta
+
+
+def default_cache_dir() -> Path:
+  return env_cache_dir("LVGL_WEB_FONT_CACHE", "font")
+
+
+def font_symbol(size: int) -> str:
+  return f"ui_font_{size}"
+
+
+def _require_libs() -> None:
+  if ImageFont is None:
+    raise RuntimeError("--fonts subset needs Pillow with FreeType support (pip install pillow)")
+
+
+def _render(font, ch: str, bpp: int) -> tuple[dict, bytes]:
+  """One glyph as (metrics, packed bitmap); metrics follow lv_font_fmt_txt_glyph_dsc_t."""
+  x0, y0, x1, y1 = font.getbbox(ch, anchor="ls")
+  w, h = max(0, x1 - x0), max(0, y1 - y0)
+  glyph = {"adv_w": round(font.getlength(ch) * 16), "box_w": w, "box_h": h, "ofs_x": x0, "ofs_y": -y1}
+  if not w or not h:
+    glyph.update(box_w=0, box_h=0, ofs_x=0, ofs_y=0)
+    return glyph, b""
+  img = Image.new("L", (w, h), 0)
+  ImageDraw.Draw(img).text((-x0, -y0), ch, font=font, fill=255, anchor="ls")
+  # Pixels are packed MSB first and continue across rows (bitmap_format 0).
+  shift = 8 - bpp
+  out = bytearray()
+  acc = nbits = 0
+  for value in img.tobytes():
+    acc = (acc << bpp) | (value >> shift)
+    nbits += bpp
+    if nbits == 8:
+      out.append(acc)
+      acc = nbits = 0
+  if nbits:
+    out.append(acc << (8 - nbits))
+  return glyph, bytes(out)
+
+
+def _cmap_windows(codepoints: list[int]) -> list[list[int]]:
+  windows: list[list[int]] = []
+  for cp in codepoints:
+    if windows and cp - windows[-1][0] < CMAP_WINDOW:
+      windows[-1].append(cp)
+    else:
+      windows.append([cp])
+  return windows
+
+
+def convert(font_path: Path, size: int, codepoints: list[int], bpp: int = 4) -> ConvertedFont:
+  _require_libs()
+  if bpp not in (1, 2, 4, 8):
+    raise ValueError(f"bpp must be 1, 2, 4 or 8, not {bpp}")
+  font = ImageFont.truetype(str(font_path), size)
+  ascent, descent = font.getmetrics()
+  # Pillow draws .notdef for code points the font lacks; compare against it to report them.
+  notdef = _render(font, "\U0010ffff", bpp)
+  glyphs, bitmap, missing = [], bytearray(), []
+  for cp in codepoints:
+    glyph, data = _render(font, chr(cp), bpp)
+    if data and (glyph, data) == notdef:
+      missing.append(cp)
+    glyph["bitmap_index"] = len(bitmap)
+    glyphs.append(glyph)
+    bitmap += data
+  sym = font_symbol(size)
+  lines = [
+    f"/* {sym}: {len(codepoints)} glyphs at {size} px, {bpp} bpp (generated by --fonts subset) */",
+    '#include "lvgl.h"',
+    "",
+    "static LV_ATTRIBUTE_LARGE_CONST const uint8_t glyph_bitmap[] = {",
+    byte_lines(bytes(bitmap) or b"\0"),
+    "};",
+    "",
+    "static const lv_font_fmt_txt_glyph_dsc_t glyph_dsc[] = {",
+    "  {.bitmap_index = 0, .adv_w = 0, .box_w = 0, .box_h = 0, .ofs_x = 0, .ofs_y = 0}, /* id 0: reserved */",
+  ]
+  for cp, g in zip(codepoints, glyphs):
+    lines.append(
+      f"  {{.bitmap_index = {g['bitmap_index']}, .adv_w = {g['adv_w']}, .box_w = {g['box_w']}, "
+      f".box_h = {g['box_h']}, .ofs_x = {g['ofs_x']}, .ofs_y = {g['ofs_y']}}}, /* U+{cp:04X} */"
+    )
+  lines += ["};", ""]
+  windows = _cmap_windows(codepoints)
+  cmaps = []
+  glyph_id = 1
+  for i, window in enumerate(windows):
+    start = window[0]
+    lines.append(f"static const uint16_t unicode_list_{i}[] = {{")
+    lines.append(",\n".join(
+      "  " + ", ".join(f"0x{cp - start:x}" for cp in window[j:j + 12]) for j in range(0, len(window), 12)
+    ))
+    lines += ["};", ""]
+    cmaps.append(
+      f"  {{.range_start = {start}, .range_length = {window[-1] - start + 1}, .glyph_id_start = {glyph_id}, "
+      f".unicode_list = unicode_list_{i}, .glyph_id_ofs_list = NULL, .list_length = {len(window)}, "
+      ".type = LV_FONT_FMT_TXT_CMAP_SPARSE_TINY},"
+    )
+    glyph_id += len(window)
+  lines += ["static const lv_font_fmt_txt_cmap_t cmaps[] = {", *cmaps, "};", ""]
+  lines += [
+    "static lv_font_fmt_txt_glyph_cache_t cache;",
+    "",
+    "static const lv_font_fmt_txt_dsc_t font_dsc = {",
+    "  .glyph_bitmap = glyph_bitmap,",
+    "  .glyph_dsc = glyph_dsc,",
+    "  .cmaps = cmaps,",
+    "  .kern_dsc = NULL,",
+    "  .kern_scale = 0,",
+    f"  .cmap_num = {len(windows)},",
+    f"  .bpp = {bpp},",
+    "  .kern_classes = 0,",
+    "  .bitmap_format = 0,",
+    "  .cache = &cache,",
+    "};",
+    "",
+    f"const lv_font_t {sym} = {{",
+    "  .get_glyph_dsc = lv_font_get_glyph_dsc_fmt_txt,",
+    "  .get_glyph_bitmap = lv_font_get_bitmap_fmt_txt,",
+    f"  .line_height = {ascent + descent},",
+    f"  .base_line = {descent},",
+    "  .subpx = LV_FONT_SUBPX_NONE,",
+    "  .dsc = &font_dsc,",
+    "};",
+  ]
+  meta = {"glyphs": len(codepoints), "bitmap_bytes": len(bitmap), "missing": missing}
+  return ConvertedFont("\n".join(lines) + "\n", meta)
+
+
+def convert_cached(
+  font_path: Path, size: int, codepoints: list[int], bpp: int, cache_dir: Path
+) -> tuple[ConvertedFont, bool]:
+  """Convert through the cache; returns (font, cache_hit)."""
+  h = hashlib.sha256(font_path.read_bytes())
+  h.update(json.dumps({"size": size, "bpp": bpp, "cps": codepoints, "v": CONVERTER_VERSION}).encode("utf-8"))
+  key = h.hexdigest()
+  source_path, meta_path = cache_dir / f"{key}.c", cache_dir / f"{key}.json"
+  entry = load_entry(source_path, meta_path)
+  if entry is not None:
+    return ConvertedFont(*entry), True
+  font = convert(font_path, size, codepoints, bpp)
+  store_entry(source_path, font.source, meta_path, font.meta)
+  return font, False
@@ -0,0 +1,264 @@
+"""`<img src>` assets -> LVGL v8 `lv_img_dsc_t` C arrays.
+
+Images are decoded with Pillow, scaled to the requested width/height, and
+converted with NumPy array operations into the pixel layout of the configured
+LV_COLOR_DEPTH (32: BGRA8888, 16: RGB565 with optional LV_COLOR_16_SWAP, 8: RGB332),
+optionally with an alpha byte per pixel (LV_IMG_CF_TRUE_COLOR_ALPHA).
+
+With `rle=True` the pixel data is stored run-length encoded in flash and expanded
+into a heap buffer by `ui_images_init()` at start-up; an image keeps its raw
+form when RLE would not make it smaller.
+
+Converted C bodies are cached by (source hash, target format) in
+$LVGL_WEB_IMG_CACHE or ~/.cache/lvgl_web/img, so unchanged assets cost a
+hash and a file read. Pillow and NumPy are only needed on a cache miss.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from convcache import byte_lines, env_cache_dir, load_entry, store_entry
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+try:
+  from PIL import Image
+except ImportError:
+  Image = None
+
+CONVERTER_VERSION = 1  # part of every cache key, see convcache
+SYMBOL_TOKEN = "@SYM@"
+RLE_MIN_RUN = 3  # shorter runs are cheaper as part of a literal block
+RLE_MAX_BLOCK = 0x7F
+
+
+class ImageFormat:
+  def __init__(self, depth: int = 32, swap16: bool = False, alpha: str = "auto", rle: bool = False):
+    if depth not in (8, 16, 32):
+      raise ValueError(f"LV_COLOR_DEPTH {depth} is not supported for images (use 8, 16 or 32)")
+    if alpha not in ("auto", "always", "never"):
+      raise ValueError(f"alpha must be 'auto', 'always' or 'never', not {alpha!r}")
+    self.depth = depth
+    self.swap16 = swap16 and depth == 16
+    self.alpha = alpha
+    self.rle = rle
+
+  def key(self) -> dict:
+    return {"depth": self.depth, "swap16": self.swap16, "alpha": self.alpha, "rle": self.rle, "v": CONVERTER_VERSION}
+
+
+class ConvertedImage:
+  """A converted image; `body` is the C source with SYMBOL_TOKEN in place of the symbol."""
+
+  def __init__(self, body: str, meta: dict):
+    self.body = body
+    self.meta = meta
+
+  def source_for(self, symbol: str) -> str:
+    return self.body.replace(SYMBOL_TOKEN, symbol)
+
+
+def default_cache_dir() -> Path:
+  return env_cache_dir("LVGL_WEB_IMG_CACHE", "img")
+
+
+def _require_libs() -> None:
+  if np is None or Image is None:
+    raise RuntimeError("Converting <img> assets needs NumPy and Pillow (pip install numpy pillow)")
+
+
+def load_rgba(path: Path, width: int | None, height: int | None):
+  """Decode to an (h, w, 4) uint8 array; a single given dimension keeps the aspect ratio."""
+  _require_libs()
+  with Image.open(path) as img:
+    img = img.convert("RGBA")
+    if width or height:
+      w0, h0 = img.size
+      w = width or max(1, round(w0 * height / h0))
+      h = height or max(1, round(h0 * width / w0))
+      if (w, h) != img.size:
+        img = img.resize((w, h), Image.LANCZOS)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def pack_pixels(rgba, fmt: ImageFormat, alpha: bool):
+  """(h, w, 4) RGBA -> (h*w, px_size) uint8 in lv_color_t byte order, vectorized."""
+  pixels = rgba.reshape(-1, 4)
+  r, g, b, a = (pixels[:, i] for i in range(4))
+  if fmt.depth == 32:
+    # lv_color32_t is {blue, green, red, alpha}; plain TRUE_COLOR keeps alpha at 0xFF.
+    return np.stack([b, g, r, a if alpha else np.full_like(a, 0xFF)], axis=1)
+  if fmt.depth == 16:
+    r16, g16, b16 = (c.astype(np.uint16) for c in (r, g, b))
+    value = ((r16 >> 3) << 11) | ((g16 >> 2) << 5) | (b16 >> 3)
+    color = value.astype(">u2" if fmt.swap16 else "<u2").view(np.uint8).reshape(-1, 2)
+  else:
+    value = ((r >> 5) << 5) | ((g >> 5) << 2) | (b >> 6)
+    color = value.astype(np.uint8).reshape(-1, 1)
+  return np.concatenate([color, a.reshape(-1, 1)], axis=1) if alpha else color
+
+
+def rle_encode(pixels) -> bytes:
+  """Pixel-wise RLE: ctrl < 0x80 repeats the next pixel ctrl times, ctrl >= 0x80 copies (ctrl & 0x7F) literal pixels.
+
+  Run boundaries are found with NumPy; the Python loop only visits runs and literal blocks.
+  """
+  n, px_size = pixels.shape
+  keys = np.zeros(n, dtype=np.uint32)
+  for i in range(px_size):
+    keys |= pixels[:, i].astype(np.uint32) << (8 * i)
+  starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+  lengths = np.diff(np.append(starts, n))
+  flat = pixels.tobytes()
+  out = bytearray()
+
+  def literal(begin: int, end: int) -> None:
+    while begin < end:
+      count = min(RLE_MAX_BLOCK, end - begin)
+      out.append(0x80 | count)
+      out.extend(flat[begin * px_size:(begin + count) * px_size])
+      begin += count
+
+  lit_start = 0
+  long_runs = lengths >= RLE_MIN_RUN
+  for start, length in zip(starts[long_runs].tolist(), lengths[long_runs].tolist()):
+    literal(lit_start, start)
+    lit_start = start + length
+    pixel = flat[start * px_size:(start + 1) * px_size]
+    while length > 0:
+      count = min(RLE_MAX_BLOCK, length)
+      out.append(count)
+      out += pixel
+      length -= count
+  literal(lit_start, n)
+  return bytes(out)
+
+
+def convert(path: Path, width: int | None, height: int | None, fmt: ImageFormat) -> ConvertedImage:
+  rgba = load_rgba(path, width, height)
+  h, w = rgba.shape[:2]
+  alpha = fmt.alpha == "always" or (fmt.alpha == "auto" and bool((rgba[:, :, 3] != 0xFF).any()))
+  pixels = pack_pixels(rgba, fmt, alpha)
+  raw = pixels.tobytes()
+  cf = "LV_IMG_CF_TRUE_COLOR_ALPHA" if alpha else "LV_IMG_CF_TRUE_COLOR"
+  packed = rle_encode(pixels) if fmt.rle else None
+  use_rle = packed is not None and len(packed) < len(raw)
+  meta = {"w": w, "h": h, "cf": cf, "data_size": len(raw), "flash_bytes": len(packed) if use_rle else len(raw), "rle": use_rle}
+  lines = ['#include "lvgl.h"', ""]
+  if use_rle:
+    lines += [
+      '#include "ui_images.h"',
+      "",
+      f"static const uint8_t {SYMBOL_TOKEN}_rle[] = {{",
+      byte_lines(packed),
+      "};",
+      "",
+      f"lv_img_dsc_t {SYMBOL_TOKEN} = {{",
+    ]
+  else:
+    lines += [
+      f"const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_LARGE_CONST uint8_t {SYMBOL_TOKEN}_map[] = {{",
+      byte_lines(raw),
+      "};",
+      "",
+      f"const lv_img_dsc_t {SYMBOL_TOKEN} = {{",
+    ]
+  lines += [
+    "  .header.always_zero = 0,",
+    f"  .header.cf = {cf},",
+    f"  .header.w = {w},",
+    f"  .header.h = {h},",
+    f"  .data_size = {len(raw)},",
+    "  .data = NULL," if use_rle else f"  .data = {SYMBOL_TOKEN}_map,",
+    "};",
+  ]
+  if use_rle:
+    px_size = pixels.shape[1]
+    lines += [
+      "",
+      f"void {SYMBOL_TOKEN}_init(void) {{",
+      f"  if ({SYMBOL_TOKEN}.data == NULL) {{",
+      f"    {SYMBOL_TOKEN}.data = ui_img_rle_expand({SYMBOL_TOKEN}_rle, {len(raw)}, {px_size});",
+      "  }",
+      "}",
+    ]
+  return ConvertedImage("\n".join(lines) + "\n", meta)
+
+
+def empty_image() -> ConvertedImage:
+  """0x0 stand-in for a missing or undecodable source, so the firmware still links."""
+  body = "\n".join([
+    '#include "lvgl.h"',
+    "",
+    f"const lv_img_dsc_t {SYMBOL_TOKEN} = {{",
+    "  .header.cf = LV_IMG_CF_TRUE_COLOR_ALPHA,",
+    "  .data_size = 0,",
+    "  .data = NULL,",
+    "};",
+  ]) + "\n"
+  return ConvertedImage(body, {"w": 0, "h": 0, "cf": "LV_IMG_CF_TRUE_COLOR_ALPHA", "data_size": 0, "flash_bytes": 0, "rle": False})
+
+
+def convert_cached(
+  path: Path, width: int | None, height: int | None, fmt: ImageFormat, cache_dir: Path
+) -> tuple[ConvertedImage, bool]:
+  """Convert through the cache; returns (image, cache_hit)."""
+  h = hashlib.sha256(path.read_bytes())
+  h.update(json.dumps({"fmt": fmt.key(), "w": width, "h": height}, sort_keys=True).encode("utf-8"))
+  key = h.hexdigest()
+  body_path, meta_path = cache_dir / f"{key}.c.in", cache_dir / f"{key}.json"
+  entry = load_entry(body_path, meta_path)
+  if entry is not None:
+    return ConvertedImage(*entry), True
+  image = convert(path, width, height, fmt)
+  store_entry(body_path, image.body, meta_path, image.meta)
+  return image, False
+
+
+def header_lines(symbols: dict[str, bool]) -> list[str]:
+  """ui_images.h for {symbol: is_rle}."""
+  lines = ["#pragma once", '#include "lvgl.h"', ""]
+  for sym, rle in symbols.items():
+    lines.append(f"extern lv_img_dsc_t {sym};" if rle else f"LV_IMG_DECLARE({sym});")
+  lines += ["", "const uint8_t * ui_img_rle_expand(const uint8_t * src, uint32_t size, uint32_t px_size);"]
+  lines.append("void ui_images_init(void);")
+  return lines
+
+
+def init_source_lines(symbols: dict[str, bool]) -> list[str]:
+  """ui_images.c: the RLE expander and ui_images_init() decoding every RLE image once."""
+  rle = [sym for sym, is_rle in symbols.items() if is_rle]
+  lines = ['#include "ui_images.h"', "#include <stdlib.h>", "#include <string.h>", ""]
+  lines += [f"void {sym}_init(void);" for sym in rle]
+  if rle:
+    lines.append("")
+  lines += [
+    "const uint8_t * ui_img_rle_expand(const uint8_t * src, uint32_t size, uint32_t px_size) {",
+    "  uint8_t * buf = malloc(size);",
+    "  if (buf == NULL) return NULL;",
+    "  uint8_t * dst = buf;",
+    "  uint8_t * end = buf + size;",
+    "  while (dst < end) {",
+    "    uint32_t ctrl = *src++;",
+    "    uint32_t count = ctrl & 0x7F;",
+    "    if (ctrl & 0x80) {",
+    "      memcpy(dst, src, count * px_size);",
+    "      src += count * px_size;",
+    "      dst += count * px_size;",
+    "    } else {",
+    "      for (uint32_t i = 0; i < count; i++, dst += px_size) memcpy(dst, src, px_size);",
+    "      src += px_size;",
+    "    }",
+    "  }",
+    "  return buf;",
+    "}",
+    "",
+    "void ui_images_init(void) {",
+  ]
+  lines += [f"  {sym}_init();" for sym in rle]
+  lines.append("}")
+  return lines
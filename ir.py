@@ -0,0 +1,224 @@
+"""Typed intermediate representation between the HTML/JS parsers and the C generator.
+
+`UiIR` is what generation actually consumes: the screens (one "main" screen
+without `--screens`), each a list of widgets reduced to tag, text and the
+attributes the generator reads, plus the `messages` strings and the JS
+diagnostics that came with them. It serializes to compact JSON, so a build can:
+
+  - skip parsing: `IrCache` keeps IRs under lvgl/.ir/ keyed by the hash of the
+    input files;
+  - report what changed: `diff_ir` compares against the previous build's IR;
+  - skip generating: with `--split-units` every screen is its own translation
+    unit, and `unit_key` (screen content, screen names, whether there are
+    messages, options, generator version) tells which ones must be re-emitted.
+    A one-label edit then rewrites and recompiles one screens/*.c file.
+
+`main.py --dump-ir` prints the IR with the resolved geometry of every widget.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+from output import sha256_bytes
+from display import load_profile
+from util import BUTTON_TAGS, IMAGE_TAGS, GenOptions, Node, Screen
+
+IR_VERSION = 1
+LAST_NAME = "last.json"
+_GENERATOR_FILES = ("util.py", "layout.py", "jslex.py", "display.py", "ir.py")
+_generator_digests: dict[tuple[str, ...], str] = {}
+
+
+class IrWidget(NamedTuple):
+  tag: str
+  text: str
+  attrs: tuple[tuple[str, str], ...]
+
+  @classmethod
+  def from_node(cls, node: Node) -> IrWidget:
+    return cls(node.tag, node.text, tuple(node.attrs.items()))
+
+  def to_node(self) -> Node:
+    return Node(self.tag, self.text, dict(self.attrs))
+
+
+class IrScreen(NamedTuple):
+  name: str
+  widgets: tuple[IrWidget, ...]
+
+  @classmethod
+  def from_screen(cls, screen: Screen) -> IrScreen:
+    return cls(screen.name, tuple(map(IrWidget.from_node, screen.nodes)))
+
+  def to_json(self) -> list:
+    return [self.name, [[w.tag, w.text, dict(w.attrs)] for w in self.widgets]]
+
+  @classmethod
+  def from_json(cls, data: list) -> IrScreen:
+    name, widgets = data
+    return cls(name, tuple(IrWidget(tag, text, tuple(attrs.items())) for tag, text, attrs in widgets))
+
+
+@dataclass
+class UiIR:
+  screens: list[IrScreen]
+  messages: list[str]
+  screened: bool = False  # built with --screens (otherwise one screen named "main")
+  notes: list[str] = field(default_factory=list)  # JS diagnostics, replayed on a cache hit
+
+  @classmethod
+  def from_parsed(cls, nodes: list[Node], screens: list[Screen] | None, messages: list[str], notes: list[str]) -> UiIR:
+    parts = screens if screens else [Screen("main", nodes)]
+    return cls([IrScreen.from_screen(s) for s in parts], list(messages), bool(screens), list(notes))
+
+  def nodes(self) -> list[Node]:
+    return [w.to_node() for s in self.screens for w in s.widgets]
+
+  def screen_list(self) -> list[Screen] | None:
+    """Fresh Screen objects for generation, or None without --screens."""
+    if not self.screened:
+      return None
+    return [Screen(s.name, [w.to_node() for w in s.widgets]) for s in self.screens]
+
+  def to_json(self) -> str:
+    payload = {
+      "version": IR_VERSION,
+      "screened": self.screened,
+      "screens": [s.to_json() for s in self.screens],
+      "messages": self.messages,
+      "notes": self.notes,
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+  @classmethod
+  def from_json(cls, text: str) -> UiIR:
+    data = json.loads(text)
+    if not isinstance(data, dict) or data.get("version") != IR_VERSION:
+      raise ValueError("not a current UI IR")
+    return cls([IrScreen.from_json(s) for s in data["screens"]], data["messages"], data["screened"], data["notes"])
+
+  def dump(self) -> str:
+    """Readable form for --dump-ir: every widget with its kind and resolved style."""
+    screens = []
+    for screen in self.screens:
+      widgets = []
+      for w in screen.widgets:
+        node = w.to_node()
+        resolved = {k: getattr(node.resolved, k) for k in node.resolved.__slots__ if getattr(node.resolved, k) not in (None, False)}
+        kind = "image" if w.tag in IMAGE_TAGS else "button" if w.tag in BUTTON_TAGS else "label"
+        widgets.append({"kind": kind, "tag": w.tag, "text": w.text, "attrs": dict(w.attrs), "resolved": resolved})
+      screens.append({"name": screen.name, "widgets": widgets})
+    payload = {"version": IR_VERSION, "screened": self.screened, "screens": screens, "messages": self.messages}
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+class IrDiff(NamedTuple):
+  added: list[str]
+  removed: list[str]
+  changed: dict[str, int]  # screen -> widgets that differ
+  messages: bool
+
+  @property
+  def empty(self) -> bool:
+    return not (self.added or self.removed or self.changed or self.messages)
+
+  def describe(self) -> str:
+    parts = [f"{name} ({count} widget(s))" for name, count in self.changed.items()]
+    parts += [f"+{name}" for name in self.added] + [f"-{name}" for name in self.removed]
+    if self.messages:
+      parts.append("messages")
+    return ", ".join(parts) if parts else "no changes"
+
+
+def diff_ir(old: UiIR, new: UiIR) -> IrDiff:
+  before = {s.name: s.widgets for s in old.screens}
+  after = {s.name: s.widgets for s in new.screens}
+  changed = {}
+  for name, widgets in after.items():
+    if name in before and before[name] != widgets:
+      prev = before[name]
+      changed[name] = sum(a != b for a, b in zip(prev, widgets)) + abs(len(prev) - len(widgets))
+  return IrDiff(
+    [name for name in after if name not in before],
+    [name for name in before if name not in after],
+    changed,
+    old.messages != new.messages,
+  )
+
+
+def generator_digest(files: tuple[str, ...] = _GENERATOR_FILES) -> str:
+  """Hash of the generator's own sources (read once per process), so a code change invalidates cached units."""
+  if files not in _generator_digests:
+    here = Path(__file__).resolve().parent
+    _generator_digests[files] = sha256_bytes(b"\0".join((here / name).read_bytes() for name in files))
+  return _generator_digests[files]
+
+
+def input_key(files: list[tuple[str, bytes]], options: GenOptions) -> str:
+  """Cache key of the IR built from `files` ((name, content or content hash) pairs, in parse order)."""
+  head = json.dumps([IR_VERSION, options.screens, generator_digest()]).encode("utf-8")
+  return sha256_bytes(b"\0".join([head] + [name.encode("utf-8") + b"\0" + data for name, data in files]))
+
+
+def display_fields(options: GenOptions) -> dict:
+  """The resolved display profile: `options.display` may name a .toml file whose contents change."""
+  return vars(load_profile(options.display))
+
+
+def unit_key(screen: Screen, names: list[str], messages: list[str], options: GenOptions) -> str:
+  """Everything a --split-units screen file depends on."""
+  head = [IR_VERSION, generator_digest(), names, bool(messages), dataclasses.asdict(options), display_fields(options)]
+  body = IrScreen.from_screen(screen).to_json()
+  return sha256_bytes(json.dumps([head, body], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+
+class IrCache:
+  """Serialized IRs under `root` keyed by input hash, plus what the last build used."""
+
+  def __init__(self, root: Path, keep: int = 16) -> None:
+    self.root = Path(root)
+    self.keep = keep
+
+  def _write(self, path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+      fh.write(text)
+    os.replace(tmp_name, path)
+
+  def load(self, key: str | None) -> UiIR | None:
+    if not key:
+      return None
+    try:
+      return UiIR.from_json((self.root / f"{key}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError, KeyError, TypeError):
+      return None
+
+  def store(self, key: str, ir: UiIR) -> None:
+    self._write(self.root / f"{key}.json", ir.to_json())
+    entries = sorted(
+      (p for p in self.root.glob("*.json") if p.name != LAST_NAME), key=lambda p: p.stat().st_mtime_ns, reverse=True
+    )
+    for path in entries[self.keep:]:
+      path.unlink(missing_ok=True)
+
+  def last(self) -> dict:
+    """{"ir": key of the previous build's IR, "units": {path: unit_key}, "unit_reports": {path: {"stats", "notes"}}}."""
+    try:
+      data = json.loads((self.root / LAST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      return {}
+    return data if isinstance(data, dict) and data.get("version") == IR_VERSION else {}
+
+  def save_last(self, **fields) -> None:
+    """Update the last-build record (`ir=`, `units=` and `unit_reports=`)."""
+    last = self.last()
+    state = {**last, **fields, "version": IR_VERSION}
+    if state != last:
+      self._write(self.root / LAST_NAME, json.dumps(state, indent=2, sort_keys=True) + "\n")
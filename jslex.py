@@ -0,0 +1,426 @@
+"""Single-pass streaming tokenizer for the JS subset `app.js` is read with.
+
+`scan_js()` walks the source once and extracts constant literal values:
+
+  const messages = ["a", 'b', `c`];        # -> constants["messages"] == ["a", "b", "c"]
+  export const THEME = {bg: 0x0b1d36, dark: true, "sizes": [16, 22]};
+
+Every top-level `NAME = <literal>` (with or without const/let/var/export) is kept,
+in source order; `messages` is also found inside functions. Literals are strings
+(single, double, backtick without `${}`), numbers, true/false/null and arrays/objects
+of them. Anything else inside such a value (identifiers, calls, spreads, template
+substitutions, computed keys, ...) is skipped and reported as `line:col: ...` in
+`diagnostics`, as are lexical errors such as unterminated strings.
+
+The source may be a string or a text stream; util.parse_messages streams app.js.
+Streams are read in chunks and only the unconsumed tail of the current chunk is
+buffered (a token, or a run of whitespace and comments, longer than a chunk grows
+the buffer to its size), so memory stays bounded and the input is consumed in one
+linear pass. Comments, regex literals and template literals (with nested `${...}`)
+are tokenized properly, so brackets and quotes inside them do not confuse the
+extraction.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterator, TextIO
+
+CHUNK_SIZE = 1 << 16
+# A match ending this close to the end of a partial buffer may still grow (`>>` + `>=`, `0` + `x1f`).
+_LOOKAHEAD = 4
+
+_TOKEN_RE = re.compile(
+  r"""
+  (?P<skip>(?:[\s\ufeff]+|//[^\n]*|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)*)
+  (?:
+  (?P<bc>/\*[\s\S]*)
+  |(?P<str>"(?:[^"\\\n]+|\\[\s\S])*(?:"|\\?\Z)?|'(?:[^'\\\n]+|\\[\s\S])*(?:'|\\?\Z)?)
+  |(?P<tpl>`(?:[^`\\$]+|\\[\s\S]|\$(?!\{))*(?:`|\$\{|\\?\$?\Z)?)
+  |(?P<num>(?:0[xX][\da-fA-F_]+|0[oO][0-7_]+|0[bB][01_]+|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d*)?)n?)
+  |(?P<id>(?:[^\W\d]|\$)[\w$]*)
+  |(?P<punct>>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.
+    |\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>|[{}()\[\];,<>+\-*/%&|^!~?:=.@\#])
+  )?
+  """,
+  re.VERBOSE,
+)
+# Continues a template literal after the `}` that closes a `${` substitution.
+_TEMPLATE_RE = re.compile(r"(?:[^`\\$]+|\\[\s\S]|\$(?!\{))*(?:`|\$\{|\\?\$?\Z)?")
+_REGEX_RE = re.compile(r"/(?:[^/\\\[\n]|\\[^\n]|\[(?:[^\]\\\n]|\\[^\n])*(?:\]|\\?\Z))*(?:(?P<close>/[\w$]*)|\\?\Z)?")
+# After these a `/` starts a regex literal rather than a division.
+_REGEX_AFTER_WORDS = {
+  "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await",
+}
+_ESCAPE_RE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|[0-7]{1,3}|\r\n|[\s\S])")
+_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "\n": "", "\r\n": "", "\u2028": "", "\u2029": ""}
+_OPEN = {"(", "[", "{"}
+_CLOSE = {")", "]", "}"}
+
+
+class Token:
+  __slots__ = ("kind", "text", "line", "col")
+
+  def __init__(self, kind: str, text: str, line: int, col: int):
+    self.kind = kind  # str, tpl, tpl_head, tpl_mid, tpl_tail, num, id, punct, regex, error
+    self.text = text
+    self.line = line
+    self.col = col
+
+  def at(self) -> str:
+    return f"{self.line}:{self.col}"
+
+  def is_punct(self, text: str) -> bool:
+    return self.kind == "punct" and self.text == text
+
+
+class JsScan:
+  def __init__(self) -> None:
+    self.constants: dict[str, object] = {}
+    self.diagnostics: list[str] = []
+
+
+def _unescape(match: re.Match) -> str:
+  seq = match.group(1)
+  if seq in _SIMPLE_ESCAPES:
+    return _SIMPLE_ESCAPES[seq]
+  if seq[0] in "ux" and len(seq) > 1:
+    return chr(int(seq[1:].strip("{}"), 16))
+  if seq[0] in "01234567":
+    return chr(int(seq, 8))
+  return seq
+
+
+def decode_string(body: str) -> str:
+  """Cooked value of a string or template literal body (without the quotes)."""
+  return _ESCAPE_RE.sub(_unescape, body) if "\\" in body else body
+
+
+def parse_number(text: str) -> int | float:
+  raw = text.replace("_", "").rstrip("n")
+  if raw[:2].lower() in ("0x", "0o", "0b"):
+    return int(raw, 0)
+  value = float(raw)
+  return int(value) if value.is_integer() and not any(c in raw for c in ".eE") else value
+
+
+class Lexer:
+  def __init__(self, source: str | TextIO, diagnostics: list[str], chunk_size: int = CHUNK_SIZE):
+    if isinstance(source, str):
+      self._stream, self._buf, self._eof = None, source, True
+    else:
+      self._stream, self._buf, self._eof = source, "", False
+    self._chunk = chunk_size
+    self._pos = 0
+    self._line = 1
+    self._line_start = 0  # offset of the current line's first char, relative to the buffer
+    self._diagnostics = diagnostics
+    self._templates: list[list] = []  # open `${` substitutions: [brace depth inside, (line, col) of the literal]
+
+  def _fill(self) -> bool:
+    """Drop the consumed prefix and append at least as much text as is pending; False at EOF."""
+    if self._eof:
+      return False
+    data = self._stream.read(max(self._chunk, len(self._buf) - self._pos))
+    if not data:
+      self._eof = True
+      return False
+    self._buf = self._buf[self._pos:] + data
+    self._line_start -= self._pos
+    self._pos = 0
+    return True
+
+  def _match(self, pattern: re.Pattern) -> re.Match | None:
+    """Match at the cursor, reading more input while the match could still grow."""
+    while True:
+      if self._pos >= len(self._buf) and not self._fill():
+        return None
+      m = pattern.match(self._buf, self._pos)
+      if (m is None or m.end() + _LOOKAHEAD >= len(self._buf)) and self._fill():
+        continue
+      return m
+
+  def _advance(self, end: int) -> tuple[int, int]:
+    """Move the cursor to `end`; returns the (line, col) where the consumed text started."""
+    start = self._pos
+    where = (self._line, start - self._line_start + 1)
+    newlines = self._buf.count("\n", start, end)
+    if newlines:
+      self._line += newlines
+      self._line_start = self._buf.rfind("\n", start, end) + 1
+    self._pos = end
+    return where
+
+  def _error(self, where: tuple[int, int], message: str) -> None:
+    self._diagnostics.append(f"{where[0]}:{where[1]}: {message}")
+
+  def _template(self, m: re.Match | None, head: bool) -> Token:
+    text = m.group("tpl" if head else 0) if m is not None else ""
+    where = self._advance(m.end() if m is not None else self._pos)
+    if text.endswith("${"):
+      self._templates.append([0, where])
+      kind = "tpl_head" if head else "tpl_mid"
+    elif text.endswith("`") and len(text) > (1 if head else 0):
+      kind = "tpl" if head else "tpl_tail"
+    else:
+      self._error(where, "unterminated template literal")
+      kind = "tpl" if head else "tpl_tail"
+    return Token(kind, text, *where)
+
+  def tokens(self) -> Iterator[Token]:
+    prev: Token | None = None
+    while True:
+      m = self._match(_TOKEN_RE)
+      kind = m.lastgroup if m is not None else None
+      if kind in (None, "skip"):
+        if m is not None and m.end() > self._pos:
+          self._advance(m.end())
+          continue
+        if self._pos >= len(self._buf):
+          if self._templates:
+            self._error(self._templates[-1][1], "unterminated template literal")
+          return
+        where = self._advance(self._pos + 1)
+        self._error(where, f"unsupported character {self._buf[self._pos - 1]!r}")
+        continue
+      self._advance(m.start(kind))  # whitespace and comments before the token
+      text = m.group(kind)
+      if kind == "bc":
+        self._error(self._advance(m.end()), "unterminated block comment")
+        return
+      if kind == "punct" and text in ("/", "/=") and self._regex_allowed(prev):
+        rm = self._match(_REGEX_RE)
+        where = self._advance(rm.end())
+        if rm.group("close") is None:
+          self._error(where, "unterminated regular expression")
+        tok = Token("regex", rm.group(0), *where)
+      elif kind == "tpl":
+        tok = self._template(m, head=True)
+      elif kind == "punct" and self._templates and text in ("{", "}"):
+        if text == "{":
+          self._templates[-1][0] += 1
+          tok = Token("punct", "{", *self._advance(m.end()))
+        elif self._templates[-1][0]:
+          self._templates[-1][0] -= 1
+          tok = Token("punct", "}", *self._advance(m.end()))
+        else:
+          self._templates.pop()
+          self._advance(m.end())
+          tok = self._template(self._match(_TEMPLATE_RE), head=False)
+      else:
+        tok = Token(kind, text, *self._advance(m.end()))
+        if kind == "str" and (len(text) < 2 or text[-1] != text[0]):
+          self._error((tok.line, tok.col), "unterminated string literal")
+          tok.kind = "error"
+      prev = tok
+      yield tok
+
+  @staticmethod
+  def _regex_allowed(prev: Token | None) -> bool:
+    if prev is None:
+      return True
+    if prev.kind == "punct":
+      return prev.text not in (")", "]", "}")
+    if prev.kind == "id":
+      return prev.text in _REGEX_AFTER_WORDS
+    return prev.kind in ("tpl_head", "tpl_mid")
+
+
+class _Unsupported(Exception):
+  def __init__(self, token: Token | None, what: str):
+    self.token = token
+    self.what = what
+
+
+class _Extractor:
+  """Token stream -> constant literals; tracks bracket depth to tell top-level statements apart."""
+
+  def __init__(self, tokens: Iterator[Token], scan: JsScan):
+    self._tokens = tokens
+    self._pending: list[Token] = []
+    self._last: Token | None = None
+    self._scan = scan
+    self._name = ""
+    self._nested: set[str] = set()  # names taken from inside a block, until a top-level declaration replaces them
+
+  def _next(self) -> Token | None:
+    tok = self._pending.pop() if self._pending else next(self._tokens, None)
+    if tok is not None:
+      self._last = tok
+    return tok
+
+  def _push(self, tok: Token | None) -> None:
+    if tok is not None:
+      self._pending.append(tok)
+
+  def _note(self, tok: Token | None, message: str) -> None:
+    where = tok.at() if tok is not None else "EOF"
+    self._scan.diagnostics.append(f"{where}: {message} in the value of '{self._name}'")
+
+  def run(self) -> None:
+    depth = 0
+    prev: Token | None = None
+    while True:
+      tok = self._next()
+      if tok is None:
+        return
+      # `obj.messages = ...` assigns a property, not a variable.
+      member = prev is not None and prev.kind == "punct" and prev.text in (".", "?.")
+      prev = tok
+      if tok.kind == "punct":
+        if tok.text in _OPEN:
+          depth += 1
+        elif tok.text in _CLOSE:
+          depth = max(0, depth - 1)
+        continue
+      if tok.kind != "id" or member:
+        continue
+      eq = self._next()
+      if eq is None or not eq.is_punct("="):
+        self._push(eq)
+        continue
+      start = self._next()
+      self._push(start)
+      if start is None or not self._starts_literal(start):
+        continue
+      if depth and (tok.text != "messages" or "messages" in self._scan.constants):
+        continue
+      self._name = tok.text
+      try:
+        value = self._value(self._next())
+      except _Unsupported as exc:
+        self._note(exc.token, f"unsupported {exc.what}")
+        continue
+      last = self._last
+      end = self._next()
+      self._push(end)
+      # `;`, `,` (declarator list), a closing bracket or a new line (ASI) end the statement.
+      if end is None or end.line > last.line or end.kind == "punct" and (end.text in (";", ",") or end.text in _CLOSE):
+        # The first top-level value wins; a nested `messages` is only a fallback for a missing top-level one.
+        if depth:
+          self._nested.add(tok.text)
+          self._scan.constants[tok.text] = value
+        elif tok.text not in self._scan.constants or tok.text in self._nested:
+          self._nested.discard(tok.text)
+          self._scan.constants[tok.text] = value
+      else:
+        self._note(end, f"unsupported expression {end.text!r} after the literal")
+
+  @staticmethod
+  def _starts_literal(tok: Token) -> bool:
+    if tok.kind in ("str", "tpl", "num"):
+      return True
+    if tok.kind == "punct":
+      return tok.text in ("[", "{", "-", "+")
+    return tok.kind == "id" and tok.text in ("true", "false", "null")
+
+  def _value(self, tok: Token | None) -> object:
+    if tok is None:
+      raise _Unsupported(None, "unexpected end of input")
+    if tok.kind in ("str", "tpl"):
+      return decode_string(tok.text[1:-1])
+    if tok.kind == "num":
+      return parse_number(tok.text)
+    if tok.kind == "id" and tok.text in ("true", "false", "null"):
+      return {"true": True, "false": False, "null": None}[tok.text]
+    if tok.is_punct("-") or tok.is_punct("+"):
+      num = self._next()
+      if num is not None and num.kind == "num":
+        value = parse_number(num.text)
+        return -value if tok.text == "-" else value
+      self._push(num)
+    if tok.is_punct("["):
+      return self._array()
+    if tok.is_punct("{"):
+      return self._object()
+    raise _Unsupported(tok, "template substitution" if tok.kind == "tpl_head" else f"{tok.kind} {tok.text!r}")
+
+  def _skip(self, tok: Token | None) -> Token | None:
+    """Skip the rest of an unsupported element; returns the ',' or closing bracket that ends it."""
+    depth = 0
+    while tok is not None:
+      if tok.kind == "punct":
+        if tok.text in _OPEN:
+          depth += 1
+        elif tok.text in _CLOSE:
+          if depth == 0:
+            return tok
+          depth -= 1
+        elif tok.text == "," and depth == 0:
+          return tok
+      tok = self._next()
+    return None
+
+  def _skip_rest(self, tok: Token | None) -> bool:
+    """Skip from `tok`; True if a ',' follows (more elements), False once the container closed."""
+    end = self._skip(tok)
+    return end is not None and end.text == ","
+
+  def _element(self, tok: Token | None, into: list, close: str) -> bool:
+    """Parse one element followed by ',' or `close`; False once the container is closed."""
+    try:
+      value = self._value(tok)
+    except _Unsupported as exc:
+      if exc.token is None or exc.token.kind != "error":  # the lexer already reported it
+        self._note(exc.token, f"unsupported {exc.what}")
+      return self._skip_rest(exc.token)
+    after = self._next()
+    if after is not None and after.kind == "punct" and after.text in (",", close):
+      into.append(value)
+      return after.text == ","
+    self._note(after, f"unsupported expression {after.text!r}" if after is not None else "unexpected end of input")
+    return self._skip_rest(after)
+
+  def _array(self) -> list:
+    items: list = []
+    while True:
+      tok = self._next()
+      if tok is None:
+        self._note(None, "unterminated array")
+        return items
+      if tok.is_punct("]"):
+        return items
+      if tok.is_punct(","):
+        continue  # hole or trailing comma
+      if tok.is_punct("..."):
+        self._note(tok, "unsupported spread")
+        if not self._skip_rest(tok):
+          return items
+      elif not self._element(tok, items, "]"):
+        return items
+
+  def _object(self) -> dict:
+    obj: dict = {}
+    while True:
+      tok = self._next()
+      if tok is None:
+        self._note(None, "unterminated object")
+        return obj
+      if tok.is_punct("}"):
+        return obj
+      if tok.is_punct(","):
+        continue
+      if tok.kind in ("id", "str", "num"):
+        colon = self._next()
+        if colon is not None and colon.is_punct(":"):
+          key = decode_string(tok.text[1:-1]) if tok.kind == "str" else str(parse_number(tok.text)) if tok.kind == "num" else tok.text
+          value: list = []
+          more = self._element(self._next(), value, "}")
+          if value:
+            obj[key] = value[0]
+          if not more:
+            return obj
+          continue
+        self._note(tok, f"unsupported object member {tok.text!r}")  # shorthand, method, getter
+        more = self._skip_rest(colon)
+      else:
+        self._note(tok, f"unsupported object member {tok.text!r}")  # computed key, spread
+        more = self._skip_rest(tok)
+      if not more:
+        return obj
+
+
+def scan_js(source: str | TextIO, chunk_size: int = CHUNK_SIZE) -> JsScan:
+  scan = JsScan()
+  lexer = Lexer(source, scan.diagnostics, chunk_size)
+  _Extractor(lexer.tokens(), scan).run()
+  return scan
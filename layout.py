@@ -0,0 +1,271 @@
+"""Compile-time layout for flex pages (`main.py --layout static`).
+
+Without absolute positions a page is a centered column (title, display label,
+images, then either one button or a ROW_WRAP grid of percentage-sized buttons)
+that LVGL lays out with flex at startup and again whenever a child changes. For a
+known display resolution the same result can be computed here once, so the
+generated code only sets fixed positions and sizes.
+
+`resolve_page` is that layout pass: plain grid arithmetic from the page's
+grid_cols/grid_rows percentages plus estimated text metrics. `flex_layout` is a
+port of LVGL v8.3's lv_flex.c for the features the generator uses; the static
+result is only used when the two agree, so the emitted coordinates are the ones
+the runtime flex layout would have produced for the same text metrics. Text
+metrics are estimates (the generator has no font files); the generated
+`UI_LAYOUT_CHECK` build compares against the real flex layout on the target.
+"""
+from __future__ import annotations
+
+import unicodedata
+from typing import NamedTuple
+
+SCREEN_PAD = 20  # lv_obj_set_style_pad_all(scr, 20, 0)
+DISPLAY_PAD_BOTTOM = 12
+GRID_PAD = 4  # pad_all, pad_row and pad_column of the button grid
+BUTTON_PAD = 10  # single content-sized button
+# line_height of LVGL's built-in Montserrat 16 (LV_FONT_DEFAULT, used by every label on a flex page).
+DEFAULT_LINE_HEIGHT = 17
+
+
+class Box(NamedTuple):
+  x: int
+  y: int
+  w: int
+  h: int
+
+
+class FlexItem(NamedTuple):
+  w: int
+  h: int
+  grow: int = 0
+
+
+class PageLayout:
+  """Resolved boxes of one flex page, relative to the content area of their parent."""
+
+  def __init__(self, width: int, height: int):
+    self.width = width
+    self.height = height
+    self.title: Box | None = None
+    self.display: Box | None = None
+    self.images: list[Box] = []
+    self.button: Box | None = None  # the single content-sized button
+    self.grid: Box | None = None
+    self.cells: list[Box] = []  # grid buttons, relative to the grid's content area
+    self.columns = 0  # buttons per grid row that actually fit
+
+  def screen_boxes(self) -> list[Box]:
+    """Children of the screen in creation order, as flex sees them."""
+    tail = [self.grid] if self.grid is not None else [self.button] if self.button is not None else []
+    return [self.title, self.display, *self.images, *tail]
+
+
+def _cdiv(a: int, b: int) -> int:
+  """C integer division (truncates toward zero), as lv_flex.c computes offsets."""
+  q = abs(a) // abs(b)
+  return q if (a >= 0) == (b > 0) else -q
+
+
+def _pct(pct: int, size: int) -> int:
+  return _cdiv(pct * size, 100)
+
+
+def _char_width(ch: str, size: int) -> float:
+  if unicodedata.east_asian_width(ch) in ("W", "F"):
+    return size
+  if ch == " ":
+    return size * 0.27
+  if ch in "iIljtf.,:;!|'()[]":
+    return size * 0.32
+  if ch.isupper() or ch in "mwMW@%":
+    return size * 0.7
+  return size * 0.58
+
+
+def text_width(text: str, size: int = 16) -> int:
+  """Estimated advance width of one line of Montserrat-like text."""
+  return round(sum(_char_width(ch, size) for ch in text))
+
+
+def label_size(text: str, max_w: int, line_height: int = DEFAULT_LINE_HEIGHT) -> tuple[int, int]:
+  """LV_SIZE_CONTENT label: as wide as the text, wrapped at the parent's content width."""
+  width = text_width(text)
+  if max_w <= 0:
+    return 0, line_height
+  lines = max(1, -(-width // max_w))
+  return min(width, max_w), lines * line_height
+
+
+def _place(align: str, free: int) -> int:
+  return {"start": 0, "center": _cdiv(free, 2), "end": free}[align]
+
+
+def flex_layout(
+  items: list[FlexItem],
+  content_w: int,
+  content_h: int,
+  row: bool,
+  wrap: bool = False,
+  main_place: str = "start",
+  cross_place: str = "start",
+  track_place: str = "start",
+  gap_row: int = 0,
+  gap_column: int = 0,
+) -> list[Box]:
+  """Boxes lv_flex.c (v8.3) assigns to fixed-size items of a fixed-size container.
+
+  Covers main/cross/track placement start/center/end, wrapping and grow; items
+  never exceed min/max sizes and no child is hidden or floating.
+  """
+  max_main = content_w if row else content_h
+  max_cross = content_h if row else content_w
+  item_gap, track_gap = (gap_column, gap_row) if row else (gap_row, gap_column)
+
+  def main(item: FlexItem) -> int:
+    return item.w if row else item.h
+
+  def cross(item: FlexItem) -> int:
+    return item.h if row else item.w
+
+  tracks = []  # (first, end, fix_main_size, track_main_size, cross_size, grow_sum)
+  first = 0
+  while first < len(items):
+    fix = cross_size = grow = 0
+    end = first
+    while end < len(items):
+      item = items[end]
+      if item.grow:
+        grow += item.grow
+        fix += item_gap
+      else:
+        if wrap and fix + main(item) > max_main:
+          break
+        fix += main(item) + item_gap
+      cross_size = max(cross_size, cross(item))
+      end += 1
+    if fix > 0:
+      fix -= item_gap
+    track_main = max_main if grow else fix
+    if end == first:  # at least one item per track
+      end = first + 1
+      track_main, cross_size = main(items[first]), cross(items[first])
+    tracks.append((first, end, fix, track_main, cross_size, grow))
+    first = end
+
+  cross_pos = 0
+  if track_place != "start":
+    total = sum(t[4] for t in tracks) + track_gap * (len(tracks) - 1)
+    cross_pos = _place(track_place, max_cross - total)
+  boxes: list[Box] = []
+  for first, end, fix, track_main, cross_size, grow_sum in tracks:
+    free = track_main - fix
+    sizes = {}
+    for i in range(first, end):
+      if items[i].grow:
+        sizes[i] = max(0, _cdiv(free, grow_sum) * items[i].grow)
+        grow_sum -= items[i].grow
+        free -= sizes[i]
+    main_pos = _place(main_place, max_main - track_main)
+    for i in range(first, end):
+      item = items[i]
+      m = sizes.get(i, main(item))
+      c = cross(item)
+      offset = {"start": 0, "center": _cdiv(((cross_size + 1) & ~1) - c, 2), "end": cross_size - c}[cross_place]
+      if row:
+        boxes.append(Box(main_pos, cross_pos + offset, m, c))
+      else:
+        boxes.append(Box(cross_pos + offset, main_pos, c, m))
+      main_pos += m + item_gap
+    cross_pos += cross_size + track_gap
+  return boxes
+
+
+def resolve_page(
+  width: int,
+  height: int,
+  title: str,
+  display_text: str,
+  images: list[tuple[int, int]],
+  buttons: int,
+  btn_w_pct: int,
+  btn_h_pct: int,
+  button_text: str = "",
+) -> PageLayout:
+  """Grid arithmetic for one flex page on a `width` x `height` screen.
+
+  `buttons` > 1 lays them out as the percentage grid, otherwise one
+  content-sized button labelled `button_text` is centered below the labels.
+  """
+  layout = PageLayout(width, height)
+  cw, ch = width - 2 * SCREEN_PAD, height - 2 * SCREEN_PAD
+  title_w, title_h = label_size(title, cw)
+  display_w, display_h = label_size(display_text, cw)
+  display_h += DISPLAY_PAD_BOTTOM
+  sizes = [(title_w, title_h), (display_w, display_h), *images]
+  if buttons > 1:
+    grid_h = max(0, ch - sum(h for _, h in sizes))
+    sizes.append((cw, grid_h))
+    y = 0
+  else:
+    label_w, label_h = label_size(button_text, cw - 2 * BUTTON_PAD)
+    sizes.append((label_w + 2 * BUTTON_PAD, label_h + 2 * BUTTON_PAD))
+    y = _cdiv(ch - sum(h for _, h in sizes), 2)
+  # One column track, centered; each child centered in it.
+  track_w = max(w for w, _ in sizes)
+  track_x = _cdiv(cw - track_w, 2)
+  boxes = []
+  for w, h in sizes:
+    boxes.append(Box(track_x + _cdiv(((track_w + 1) & ~1) - w, 2), y, w, h))
+    y += h
+  layout.title, layout.display = boxes[0], boxes[1]
+  layout.images = boxes[2:-1]
+  if buttons <= 1:
+    layout.button = boxes[-1]
+    return layout
+  layout.grid = boxes[-1]
+  gw, gh = layout.grid.w - 2 * GRID_PAD, layout.grid.h - 2 * GRID_PAD
+  bw, bh = _pct(btn_w_pct, gw), _pct(btn_h_pct, gh)
+  # ROW_WRAP starts a new row once the next button (plus the gaps before it) would overflow.
+  layout.columns = max(1, (gw + GRID_PAD) // (bw + GRID_PAD)) if bw + GRID_PAD > 0 else buttons
+  for first in range(0, buttons, layout.columns):
+    count = min(layout.columns, buttons - first)
+    x = _cdiv(gw - (count * bw + (count - 1) * GRID_PAD), 2)
+    y = first // layout.columns * (bh + GRID_PAD)
+    layout.cells += [Box(x + i * (bw + GRID_PAD), y, bw, bh) for i in range(count)]
+  return layout
+
+
+def flex_reference(layout: PageLayout) -> tuple[list[Box], list[Box]]:
+  """Screen children and grid cells as the runtime flex layout places the same sizes."""
+  cw, ch = layout.width - 2 * SCREEN_PAD, layout.height - 2 * SCREEN_PAD
+  items = [FlexItem(b.w, b.h) for b in layout.screen_boxes()]
+  if layout.grid is not None:
+    items[-1] = FlexItem(cw, 0, grow=1)
+  screen = flex_layout(items, cw, ch, row=False, main_place="center", cross_place="center", track_place="center")
+  cells: list[Box] = []
+  if layout.grid is not None:
+    grid = screen[-1]
+    cells = flex_layout(
+      [FlexItem(b.w, b.h) for b in layout.cells],
+      grid.w - 2 * GRID_PAD,
+      grid.h - 2 * GRID_PAD,
+      row=True,
+      wrap=True,
+      main_place="center",
+      gap_row=GRID_PAD,
+      gap_column=GRID_PAD,
+    )
+  return screen, cells
+
+
+def check_layout(layout: PageLayout) -> list[str]:
+  """Differences between the static boxes and the flex reference (empty when they agree)."""
+  screen, cells = flex_reference(layout)
+  problems = []
+  for i, (ours, ref) in enumerate(zip(layout.screen_boxes(), screen)):
+    if ours != ref:
+      problems.append(f"screen child {i}: static {tuple(ours)} != flex {tuple(ref)}")
+  for i, (ours, ref) in enumerate(zip(layout.cells, cells)):
+    if ours != ref:
+      problems.append(f"grid button {i}: static {tuple(ours)} != flex {tuple(ref)}")
+  return problems
@@ -0,0 +1,143 @@
+"""Shared prebuilt LVGL library cache for `main.py --build`.
+
+LVGL itself only depends on the LVGL sources, `lv_conf.h` (plus the headers it
+pulls in, i.e. `tick.h`) and the compiler, so it is compiled once per unique
+key and reused by every project and SKU:
+
+  <cache>/<key>/liblvgl.a
+  <cache>/<key>/key.json      # what went into the key, for debugging
+
+The cache defaults to $LVGL_WEB_CACHE or ~/.cache/lvgl_web/lib. Builds use Ninja
+when available, ccache as compiler launcher when available (disable with
+LVGL_WEB_CCACHE=0) and one job per CPU.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import textwrap
+from pathlib import Path
+
+LIB_NAME = "liblvgl.a"
+# Must match the definitions the app's CMakeLists.txt puts on the lvgl target.
+LVGL_DEFINES = ("LV_CONF_INCLUDE_SIMPLE", "LV_LVGL_H_INCLUDE_SIMPLE")
+BUILD_TYPE = "Release"
+# Headers that lv_conf.h includes into every LVGL translation unit.
+CONF_FILES = ("lv_conf.h", "tick.h")
+
+
+def default_cache_dir() -> Path:
+  env = os.environ.get("LVGL_WEB_CACHE")
+  if env:
+    return Path(env).expanduser()
+  base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+  return Path(base) / "lvgl_web" / "lib"
+
+
+def build_jobs() -> int:
+  return os.cpu_count() or 1
+
+
+def generator_args() -> list[str]:
+  return ["-G", "Ninja"] if shutil.which("ninja") else []
+
+
+def launcher_args() -> list[str]:
+  if os.environ.get("LVGL_WEB_CCACHE", "1") != "0" and shutil.which("ccache"):
+    return ["-DCMAKE_C_COMPILER_LAUNCHER=ccache"]
+  return []
+
+
+def _compiler_id() -> str:
+  cc = os.environ.get("CC") or "cc"
+  try:
+    proc = subprocess.run([cc, "--version"], capture_output=True, text=True, check=True)
+    return f"{cc}: {proc.stdout.splitlines()[0] if proc.stdout else ''}"
+  except (OSError, subprocess.CalledProcessError):
+    return cc
+
+
+def _source_revision(lvgl_src: Path) -> str | None:
+  try:
+    proc = subprocess.run(["git", "-C", str(lvgl_src), "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    return proc.stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def cache_key(tag: str, lvgl_src: Path, conf_dir: Path) -> tuple[str, dict]:
+  """Hash of everything that changes the compiled library; returns (key, inputs)."""
+  inputs = {
+    "tag": tag,
+    "revision": _source_revision(lvgl_src),
+    "conf": {name: hashlib.sha256((conf_dir / name).read_bytes()).hexdigest() for name in CONF_FILES},
+    "compiler": _compiler_id(),
+    "cflags": os.environ.get("CFLAGS", ""),
+    "build_type": BUILD_TYPE,
+    "defines": list(LVGL_DEFINES),
+  }
+  blob = json.dumps(inputs, sort_keys=True).encode("utf-8")
+  return hashlib.sha256(blob).hexdigest()[:24], inputs
+
+
+def _cmake_project(lvgl_src: Path, conf_dir: Path) -> str:
+  defines = "\n      ".join(LVGL_DEFINES)
+  return textwrap.dedent(
+    f"""
+    cmake_minimum_required(VERSION 3.16)
+    project(lvgl_prebuilt C)
+    set(CMAKE_C_STANDARD 99)
+    set(CMAKE_POSITION_INDEPENDENT_CODE ON)
+    add_subdirectory("{lvgl_src.as_posix()}" lvgl)
+    target_compile_definitions(lvgl PUBLIC
+      {defines}
+    )
+    target_include_directories(lvgl PUBLIC "{conf_dir.as_posix()}")
+    """
+  )
+
+
+def ensure_lvgl_lib(tag: str, lvgl_src: Path, conf_dir: Path, cache_dir: Path) -> Path:
+  """Return the cached liblvgl.a for this configuration, compiling it on a miss."""
+  key, inputs = cache_key(tag, lvgl_src, conf_dir)
+  entry = cache_dir / key
+  lib = entry / LIB_NAME
+  if lib.is_file():
+    print(f"[libcache] hit {key} ({lib})")
+    return lib
+  print(f"[libcache] miss {key}: compiling LVGL {tag} into {entry}")
+  cache_dir.mkdir(parents=True, exist_ok=True)
+  with tempfile.TemporaryDirectory(prefix=f".{key}-", dir=cache_dir) as tmp:
+    work = Path(tmp)
+    # Snapshot the config headers so the build cannot see later edits of the project tree.
+    conf_copy = work / "conf"
+    conf_copy.mkdir()
+    for name in CONF_FILES:
+      shutil.copy2(conf_dir / name, conf_copy / name)
+    (work / "CMakeLists.txt").write_text(_cmake_project(lvgl_src, conf_copy), encoding="utf-8")
+    build = work / "build"
+    subprocess.run(
+      ["cmake", "-S", str(work), "-B", str(build), f"-DCMAKE_BUILD_TYPE={BUILD_TYPE}", *generator_args(), *launcher_args()],
+      check=True,
+    )
+    subprocess.run(["cmake", "--build", str(build), "--target", "lvgl", "-j", str(build_jobs())], check=True)
+    built = next(build.rglob(LIB_NAME), None)
+    if built is None:
+      raise RuntimeError(f"LVGL build finished but {LIB_NAME} was not found under {build}")
+    staged = work / "entry"
+    staged.mkdir()
+    shutil.copy2(built, staged / LIB_NAME)
+    (staged / "key.json").write_text(json.dumps(inputs, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    try:
+      # Atomic publish; a concurrent build of the same key may have won the race.
+      os.rename(staged, entry)
+    except OSError:
+      if not lib.is_file():
+        raise
+  print(f"[libcache] stored {lib}")
+  return lib
+
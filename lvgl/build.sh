@@ -3,8 +3,17 @@
 set -euo pipefail
 SCRIPT_DIR=$(cd "$(dirname "$0")" && pwd)
 BUILD_DIR="$SCRIPT_DIR/build"
+JOBS="${JOBS:-$(nproc 2>/dev/null || echo 4)}"
 mkdir -p "$BUILD_DIR"
 cd "$BUILD_DIR"
-cmake .. -DCMAKE_BUILD_TYPE=Release         -DFETCHCONTENT_FULLY_DISCONNECTED=ON         -DFETCHCONTENT_QUIET=OFF         -DLVGL_SOURCE_DIR="$SCRIPT_DIR/.deps/lvgl"         -DLV_DRIVERS_DIR="$SCRIPT_DIR/.deps/lv_drivers"
-cmake --build . --config Release
+EXTRA_ARGS=()
+# The generator can only be chosen when the build tree is first configured.
+if [ ! -f CMakeCache.txt ] && command -v ninja >/dev/null 2>&1; then
+  EXTRA_ARGS+=(-G Ninja)
+fi
+if [ "${LVGL_WEB_CCACHE:-1}" != "0" ] && command -v ccache >/dev/null 2>&1; then
+  EXTRA_ARGS+=(-DCMAKE_C_COMPILER_LAUNCHER=ccache)
+fi
+cmake .. -DCMAKE_BUILD_TYPE=Release         -DFETCHCONTENT_FULLY_DISCONNECTED=ON         -DFETCHCONTENT_QUIET=OFF         -DLVGL_SOURCE_DIR="$SCRIPT_DIR/.deps/lvgl"         -DLV_DRIVERS_DIR="$SCRIPT_DIR/.deps/lv_drivers"         -DLVGL_PREBUILT_LIB="${LVGL_PREBUILT_LIB:-}"         ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"}
+cmake --build . --config Release -j "$JOBS"
 echo "Executable located at $BUILD_DIR/lvgl_web"
@@ -2,16 +2,42 @@
 #include "lvgl.h"
 
 static lv_obj_t * display_label;
-static const char * messages[] = {
+static const char * const ui_strings[] = {
   "now：waiting",
   "now：running",
-  "now：completed"
+  "now：completed",
+  "Touch Grid"
 };
+
+static const uint16_t messages[] = {0, 1, 2};
 static int msg_idx = 0;
 
 static void btn_event_cb(lv_event_t * e) {
   msg_idx = (msg_idx + 1) % (sizeof(messages)/sizeof(messages[0]));
-  lv_label_set_text(display_label, messages[msg_idx]);
+  lv_label_set_text_static(display_label, ui_strings[messages[msg_idx]]);
+}
+
+static const char * ui_btnm_map[] = {
+  "0,0", "1,0", "2,0", "3,0", "4,0", "5,0", "6,0", "7,0", "8,0", "9,0",
+  "\n",
+  "0,1", "1,1", "2,1", "3,1", "4,1", "5,1", "6,1", "7,1", "8,1", "9,1",
+  "\n",
+  "0,2", "1,2", "2,2", "3,2", "4,2", "5,2", "6,2", "7,2", "8,2", "9,2",
+  "\n",
+  "0,3", "1,3", "2,3", "3,3", "4,3", "5,3", "6,3", "7,3", "8,3", "9,3",
+  "\n",
+  "0,4", "1,4", "2,4", "3,4", "4,4", "5,4", "6,4", "7,4", "8,4", "9,4",
+  "\n",
+  "0,5", "1,5", "2,5", "3,5", "4,5", "5,5", "6,5", "7,5", "8,5", "9,5",
+  "",
+};
+
+/* One handler for every button of a matrix; the selected index picks the action. */
+static void ui_btnm_event_cb(lv_event_t * e) {
+  lv_obj_t * btnm = lv_event_get_target(e);
+  uint16_t id = lv_btnmatrix_get_selected_btn(btnm);
+  if (id == LV_BTNMATRIX_BTN_NONE) return;
+  btn_event_cb(e);
 }
 
 void ui_build(void) {
@@ -28,502 +54,23 @@ void ui_build(void) {
   lv_obj_set_style_pad_all(scr, 20, 0);
 
   lv_obj_t * title = lv_label_create(scr);
-  lv_label_set_text(title, "Touch Grid");
+  lv_label_set_text_static(title, ui_strings[3]);
   lv_obj_set_style_text_color(title, lv_color_hex(0x8ab4ff), 0);
 
   display_label = lv_label_create(scr);
-  lv_label_set_text(display_label, "Touch Grid");
+  lv_label_set_text_static(display_label, ui_strings[3]);
   lv_obj_set_style_text_font(display_label, LV_FONT_DEFAULT, 0);
   lv_obj_set_style_pad_bottom(display_label, 12, 0);
 
-  lv_obj_t * grid = lv_obj_create(scr);
-  lv_obj_remove_style_all(grid);
-  lv_obj_set_size(grid, lv_pct(100), lv_pct(100));
-  lv_obj_set_style_bg_opa(grid, LV_OPA_TRANSP, 0);
-  lv_obj_set_style_pad_all(grid, 4, 0);
-  lv_obj_set_style_pad_row(grid, 4, 0);
-  lv_obj_set_style_pad_column(grid, 4, 0);
-  lv_obj_set_flex_flow(grid, LV_FLEX_FLOW_ROW_WRAP);
-  lv_obj_set_flex_align(grid, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_START, LV_FLEX_ALIGN_START);
-  lv_obj_set_flex_grow(grid, 1);
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,0");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,1");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,2");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,3");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,4");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "0,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "1,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "2,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "3,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "4,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "5,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "6,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "7,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "8,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
-  {
-    lv_obj_t * btn = lv_btn_create(grid);
-    lv_obj_set_size(btn, lv_pct(10), lv_pct(16));
-    lv_obj_t * btn_label = lv_label_create(btn);
-    lv_label_set_text(btn_label, "9,5");
-    lv_obj_center(btn_label);
-    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);
-  }
+  lv_obj_t * btnm = lv_btnmatrix_create(scr);
+  lv_obj_set_size(btnm, lv_pct(100), lv_pct(100));
+  lv_obj_set_flex_grow(btnm, 1);
+  lv_obj_set_style_bg_opa(btnm, LV_OPA_TRANSP, 0);
+  lv_obj_set_style_border_width(btnm, 0, 0);
+  lv_obj_set_style_pad_all(btnm, 4, 0);
+  lv_obj_set_style_pad_row(btnm, 4, 0);
+  lv_obj_set_style_pad_column(btnm, 4, 0);
+  lv_btnmatrix_set_map(btnm, ui_btnm_map);
+  lv_btnmatrix_set_btn_ctrl_all(btnm, LV_BTNMATRIX_CTRL_CLICK_TRIG | LV_BTNMATRIX_CTRL_NO_REPEAT);
+  lv_obj_add_event_cb(btnm, ui_btnm_event_cb, LV_EVENT_VALUE_CHANGED, NULL);
 }
\ No newline at end of file
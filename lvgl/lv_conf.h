@@ -5,11 +5,8 @@
 #define LV_COLOR_DEPTH 32
 #define LV_USE_FONT_ROBOTO 0
 #define LV_USE_FONT_MONTSERRAT 1
+#define LV_FONT_MONTSERRAT_14 0
 #define LV_FONT_MONTSERRAT_16 1
-#define LV_FONT_MONTSERRAT_18 1
-#define LV_FONT_MONTSERRAT_22 1
-#define LV_FONT_MONTSERRAT_30 1
-#define LV_FONT_MONTSERRAT_36 1
 #define LV_FONT_DEFAULT &lv_font_montserrat_16
 #define LV_TICK_CUSTOM 1
 #define LV_TICK_CUSTOM_INCLUDE "tick.h"
@@ -1,6 +1,10 @@
 
 #ifndef LV_DRV_CONF_H
 #define LV_DRV_CONF_H
+/* Display profile "legacy": 2 x 1024x80 px x 4 B = 640 KiB of draw buffers (13% of the
+ * screen each) + LV_DISP_ROT_MAX_BUF rotation scratch. Previous fixed setup. LVGL drops
+ * full_refresh because the buffers are not screen-sized, and every flushed pixel is
+ * rotated by 90 degrees on the CPU. */
 #define USE_FBDEV 1
 #define USE_EVDEV 1
 #define FBDEV_HOR_RES 1024
@@ -1,9 +1,9 @@
 
 #pragma once
 #include <stdint.h>
-#include <sys/time.h>
+#include <time.h>
 static inline uint32_t lv_tick_custom_handler(void) {
-  struct timeval tv;
-  gettimeofday(&tv, NULL);
-  return (uint32_t)(tv.tv_sec * 1000u + (uint32_t)(tv.tv_usec / 1000u));
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return (uint32_t)((uint32_t)ts.tv_sec * 1000u + (uint32_t)(ts.tv_nsec / 1000000));
 }
@@ -3,6 +3,8 @@
 Usage:
   python main.py           # generate LVGL sources (no build)
   python main.py --build   # generate and build (requires cmake/git/gcc on Linux)
+  python main.py --watch   # regenerate on every change under web/ (add --build to rebuild)
+  python main.py --batch batch.toml [--jobs N]   # translate many web roots in parallel
 """
 from __future__ import annotations
 
@@ -13,15 +15,48 @@ import shutil
 import subprocess
 import sys
 import textwrap
+import time
 from pathlib import Path
 
-from util import SimpleParser, generate_c, Node, parse_messages
+from depcache import Dependency, DependencyError, default_cache_dir as default_deps_cache, ensure_deps
+from display import describe_profiles, load_profile
+from fontconv import convert_cached as convert_font_cached, default_cache_dir as default_font_cache, font_symbol
+from imgconv import (
+  ImageFormat,
+  convert_cached,
+  empty_image,
+  default_cache_dir as default_image_cache,
+  header_lines as image_header_lines,
+  init_source_lines as image_init_lines,
+)
+import blob
+from ir import IrCache, UiIR, diff_ir, input_key, unit_key
+from libcache import build_jobs, default_cache_dir as default_lib_cache, ensure_lvgl_lib
+from output import OutputWriter, sha256_bytes, sha256_file
+from profiling import profiler
+from snapshot import MANIFEST_NAME as SNAPSHOT_MANIFEST, SyncStats, sync_tree
+from translator import blob_files, iter_ui_source, parse_html, ui_header
+from util import (
+  DEFAULT_FONT_SIZE,
+  FONT_SIZES,
+  FontUsage,
+  GenOptions,
+  GenReport,
+  IMAGE_TAGS,
+  Node,
+  Screen,
+  font_usage,
+  image_symbol,
+  parse_messages,
+)
 
 ROOT = Path(__file__).resolve().parent
 WEB_DIR = ROOT / "web"
 LVGL_DIR = ROOT / "lvgl"
 DEPS_DIR = LVGL_DIR / ".deps"
 GENERATED_DIR = LVGL_DIR / "generated"
+IR_DIR = ".ir"  # under the LVGL tree: cached IRs and the last build's unit keys (see ir.py)
+BLOB_FILES = ("generated/ui.blob", "generated/ui_blob.h", "generated/ui_blob.c", "generated/ui_blob_data.c")
 BUILD_DIR = LVGL_DIR / "build"
 LVGL_REPO = "https://github.com/lvgl/lvgl.git"
 LVGL_REPO_FALLBACK = "https://github.com/lvgl/lvgl.git"
@@ -33,48 +68,145 @@ LV_TAG = "v8.3.11"
 LV_DRIVERS_TAG = "master"
 
 
-def run(cmd: list[str], cwd: Path | None = None) -> None:
+def run(cmd: list[str], cwd: Path | None = None, env: dict[str, str] | None = None) -> None:
   """Run a shell command and raise on failure."""
   print(f"[run] {' '.join(cmd)}")
-  subprocess.run(cmd, cwd=cwd, check=True)
+  with profiler.stage(f"$ {' '.join(cmd[:3])}", category="subprocess", cmd=cmd):
+    subprocess.run(cmd, cwd=cwd, env=env, check=True)
 
 
-def ensure_dirs() -> None:
-  for path in (DEPS_DIR, GENERATED_DIR, BUILD_DIR):
+def ensure_dirs(lvgl_dir: Path = LVGL_DIR) -> None:
+  for path in (lvgl_dir / ".deps", lvgl_dir / "generated", lvgl_dir / "build"):
     path.mkdir(parents=True, exist_ok=True)
 
 
-def write_lv_conf() -> None:
-  target = LVGL_DIR / "lv_conf.h"
-  target.write_text(
-    textwrap.dedent(
+def fill_template(template: str, **sections: str) -> str:
+  """Replace `@NAME@` placeholder lines with the (re-indented) section text, or drop them when empty."""
+  lines = []
+  for line in template.splitlines(keepends=True):
+    key = line.strip()
+    if key.startswith("@") and key.endswith("@") and key[1:-1] in sections:
+      indent = line[: len(line) - len(line.lstrip())]
+      body = sections[key[1:-1]]
+      lines.extend(f"{indent}{part}\n" if part else "\n" for part in body.splitlines())
+      continue
+    lines.append(line)
+  return "".join(lines)
+
+
+def font_conf_lines(fonts: FontUsage | None, options: GenOptions) -> list[str]:
+  """lv_conf.h font switches; without a usage analysis every size the generator can emit stays on."""
+  if fonts is None or options.fonts == "all":
+    sizes = list(FONT_SIZES)
+  elif options.fonts == "subset":
+    declares = " ".join(f"LV_FONT_DECLARE({font_symbol(size)})" for size in fonts.sizes)
+    return [
+      "#define LV_FONT_MONTSERRAT_14 0",
+      f"#define LV_FONT_CUSTOM_DECLARE {declares}",
+      f"#define LV_FONT_DEFAULT &{font_symbol(DEFAULT_FONT_SIZE)}",
+    ]
+  else:
+    sizes = fonts.sizes
+  # LVGL enables Montserrat 14 unless told otherwise; nothing generated here uses it.
+  lines = [] if 14 in sizes else ["#define LV_FONT_MONTSERRAT_14 0"]
+  lines += [f"#define LV_FONT_MONTSERRAT_{size} 1" for size in sizes]
+  return lines + [f"#define LV_FONT_DEFAULT &lv_font_montserrat_{DEFAULT_FONT_SIZE}"]
+
+
+def write_lv_conf(out: OutputWriter, options: GenOptions | None = None, fonts: FontUsage | None = None) -> None:
+  options = options or GenOptions()
+  profile = load_profile(options.display)
+  monitors = ""
+  if options.perf_monitor:
+    monitors = "#define LV_USE_PERF_MONITOR 1\n#define LV_USE_MEM_MONITOR 1"
+  color = f"#define LV_COLOR_DEPTH {options.color_depth}"
+  if options.color_16_swap:
+    color += "\n#define LV_COLOR_16_SWAP 1"
+  out.write_text(
+    "lv_conf.h",
+    fill_template(textwrap.dedent(
       """
       #ifndef LV_CONF_H
       #define LV_CONF_H
       #define LV_USE_LOG 1
-      #define LV_COLOR_DEPTH 32
+      @COLOR@
       #define LV_USE_FONT_ROBOTO 0
       #define LV_USE_FONT_MONTSERRAT 1
-      #define LV_FONT_MONTSERRAT_16 1
-      #define LV_FONT_MONTSERRAT_18 1
-      #define LV_FONT_MONTSERRAT_22 1
-      #define LV_FONT_MONTSERRAT_30 1
-      #define LV_FONT_MONTSERRAT_36 1
-      #define LV_FONT_DEFAULT &lv_font_montserrat_16
+      @FONTS@
+      @DISPLAY@
       #define LV_TICK_CUSTOM 1
       #define LV_TICK_CUSTOM_INCLUDE "tick.h"
       #define LV_TICK_CUSTOM_SYS_TIME_EXPR (lv_tick_custom_handler())
+      @MONITORS@
       #endif
       """
     ),
-    encoding="utf-8",
+      COLOR=color,
+      FONTS="\n".join(font_conf_lines(fonts, options)),
+      DISPLAY=f"#define LV_DISP_DEF_REFR_PERIOD {profile.refr_period_ms}" if profile.refr_period_ms else "",
+      MONITORS=monitors,
+    ),
   )
 
 
-def write_main_c() -> None:
-  target = LVGL_DIR / "main.c"
-  target.write_text(
-    textwrap.dedent(
+# --main-loop adaptive: sleep exactly until the next LVGL timer is due, or until the touch
+# device has input. A private evdev fd is poll()ed (each open evdev fd gets its own copy of
+# the events), so lv_drivers' reader is untouched. While the pointer is released the indev
+# read timer is paused, so an idle screen does not wake the CPU at all.
+ADAPTIVE_LOOP_HELPERS = textwrap.dedent(
+  """
+  #ifndef LOOP_MAX_SLEEP_MS
+  #define LOOP_MAX_SLEEP_MS 500
+  #endif
+
+  static lv_indev_t * touch_indev;
+  static int input_fd = -1;
+
+  static void input_wait_init(void) {
+    input_fd = open(EVDEV_NAME, O_RDONLY | O_NONBLOCK | O_CLOEXEC);
+  }
+
+  static void loop_wait(uint32_t idle_ms) {
+    lv_timer_t * read_timer = touch_indev->driver->read_timer;
+    if (input_fd >= 0 && touch_indev->proc.state == LV_INDEV_STATE_RELEASED) {
+      lv_timer_pause(read_timer);
+    }
+    int timeout = idle_ms > LOOP_MAX_SLEEP_MS ? LOOP_MAX_SLEEP_MS : (int)idle_ms;
+    if (input_fd < 0) {
+      usleep((useconds_t)timeout * 1000u);
+      return;
+    }
+    struct pollfd pfd = { .fd = input_fd, .events = POLLIN };
+    if (poll(&pfd, 1, timeout) > 0) {
+      char drain[256];
+      while (read(input_fd, drain, sizeof(drain)) > 0) {
+      }
+      lv_timer_resume(read_timer);
+      lv_timer_ready(read_timer);
+    }
+  }
+  """
+).strip("\n")
+
+
+def write_main_c(out: OutputWriter, options: GenOptions | None = None) -> None:
+  options = options or GenOptions()
+  perf = options.perf_hooks
+  adaptive = options.main_loop == "adaptive"
+  timer_call = "uint32_t idle_ms = lv_timer_handler();" if adaptive else "lv_timer_handler();"
+  profile = load_profile(options.display)
+  width, height = profile.resolution()
+  buf_px = f"SCREEN_W * {profile.buffer_lines(options.color_depth)}"
+  draw_buffers = [f"static lv_color_t buf1[{buf_px}];"]
+  if profile.buffers == 2:
+    draw_buffers.append(f"static lv_color_t buf2[{buf_px}];")
+  draw_buffers += [
+    "static lv_disp_draw_buf_t draw_buf;",
+    f"lv_disp_draw_buf_init(&draw_buf, buf1, {'buf2' if profile.buffers == 2 else 'NULL'}, {buf_px});",
+  ]
+  out.write_text(
+    "main.c",
+    fill_template(textwrap.dedent(
       r'''
       #include "lvgl.h"
       #include "lv_conf.h"
@@ -82,20 +214,19 @@ def write_main_c() -> None:
       #include "display/fbdev.h"
       #include "indev/evdev.h"
       #include "generated/ui_app.h"
+      @PERF_INCLUDE@
       #include <unistd.h>
+      @LOOP_INCLUDES@
 
-      #define SCREEN_W 1024
-      #define SCREEN_H 600
+      @SCREEN@
+      @LOOP_HELPERS@
 
       static void hal_init(void) {
         lv_init();
         fbdev_init();
         evdev_init();
 
-        static lv_color_t buf1[SCREEN_W * 80];
-        static lv_color_t buf2[SCREEN_W * 80];
-        static lv_disp_draw_buf_t draw_buf;
-        lv_disp_draw_buf_init(&draw_buf, buf1, buf2, SCREEN_W * 80);
+        @DRAW_BUFFERS@
 
         static lv_disp_drv_t disp_drv;
         lv_disp_drv_init(&disp_drv);
@@ -118,77 +249,313 @@ def write_main_c() -> None:
         lv_indev_drv_init(&indev_drv);
         indev_drv.type = LV_INDEV_TYPE_POINTER;
         indev_drv.read_cb = evdev_read;
-        lv_indev_drv_register(&indev_drv);
+        @INDEV_REGISTER@
       }
 
       int main(void) {
         hal_init();
         ui_build();
+        @LOOP_INIT@
         while (1) {
-          lv_timer_handler();
-          usleep(5000);
+          @LOOP_BODY@
+          @LOOP_WAIT@
         }
         return 0;
       }
       '''
     ),
-    encoding="utf-8",
+      PERF_INCLUDE='#include "generated/ui_perf.h"' if perf else "",
+      SCREEN=f"#define SCREEN_W {width}\n#define SCREEN_H {height}",
+      DRAW_BUFFERS="\n".join(draw_buffers),
+      LOOP_INCLUDES="#include <fcntl.h>\n#include <poll.h>" if adaptive else "",
+      LOOP_HELPERS="\n" + ADAPTIVE_LOOP_HELPERS if adaptive else "",
+      INDEV_REGISTER=f"{'touch_indev = ' if adaptive else ''}lv_indev_drv_register(&indev_drv);",
+      LOOP_INIT="input_wait_init();" if adaptive else "",
+      LOOP_BODY=(
+        f"UI_PERF_SCOPE_BEGIN();\n{timer_call}\nUI_PERF_TIMER_END();\nUI_PERF_POLL();"
+        if perf else timer_call
+      ),
+      LOOP_WAIT="loop_wait(idle_ms);" if adaptive else "usleep(5000);",
+    ),
   )
 
 
-def write_lv_drv_conf() -> None:
-  target = LVGL_DIR / "lv_drv_conf.h"
-  target.write_text(
-    textwrap.dedent(
+def write_lv_drv_conf(out: OutputWriter, options: GenOptions | None = None) -> None:
+  options = options or GenOptions()
+  profile = load_profile(options.display)
+  width, height = profile.resolution()
+  cost = profile.memory_note(options.color_depth)
+  about = textwrap.wrap(f'Display profile "{profile.name}": {cost}. {profile.note}'.strip(), 88)
+  switches = []
+  if profile.sw_rotated:
+    switches += ["#define DISP_SW_ROTATE 1", f"#define DISP_ROTATION LV_DISP_ROT_{profile.rotation}"]
+  if profile.refresh == "full":
+    switches.append("#define DISP_FULL_REFRESH 1")
+  print(f"[display] {profile.name}: {width}x{height}, {profile.refresh} refresh, {cost}")
+  out.write_text(
+    "lv_drv_conf.h",
+    fill_template(textwrap.dedent(
       """
       #ifndef LV_DRV_CONF_H
       #define LV_DRV_CONF_H
+      @ABOUT@
       #define USE_FBDEV 1
       #define USE_EVDEV 1
-      #define FBDEV_HOR_RES 1024
-      #define FBDEV_VER_RES 600
-      #define FBDEV_BUFFER_SIZE (FBDEV_HOR_RES * 80)
+      @RESOLUTION@
       #define FBDEV_DEV "/dev/fb0"
       #define EVDEV_NAME "/dev/input/event0"
-      #define DISP_SW_ROTATE 1
-      #define DISP_ROTATION LV_DISP_ROT_90
-      #define DISP_FULL_REFRESH 1
+      @SWITCHES@
       #endif
       """
     ),
-    encoding="utf-8",
+      ABOUT="/* " + "\n * ".join(about) + " */",
+      RESOLUTION="\n".join([
+        f"#define FBDEV_HOR_RES {width}",
+        f"#define FBDEV_VER_RES {height}",
+        f"#define FBDEV_BUFFER_SIZE (FBDEV_HOR_RES * {profile.buffer_lines(options.color_depth)})",
+      ]),
+      SWITCHES="\n".join(switches),
+    ),
   )
 
 
-def write_ui_files() -> None:
-  header = GENERATED_DIR / "ui_app.h"
-  source = GENERATED_DIR / "ui_app.c"
+def write_ui_files(out: OutputWriter, web_dir: Path = WEB_DIR, options: GenOptions | None = None) -> FontUsage:
+  """Generate everything derived from web/; returns the font usage lv_conf.h is configured from."""
+  cache = IrCache(out.root / IR_DIR)
+  with profiler.stage("load_ir"):
+    ir, key = load_ir(web_dir, options, cache)
+  nodes, screens, messages = ir.nodes(), ir.screen_list(), ir.messages
+  write_ui_files_header(out, screens)
+  report = GenReport()
+  for note in ir.notes:
+    report.note(note)
+  previous = cache.load(cache.last().get("ir"))
+  if previous is not None and previous.screened == ir.screened:
+    diff = diff_ir(previous, ir)
+    if not diff.empty:
+      report.note(f"ir: changed since the last build: {diff.describe()}")
+  cache.save_last(ir=key)
+  with profiler.stage("generate_c", out, hot=True):
+    write_ui_source(out, nodes, messages, options, report, screens)
+  with profiler.stage("write_images", out):
+    write_images(out, nodes, web_dir, options)
+  with profiler.stage("write_fonts", out):
+    fonts = font_usage(nodes, messages, screens)
+    write_fonts(out, fonts, options)
+  print_gen_report(report)
+  return fonts
 
-  header.write_text(
-    textwrap.dedent(
-      """
-      #pragma once
-      void ui_build(void);
-      """
-    ),
-    encoding="utf-8",
-  )
 
-  parser = SimpleParser()
-  html_path = WEB_DIR / "index.html"
-  parser.feed(html_path.read_text(encoding="utf-8", errors="ignore"))
-  nodes = parser.nodes if parser.nodes else [Node("p", "(empty)")]
-  js_path = WEB_DIR / "js" / "app.js"
-  messages = parse_messages(js_path) if js_path.exists() else []
-  c_body = generate_c(nodes, messages)
-  source_content = '#include "ui_app.h"\n' + c_body
-  source.write_text(source_content, encoding="utf-8")
+def write_fonts(out: OutputWriter, fonts: FontUsage, options: GenOptions | None = None) -> None:
+  """Report font usage; with --fonts subset also emit generated/fonts/ui_font_<size>.c with only the used glyphs."""
+  options = options or GenOptions()
+  fonts_dir = out.root / "generated" / "fonts"
+  sizes = ", ".join(map(str, fonts.sizes))
+  if options.fonts != "subset":
+    if fonts_dir.exists():
+      shutil.rmtree(fonts_dir)
+    if options.fonts == "used":
+      print(f"[font] Montserrat {sizes} enabled ({len(FONT_SIZES) - len(set(fonts.sizes) & set(FONT_SIZES))} unused size(s) disabled)")
+    outside = fonts.outside_builtin()
+    if outside:
+      sample = "".join(outside[:12])
+      print(f"[font] warning: {len(outside)} character(s) are not in the built-in fonts ({sample}...); use --fonts subset --font-file")
+    return
+  if not options.font_file:
+    raise RuntimeError("--fonts subset needs --font-file PATH (a TTF/OTF that covers the UI text)")
+  font_path = Path(options.font_file)
+  cache_dir = default_font_cache()
+  hits = glyphs = flash = 0
+  keep = set()
+  for size in fonts.sizes:
+    font, hit = convert_font_cached(font_path, size, fonts.codepoints(size), options.font_bpp, cache_dir)
+    hits += hit
+    glyphs += font.meta["glyphs"]
+    flash += font.meta["bitmap_bytes"]
+    if font.meta["missing"]:
+      missing = "".join(map(chr, font.meta["missing"][:12]))
+      print(f"[font] warning: {font_path.name} has no glyph for {len(font.meta['missing'])} character(s) ({missing}) at {size} px")
+    name = f"{font_symbol(size)}.c"
+    keep.add(name)
+    out.write_text(f"generated/fonts/{name}", font.source)
+  for path in fonts_dir.iterdir():
+    if path.name not in keep:
+      path.unlink()
+  print(f"[font] {len(keep)} subset font(s) ({sizes} px), {glyphs} glyphs, {hits} from cache, {flash} bytes of glyph bitmaps")
 
 
-def write_cmakelists() -> None:
-  target = LVGL_DIR / "CMakeLists.txt"
-  target.write_text(
-    textwrap.dedent(
+def write_images(out: OutputWriter, nodes: list[Node], web_dir: Path, options: GenOptions | None = None) -> None:
+  """Convert every <img> into generated/images/<symbol>.c plus ui_images.{h,c}; stale files are removed."""
+  options = options or GenOptions()
+  images_dir = out.root / "generated" / "images"
+  refs = {image_symbol(n): n for n in nodes if n.tag in IMAGE_TAGS}
+  if not refs:
+    if images_dir.exists():
+      shutil.rmtree(images_dir)
+    return
+  fmt = ImageFormat(options.color_depth, options.color_16_swap, options.image_alpha, options.image_rle)
+  cache_dir = default_image_cache()
+  rle: dict[str, bool] = {}
+  hits = flash = 0
+  for sym, node in refs.items():
+    src = (web_dir / node.attrs["src"].split("?", 1)[0]).resolve()
+    try:
+      image, hit = convert_cached(src, node.resolved.w, node.resolved.h, fmt, cache_dir)
+    except OSError as exc:
+      print(f"[img] warning: cannot convert {node.attrs['src']} ({exc}); using an empty image")
+      image, hit = empty_image(), False
+    hits += hit
+    flash += image.meta["flash_bytes"]
+    rle[sym] = image.meta["rle"]
+    out.write_text(f"generated/images/{sym}.c", image.source_for(sym))
+  out.write_text("generated/images/ui_images.h", "\n".join(image_header_lines(rle)) + "\n")
+  out.write_text("generated/images/ui_images.c", "\n".join(image_init_lines(rle)) + "\n")
+  keep = {f"{sym}.c" for sym in refs} | {"ui_images.h", "ui_images.c"}
+  for path in images_dir.iterdir():
+    if path.name not in keep:
+      path.unlink()
+  print(f"[img] {len(refs)} image(s), {hits} from cache, {flash} bytes of pixel data in flash")
+
+
+def print_gen_report(report: GenReport) -> None:
+  for note in report.notes:
+    print(f"[gen] {note}")
+
+
+def write_ui_files_header(out: OutputWriter, screens: list[Screen] | None = None) -> None:
+  out.write_text("generated/ui_app.h", ui_header(screens))
+
+
+def read_web_text(path: Path) -> str:
+  return path.read_text(encoding="utf-8", errors="ignore") if path.exists() else ""
+
+
+def web_file_digest(path: Path) -> str:
+  """Hash of a web file read in chunks (app.js is never held in memory whole)."""
+  return sha256_file(path) if path.exists() else sha256_bytes(b"")
+
+
+def screen_html_paths(web_dir: Path) -> list[Path]:
+  """--screens inputs: index.html first, then the other web/*.html files by name."""
+  return [web_dir / "index.html"] + sorted(p for p in web_dir.glob("*.html") if p.name != "index.html")
+
+
+def parse_ui(web_dir: Path, options: GenOptions | None) -> tuple[list[Node], list[Screen] | None]:
+  """All nodes plus, with --screens, their split into screens (index.html <section>s, then the other web/*.html)."""
+  if options is None or not options.screens:
+    return parse_html(read_web_text(web_dir / "index.html"))
+  paths = screen_html_paths(web_dir)
+  return parse_html(read_web_text(paths[0]), options, {p.stem: read_web_text(p) for p in paths[1:]})
+
+
+def load_ir(web_dir: Path, options: GenOptions | None, cache: IrCache | None = None) -> tuple[UiIR, str]:
+  """The IR of web_dir and its input hash; parsed only when `cache` has no IR for these inputs."""
+  options = options or GenOptions()
+  paths = screen_html_paths(web_dir) if options.screens else [web_dir / "index.html"]
+  js_path = web_dir / "js" / "app.js"
+  files = [(p.name, p.read_bytes() if p.exists() else b"") for p in paths]
+  files.append((js_path.name, web_file_digest(js_path).encode("ascii")))
+  key = input_key(files, options)
+  ir = cache.load(key) if cache is not None else None
+  if ir is None:
+    with profiler.stage("parse_html", hot=True):
+      nodes, screens = parse_ui(web_dir, options)
+    js_report = GenReport()
+    with profiler.stage("parse_messages", hot=True):
+      messages = parse_messages(js_path, js_report)
+    ir = UiIR.from_parsed(nodes, screens, messages, js_report.notes)
+    if cache is not None:
+      cache.store(key, ir)
+  return ir, key
+
+
+def write_ui_source(
+  out: OutputWriter,
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions | None = None,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+) -> bool:
+  if options is not None and options.ui_format == "blob":
+    wrote = write_ui_blob(out, nodes, messages, options, report, screens)
+  else:
+    for rel in BLOB_FILES:
+      (out.root / rel).unlink(missing_ok=True)
+    wrote = out.write_chunks("generated/ui_app.c", iter_ui_source(nodes, messages, options, report, screens))
+  return write_screen_units(out, nodes, messages, options, report, screens) or wrote
+
+
+def write_ui_blob(
+  out: OutputWriter,
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+) -> bool:
+  """--ui-format blob: translator.blob_files written out (ui.blob, the loader and the ui_app.c that loads it)."""
+  wrote = False
+  for rel, data in blob_files(nodes, messages, options, report, screens).items():
+    wrote = out.write_bytes(rel, data) or wrote
+  return wrote
+
+
+def write_screen_units(
+  out: OutputWriter,
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions | None = None,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+) -> bool:
+  """--split-units: generated/screens/ui_screen_<name>.c per screen; screens whose unit_key is unchanged are not regenerated."""
+  units_dir = out.root / "generated" / "screens"
+  if options is None or not options.split_units or not screens:
+    if units_dir.exists():
+      shutil.rmtree(units_dir)
+    return False
+  report = report if report is not None else GenReport()
+  cache = IrCache(out.root / IR_DIR)
+  last = cache.last()
+  last_keys, last_reports = last.get("units", {}), last.get("unit_reports", {})
+  names = [screen.name for screen in screens]
+  keys: dict[str, str] = {}
+  # Stats and notes per unit, kept with the keys so skipped units still count toward the report.
+  reports: dict[str, dict] = {}
+  wrote = False
+  reused = 0
+  for i, screen in enumerate(screens):
+    rel = f"generated/screens/ui_screen_{screen.symbol.lower()}.c"
+    keys[rel] = unit_key(screen, names, messages, options)
+    if last_keys.get(rel) == keys[rel] and rel in last_reports and (out.root / rel).exists():
+      reports[rel] = last_reports[rel]
+      reused += 1
+    else:
+      unit_report = GenReport()
+      wrote = out.write_chunks(rel, iter_ui_source(nodes, messages, options, unit_report, screens, unit=i)) or wrote
+      reports[rel] = {"stats": unit_report.stats, "notes": unit_report.notes}
+    for stat, value in reports[rel]["stats"].items():
+      report.add(stat, value)
+    for note in reports[rel]["notes"]:
+      report.note(f"{screen.name}: {note}")
+  keep = {Path(rel).name for rel in keys}
+  for path in units_dir.iterdir():
+    if path.name not in keep:
+      path.unlink()
+  report.note(f"units: {len(screens) - reused} of {len(screens)} screen file(s) regenerated, {reused} unchanged since the last build")
+  cache.save_last(units=keys, unit_reports=reports)
+  return wrote
+
+
+def write_cmakelists(out: OutputWriter, options: GenOptions | None = None) -> None:
+  options = options or GenOptions()
+  extra = ["generated/ui_perf.c"] if options.perf_hooks else []
+  if options.ui_format == "blob":
+    extra += ["generated/ui_blob.c", "generated/ui_blob_data.c"]
+  out.write_text(
+    "CMakeLists.txt",
+    fill_template(textwrap.dedent(
       """
       cmake_minimum_required(VERSION 3.16)
       project(lvgl_web_ui C)
@@ -210,23 +577,48 @@ def write_cmakelists() -> None:
         message(FATAL_ERROR "lv_drivers not found at ${LV_DRIVERS_DIR}; please run main.py --build to prefetch.")
       endif()
 
-      FetchContent_Declare(
-        lvgl
-        GIT_REPOSITORY ${LVGL_GIT_URL}
-        GIT_TAG ${LVGL_TAG}
-        SOURCE_DIR ${LVGL_SOURCE_DIR}
-      )
-      FetchContent_MakeAvailable(lvgl)
+      # Set by main.py --build from the shared library cache (see libcache.py); empty = compile LVGL here.
+      set(LVGL_PREBUILT_LIB "" CACHE FILEPATH "Prebuilt liblvgl.a matching this lv_conf.h")
 
-      target_compile_definitions(lvgl PUBLIC
-        LV_CONF_INCLUDE_SIMPLE
-        LV_LVGL_H_INCLUDE_SIMPLE
-      )
-      target_include_directories(lvgl PUBLIC ${CMAKE_CURRENT_SOURCE_DIR})
+      if(LVGL_PREBUILT_LIB)
+        add_library(lvgl STATIC IMPORTED)
+        set_target_properties(lvgl PROPERTIES IMPORTED_LOCATION ${LVGL_PREBUILT_LIB})
+        set(lvgl_SOURCE_DIR ${LVGL_SOURCE_DIR})
+        target_compile_definitions(lvgl INTERFACE
+          LV_CONF_INCLUDE_SIMPLE
+          LV_LVGL_H_INCLUDE_SIMPLE
+        )
+        target_include_directories(lvgl INTERFACE ${LVGL_SOURCE_DIR} ${CMAKE_CURRENT_SOURCE_DIR})
+      else()
+        FetchContent_Declare(
+          lvgl
+          GIT_REPOSITORY ${LVGL_GIT_URL}
+          GIT_TAG ${LVGL_TAG}
+          SOURCE_DIR ${LVGL_SOURCE_DIR}
+        )
+        FetchContent_MakeAvailable(lvgl)
+
+        target_compile_definitions(lvgl PUBLIC
+          LV_CONF_INCLUDE_SIMPLE
+          LV_LVGL_H_INCLUDE_SIMPLE
+        )
+        target_include_directories(lvgl PUBLIC ${CMAKE_CURRENT_SOURCE_DIR})
+      endif()
+
+      # Converted <img> assets (see imgconv.py); empty when the page has no images.
+      file(GLOB UI_IMAGE_SOURCES CONFIGURE_DEPENDS ${CMAKE_CURRENT_SOURCE_DIR}/generated/images/*.c)
+      # Subset glyph fonts from --fonts subset (see fontconv.py); empty otherwise.
+      file(GLOB UI_FONT_SOURCES CONFIGURE_DEPENDS ${CMAKE_CURRENT_SOURCE_DIR}/generated/fonts/*.c)
+      # One translation unit per screen from --split-units (see ir.py); empty otherwise.
+      file(GLOB UI_SCREEN_SOURCES CONFIGURE_DEPENDS ${CMAKE_CURRENT_SOURCE_DIR}/generated/screens/*.c)
 
       add_executable(lvgl_web
         main.c
         generated/ui_app.c
+        ${UI_IMAGE_SOURCES}
+        ${UI_FONT_SOURCES}
+        ${UI_SCREEN_SOURCES}
+        @EXTRA_SOURCES@
         ${LV_DRIVERS_DIR}/display/fbdev.c
         ${LV_DRIVERS_DIR}/indev/evdev.c
       )
@@ -249,61 +641,237 @@ def write_cmakelists() -> None:
         lvgl
       )
       """
-    ),
-    encoding="utf-8",
+    ), EXTRA_SOURCES="\n".join(extra)),
   )
 
 
-def write_build_sh() -> None:
-  target = LVGL_DIR / "build.sh"
-  target.write_text(
+def write_build_sh(out: OutputWriter, options: GenOptions | None = None) -> None:
+  out.write_text(
+    "build.sh",
     textwrap.dedent(
       """
       #!/usr/bin/env bash
       set -euo pipefail
       SCRIPT_DIR=$(cd "$(dirname "$0")" && pwd)
       BUILD_DIR="$SCRIPT_DIR/build"
+      JOBS="${JOBS:-$(nproc 2>/dev/null || echo 4)}"
       mkdir -p "$BUILD_DIR"
       cd "$BUILD_DIR"
+      EXTRA_ARGS=()
+      # The generator can only be chosen when the build tree is first configured.
+      if [ ! -f CMakeCache.txt ] && command -v ninja >/dev/null 2>&1; then
+        EXTRA_ARGS+=(-G Ninja)
+      fi
+      if [ "${LVGL_WEB_CCACHE:-1}" != "0" ] && command -v ccache >/dev/null 2>&1; then
+        EXTRA_ARGS+=(-DCMAKE_C_COMPILER_LAUNCHER=ccache)
+      fi
       cmake .. -DCMAKE_BUILD_TYPE=Release \
         -DFETCHCONTENT_FULLY_DISCONNECTED=ON \
         -DFETCHCONTENT_QUIET=OFF \
         -DLVGL_SOURCE_DIR="$SCRIPT_DIR/.deps/lvgl" \
-        -DLV_DRIVERS_DIR="$SCRIPT_DIR/.deps/lv_drivers"
-      cmake --build . --config Release
+        -DLV_DRIVERS_DIR="$SCRIPT_DIR/.deps/lv_drivers" \
+        -DLVGL_PREBUILT_LIB="${LVGL_PREBUILT_LIB:-}" \
+        ${EXTRA_ARGS[@]+"${EXTRA_ARGS[@]}"}
+      cmake --build . --config Release -j "$JOBS"
       echo "Executable located at $BUILD_DIR/lvgl_web"
       """
     ),
-    encoding="utf-8",
+    mode=0o755,
   )
-  os.chmod(target, 0o755)
 
 
-def copy_web_assets() -> None:
-  dest = LVGL_DIR / "web_snapshot"
-  if dest.exists():
-    shutil.rmtree(dest)
-  shutil.copytree(WEB_DIR, dest)
+def write_tick_h(out: OutputWriter, options: GenOptions | None = None) -> None:
+  # CLOCK_MONOTONIC: wall-clock steps (NTP, RTC sync) must not stall or fast-forward LVGL timers.
+  out.write_text(
+    "tick.h",
+    textwrap.dedent(
+      """
+      #pragma once
+      #include <stdint.h>
+      #include <time.h>
+      static inline uint32_t lv_tick_custom_handler(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (uint32_t)((uint32_t)ts.tv_sec * 1000u + (uint32_t)(ts.tv_nsec / 1000000));
+      }
+      """
+    ),
+  )
 
 
-def ensure_repo(name: str, urls: list[str], tag: str, dest: Path) -> None:
-  if dest.exists():
-    print(f"[download] {name} already present at {dest}")
-    return
-  dest.parent.mkdir(parents=True, exist_ok=True)
-  for url in urls:
-    print(f"[download] cloning {name} from {url} (tag {tag}) -> {dest}")
-    try:
-      run(["git", "clone", "--depth=1", "--branch", tag, "--progress", url, str(dest)])
-      return
-    except subprocess.CalledProcessError as exc:
-      print(f"[warn] clone failed from {url}: {exc}")
-      if dest.exists():
-        shutil.rmtree(dest, ignore_errors=True)
-  raise RuntimeError(f"All clone attempts failed for {name}")
+def write_ui_perf(out: OutputWriter, options: GenOptions | None = None) -> None:
+  """Runtime timing hooks used by --perf-hooks; build with -DUI_PERF=0 to compile them out."""
+  options = options or GenOptions()
+  out.write_text(
+    "generated/ui_perf.h",
+    textwrap.dedent(
+      f"""
+      #pragma once
+      #include <stdint.h>
+
+      #ifndef UI_PERF
+      #define UI_PERF 1
+      #endif
+      #ifndef UI_PERF_REPORT_MS
+      #define UI_PERF_REPORT_MS {options.perf_report_ms}
+      #endif
+
+      #if UI_PERF
+      uint64_t ui_perf_now_us(void);
+      void ui_perf_record_build(uint64_t us);
+      void ui_perf_record_event(uint64_t us);
+      void ui_perf_record_timer(uint64_t us);
+      void ui_perf_poll(void);
+      void ui_perf_report(void);
+      #define UI_PERF_SCOPE_BEGIN() uint64_t ui_perf_t0_ = ui_perf_now_us()
+      #define UI_PERF_BUILD_END() ui_perf_record_build(ui_perf_now_us() - ui_perf_t0_)
+      #define UI_PERF_EVENT_END() ui_perf_record_event(ui_perf_now_us() - ui_perf_t0_)
+      #define UI_PERF_TIMER_END() ui_perf_record_timer(ui_perf_now_us() - ui_perf_t0_)
+      #define UI_PERF_POLL() ui_perf_poll()
+      #else
+      #define UI_PERF_SCOPE_BEGIN() ((void)0)
+      #define UI_PERF_BUILD_END() ((void)0)
+      #define UI_PERF_EVENT_END() ((void)0)
+      #define UI_PERF_TIMER_END() ((void)0)
+      #define UI_PERF_POLL() ((void)0)
+      #endif
+      """
+    ),
+  )
+  out.write_text(
+    "generated/ui_perf.c",
+    textwrap.dedent(
+      r"""
+      #include "lvgl.h"
+      #include "ui_perf.h"
+
+      #if UI_PERF
+      #include <stdio.h>
+      #include <stdlib.h>
+      #include <time.h>
+
+      /* lv_timer_handler() duration histogram, upper bounds in microseconds. */
+      #define UI_PERF_BUCKETS 8
+      static const uint32_t bucket_limit_us[UI_PERF_BUCKETS - 1] = {1000, 2000, 5000, 10000, 16667, 33333, 100000};
+      static const char * const bucket_name[UI_PERF_BUCKETS] = {"<1ms", "<2ms", "<5ms", "<10ms", "<16.7ms", "<33ms", "<100ms", ">=100ms"};
+
+      typedef struct {
+        uint32_t count;
+        uint64_t total_us;
+        uint32_t max_us;
+      } ui_perf_stat_t;
 
+      static ui_perf_stat_t timer_stat;
+      static ui_perf_stat_t event_stat;
+      static uint32_t timer_hist[UI_PERF_BUCKETS];
+      static uint32_t build_us;
+      static uint64_t last_report_us;
+      static FILE * log_fp;
 
-def maybe_build() -> None:
+      uint64_t ui_perf_now_us(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (uint64_t)ts.tv_sec * 1000000u + (uint64_t)(ts.tv_nsec / 1000);
+      }
+
+      static void stat_add(ui_perf_stat_t * s, uint64_t us) {
+        s->count++;
+        s->total_us += us;
+        if (us > s->max_us) s->max_us = (uint32_t)us;
+      }
+
+      void ui_perf_record_build(uint64_t us) {
+        build_us = (uint32_t)us;
+      }
+
+      void ui_perf_record_event(uint64_t us) {
+        stat_add(&event_stat, us);
+      }
+
+      void ui_perf_record_timer(uint64_t us) {
+        uint32_t b = 0;
+        stat_add(&timer_stat, us);
+        while (b < UI_PERF_BUCKETS - 1 && us >= bucket_limit_us[b]) b++;
+        timer_hist[b]++;
+      }
+
+      /* Stats go to stdout, or to the file named by the UI_PERF_LOG environment variable. */
+      static FILE * log_stream(void) {
+        if (log_fp == NULL) {
+          const char * path = getenv("UI_PERF_LOG");
+          if (path != NULL && path[0] != '\0') log_fp = fopen(path, "a");
+          if (log_fp == NULL) log_fp = stdout;
+        }
+        return log_fp;
+      }
+
+      void ui_perf_report(void) {
+        FILE * fp = log_stream();
+        fprintf(fp, "[ui_perf] ui_build %u us\n", (unsigned)build_us);
+        if (timer_stat.count) {
+          fprintf(fp, "[ui_perf] lv_timer_handler n=%u avg=%u us max=%u us |",
+                  (unsigned)timer_stat.count, (unsigned)(timer_stat.total_us / timer_stat.count), (unsigned)timer_stat.max_us);
+          for (uint32_t b = 0; b < UI_PERF_BUCKETS; b++) fprintf(fp, " %s:%u", bucket_name[b], (unsigned)timer_hist[b]);
+          fprintf(fp, "\n");
+        }
+        if (event_stat.count) {
+          fprintf(fp, "[ui_perf] event callbacks n=%u avg=%u us max=%u us\n",
+                  (unsigned)event_stat.count, (unsigned)(event_stat.total_us / event_stat.count), (unsigned)event_stat.max_us);
+        }
+      #if LV_MEM_CUSTOM == 0
+        lv_mem_monitor_t mon;
+        lv_mem_monitor(&mon);
+        fprintf(fp, "[ui_perf] lv_mem used %u/%u bytes (%u%%), peak %u, frag %u%%\n",
+                (unsigned)(mon.total_size - mon.free_size), (unsigned)mon.total_size,
+                (unsigned)mon.used_pct, (unsigned)mon.max_used, (unsigned)mon.frag_pct);
+      #endif
+        fflush(fp);
+        timer_stat = (ui_perf_stat_t){0};
+        event_stat = (ui_perf_stat_t){0};
+        for (uint32_t b = 0; b < UI_PERF_BUCKETS; b++) timer_hist[b] = 0;
+      }
+
+      void ui_perf_poll(void) {
+        uint64_t now = ui_perf_now_us();
+        if (last_report_us == 0) last_report_us = now;
+        if (now - last_report_us >= (uint64_t)UI_PERF_REPORT_MS * 1000u) {
+          ui_perf_report();
+          last_report_us = now;
+        }
+      }
+      #endif
+      """
+    ),
+  )
+
+
+def copy_web_assets(web_dir: Path = WEB_DIR, lvgl_dir: Path = LVGL_DIR, asset_store: Path | None = None) -> SyncStats:
+  """Mirror web/ into lvgl/web_snapshot, writing only files whose content changed."""
+  with profiler.stage("copy_web_assets") as record:
+    stats = sync_tree(web_dir, lvgl_dir / "web_snapshot", lvgl_dir / SNAPSHOT_MANIFEST, asset_store)
+    if record is not None:
+      record.bytes = stats.bytes
+  return stats
+
+
+class BuildConfig:
+  """Where --build keeps shared artifacts: the git dependency cache and the prebuilt LVGL cache."""
+
+  def __init__(
+    self,
+    deps_cache: Path,
+    lib_cache: Path | None = None,
+    offline: bool = False,
+    refresh_deps: bool = False,
+  ):
+    self.deps_cache = deps_cache
+    self.lib_cache = lib_cache
+    self.offline = offline
+    self.refresh_deps = refresh_deps
+
+
+def maybe_build(config: BuildConfig) -> None:
+  """Fetch dependencies and run build.sh; with `config.lib_cache`, link against a shared prebuilt LVGL."""
   if platform.system().lower() != "linux":
     print("Build step skipped: not running on Linux.")
     return
@@ -312,48 +880,456 @@ def maybe_build() -> None:
   if missing:
     print(f"Build step skipped: missing tools {missing}")
     return
-  ensure_repo("lvgl", [LVGL_REPO, LVGL_REPO_FALLBACK], LV_TAG, DEPS_DIR / "lvgl")
-  ensure_repo("lv_drivers", [LV_DRIVERS_REPO, LV_DRIVERS_REPO_FALLBACK], LV_DRIVERS_TAG, DEPS_DIR / "lv_drivers")
+  deps = [
+    Dependency("lvgl", [LVGL_REPO, LVGL_REPO_FALLBACK], LV_TAG),
+    Dependency("lv_drivers", [LV_DRIVERS_REPO, LV_DRIVERS_REPO_FALLBACK], LV_DRIVERS_TAG),
+  ]
+  try:
+    with profiler.stage("ensure_deps"):
+      ensure_deps(deps, DEPS_DIR, config.deps_cache, config.offline, config.refresh_deps)
+  except DependencyError as exc:
+    print(f"Build step skipped: {exc}")
+    return
+  env = dict(os.environ, LVGL_PREBUILT_LIB="")
+  try:
+    if config.lib_cache is not None:
+      with profiler.stage("lvgl libcache"):
+        env["LVGL_PREBUILT_LIB"] = str(ensure_lvgl_lib(LV_TAG, DEPS_DIR / "lvgl", LVGL_DIR, config.lib_cache))
+    with profiler.stage("build.sh"):
+      run(["bash", str(LVGL_DIR / "build.sh")], env=env)
+  except subprocess.CalledProcessError as exc:
+    print(f"Build failed: {exc}")
+
+
+def incremental_build(config: BuildConfig) -> None:
+  """Rebuild an already configured build tree; the first build goes through maybe_build()."""
+  if not (BUILD_DIR / "CMakeCache.txt").exists():
+    maybe_build(config)
+    return
   try:
-    run(["bash", str(LVGL_DIR / "build.sh")])
+    run(["cmake", "--build", str(BUILD_DIR), "--config", "Release", "-j", str(build_jobs())])
   except subprocess.CalledProcessError as exc:
     print(f"Build failed: {exc}")
 
 
+def write_project_files(out: OutputWriter, options: GenOptions | None = None, fonts: FontUsage | None = None) -> None:
+  """Everything in the LVGL tree that does not depend on the web inputs (lv_conf.h only on the font usage)."""
+  with profiler.stage("write_lv_conf", out):
+    write_lv_conf(out, options, fonts)
+  writers = [write_lv_drv_conf, write_main_c, write_cmakelists, write_build_sh, write_tick_h]
+  if options is not None and options.perf_hooks:
+    writers.append(write_ui_perf)
+  for writer in writers:
+    with profiler.stage(writer.__name__, out):
+      writer(out, options)
+
+
+def generate_all(web_dir: Path = WEB_DIR, lvgl_dir: Path = LVGL_DIR, options: GenOptions | None = None) -> OutputWriter:
+  ensure_dirs(lvgl_dir)
+  out = OutputWriter(lvgl_dir)
+  with profiler.stage("write_ui_files", out):
+    fonts = write_ui_files(out, web_dir, options)
+  write_project_files(out, options, fonts)
+  with profiler.stage("write_manifest"):
+    out.commit()
+  return out
+
+
+def translate_project(
+  name: str,
+  web_dir: Path,
+  lvgl_dir: Path,
+  options: GenOptions | None = None,
+  asset_store: Path | None = None,
+) -> dict:
+  """Batch worker: translate one web root into its own LVGL tree, timing every stage."""
+  timings: dict[str, float] = {}
+  report = GenReport()
+  result = {
+    "name": name, "ok": False, "error": None, "timings": timings, "written": 0, "stats": report.stats, "notes": report.notes,
+  }
+  start = time.perf_counter()
+
+  def lap(stage: str, since: float) -> float:
+    now = time.perf_counter()
+    timings[stage] = (now - since) * 1000.0
+    return now
+
+  try:
+    if not (web_dir / "index.html").is_file():
+      raise FileNotFoundError(f"{web_dir / 'index.html'} not found")
+    t = time.perf_counter()
+    nodes, screens = parse_ui(web_dir, options)
+    t = lap("html", t)
+    messages = parse_messages(web_dir / "js" / "app.js", report)
+    t = lap("js", t)
+    ensure_dirs(lvgl_dir)
+    out = OutputWriter(lvgl_dir)
+    write_ui_source(out, nodes, messages, options, report, screens)
+    t = lap("generate_c", t)
+    write_images(out, nodes, web_dir, options)
+    t = lap("images", t)
+    fonts = font_usage(nodes, messages, screens)
+    write_fonts(out, fonts, options)
+    t = lap("fonts", t)
+    write_project_files(out, options, fonts)
+    write_ui_files_header(out, screens)
+    out.commit()
+    result["written"] = len(out.written)
+    t = lap("write", t)
+    copy_web_assets(web_dir, lvgl_dir, asset_store)
+    lap("snapshot", t)
+    result["ok"] = True
+  except Exception as exc:  # reported in the batch summary instead of aborting the pool
+    result["error"] = f"{type(exc).__name__}: {exc}"
+  result["total_ms"] = (time.perf_counter() - start) * 1000.0
+  return result
+
+
+def run_batch(
+  spec: str,
+  out_root: Path,
+  jobs: int | None,
+  options: GenOptions | None = None,
+  asset_store: Path | None = None,
+) -> int:
+  from concurrent.futures import ProcessPoolExecutor, as_completed
+  from batch import check_unique_outputs, load_batch, print_summary
+
+  projects, manifest_workers = load_batch(spec, out_root)
+  if not projects:
+    print(f"[batch] no projects matched {spec}")
+    return 1
+  check_unique_outputs(projects)
+  workers = max(1, min(jobs or manifest_workers or os.cpu_count() or 1, len(projects)))
+  print(f"[batch] translating {len(projects)} project(s) with {workers} worker(s)")
+  start = time.perf_counter()
+  results = []
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(translate_project, p.name, p.web_dir, p.out_dir, options, asset_store) for p in projects]
+    for future in as_completed(futures):
+      res = future.result()
+      results.append(res)
+      status = "ok" if res["ok"] else f"FAILED ({res['error']})"
+      print(f"[batch] {res['name']}: {status} in {res['total_ms']:.1f} ms")
+      for note in res["notes"]:
+        print(f"[batch] {res['name']}: {note}")
+  print_summary(results, time.perf_counter() - start, workers)
+  return 0 if all(r["ok"] for r in results) else 1
+
+
+class WatchState:
+  """Parsed inputs kept in memory between --watch cycles, keyed by content hash."""
+
+  def __init__(
+    self,
+    options: GenOptions | None = None,
+    build_config: BuildConfig | None = None,
+    asset_store: Path | None = None,
+    web_dir: Path = WEB_DIR,
+    lvgl_dir: Path = LVGL_DIR,
+  ) -> None:
+    self.options = options
+    self.web_dir = web_dir
+    self.lvgl_dir = lvgl_dir
+    self.build_config = build_config
+    self.asset_store = asset_store
+    self.html_hash: str | None = None
+    self.js_hash: str | None = None
+    self.nodes: list[Node] = []
+    self.screens: list[Screen] | None = None
+    self.messages: list[str] = []
+
+  def cycle(self, build: bool, notes: bool = True) -> None:
+    """Re-run only the stages whose inputs changed and print the per-stage latency (and, with `notes`, the [gen] notes)."""
+    start = time.perf_counter()
+    report = GenReport()
+    timings: list[tuple[str, float]] = []
+
+    def lap(name: str, since: float) -> None:
+      timings.append((name, (time.perf_counter() - since) * 1000.0))
+
+    regenerate = False
+    t = time.perf_counter()
+    screens = self.options is not None and self.options.screens
+    paths = screen_html_paths(self.web_dir) if screens else [self.web_dir / "index.html"]
+    html = "\0".join(f"{p.name}\0{read_web_text(p)}" for p in paths)
+    html_hash = sha256_bytes(html.encode("utf-8"))
+    if html_hash != self.html_hash:
+      self.nodes, self.screens = parse_ui(self.web_dir, self.options)
+      self.html_hash = html_hash
+      regenerate = True
+      lap("html", t)
+    t = time.perf_counter()
+    js_path = self.web_dir / "js" / "app.js"
+    js_hash = web_file_digest(js_path)
+    if js_hash != self.js_hash:
+      messages = parse_messages(js_path, report)
+      self.js_hash = js_hash
+      regenerate = regenerate or messages != self.messages
+      self.messages = messages
+      lap("js", t)
+    wrote = False
+    out = OutputWriter(self.lvgl_dir)
+    if regenerate:
+      t = time.perf_counter()
+      wrote = write_ui_source(out, self.nodes, self.messages, self.options, report, self.screens)
+      write_ui_files_header(out, self.screens)
+      lap("generate_c", t)
+      # New text can add a font size or glyphs; lv_conf.h only changes when it does.
+      t = time.perf_counter()
+      fonts = font_usage(self.nodes, self.messages, self.screens)
+      write_fonts(out, fonts, self.options)
+      write_lv_conf(out, self.options, fonts)
+      lap("fonts", t)
+    # Image files can change without index.html changing; unchanged ones are cache hits.
+    t = time.perf_counter()
+    write_images(out, self.nodes, self.web_dir, self.options)
+    out.commit()
+    wrote = wrote or any(p.startswith(("generated/images/", "generated/fonts/", "generated/ui_app.h", "lv_conf.h")) for p in out.written)
+    lap("images", t)
+    t = time.perf_counter()
+    copy_web_assets(self.web_dir, self.lvgl_dir, self.asset_store)
+    lap("snapshot", t)
+    if build and wrote and self.build_config is not None:
+      t = time.perf_counter()
+      incremental_build(self.build_config)
+      lap("build", t)
+    total = (time.perf_counter() - start) * 1000.0
+    detail = ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings)
+    suffix = "" if wrote else " (ui_app.c unchanged)"
+    if notes:
+      print_gen_report(report)
+    print(f"[watch] cycle {total:.1f} ms: {detail}{suffix}")
+
+
+def watch_loop(
+  build_config: BuildConfig | None,
+  debounce: float,
+  force_polling: bool,
+  options: GenOptions | None = None,
+  asset_store: Path | None = None,
+  web_dir: Path = WEB_DIR,
+  lvgl_dir: Path = LVGL_DIR,
+) -> None:
+  """`build_config=None` regenerates sources only; otherwise every changed cycle also rebuilds."""
+  from watch import make_watcher
+
+  build = build_config is not None
+  state = WatchState(options, build_config, asset_store, web_dir, lvgl_dir)
+  generate_all(web_dir, lvgl_dir, options).report()
+  state.cycle(build=False, notes=False)  # generate_all already printed the notes
+  if build_config is not None:
+    maybe_build(build_config)
+  watcher = make_watcher(web_dir, force_polling=force_polling)
+  print(f"[watch] watching {web_dir} with {type(watcher).__name__} (debounce {debounce * 1000:.0f} ms); Ctrl+C to stop")
+  try:
+    while True:
+      changed = watcher.wait_debounced(debounce)
+      names = ", ".join(sorted(p.relative_to(web_dir).as_posix() if p.is_relative_to(web_dir) else str(p) for p in changed))
+      print(f"[watch] changed: {names}")
+      state.cycle(build)
+  except KeyboardInterrupt:
+    print("[watch] stopped")
+  finally:
+    watcher.close()
+
+
+def gen_options_from_args(args: argparse.Namespace) -> GenOptions:
+  return GenOptions(
+    intern_styles=not args.no_style_intern,
+    string_pool=not args.no_string_pool,
+    screens=args.screens,
+    screen_cache=args.screen_cache,
+    split_units=args.split_units,
+    ui_format=args.ui_format,
+    codegen=args.codegen,
+    layout=args.layout,
+    btnmatrix_threshold=args.btnmatrix_threshold,
+    events=args.events,
+    perf_hooks=args.perf_hooks,
+    perf_report_ms=args.perf_report_ms,
+    perf_monitor=args.perf_monitor,
+    color_depth=args.color_depth,
+    color_16_swap=args.color_16_swap,
+    image_alpha=args.img_alpha,
+    image_rle=args.img_rle,
+    display=args.display,
+    main_loop=args.main_loop,
+    fonts=args.fonts,
+    font_file=args.font_file,
+    font_bpp=args.font_bpp,
+  )
+
+
 def main() -> None:
   parser = argparse.ArgumentParser(description="Generate LVGL demo from web UI.")
   parser.add_argument("--build", action="store_true", help="Attempt to compile the LVGL executable (Linux).")
+  parser.add_argument("--watch", action="store_true", help="Keep running and regenerate (and rebuild with --build) when web/ changes.")
+  parser.add_argument("--debounce", type=float, default=0.15, help="Seconds of quiet before a --watch cycle runs (default 0.15).")
+  parser.add_argument("--poll", action="store_true", help="Use the polling watcher instead of inotify.")
+  parser.add_argument("--batch", metavar="SPEC", help="Translate many web roots in parallel: a .toml manifest or a glob such as 'skus/*/web'.")
+  parser.add_argument("--batch-out", type=Path, default=ROOT / "out", help="Output root for --batch projects without an explicit 'out' (default ./out).")
+  parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes for --batch and --serve (default: manifest 'workers' or CPU count).")
+  parser.add_argument(
+    "--serve",
+    nargs="?",
+    const="-",
+    metavar="SOCKET",
+    help="Run a translation service: JSON-line requests on stdin (or a Unix socket path), answered concurrently and cached; see service.py.",
+  )
+  parser.add_argument("--codegen", choices=("unrolled", "table"), default="unrolled", help="C emission style: one block per widget, or const descriptors plus a build loop.")
+  parser.add_argument(
+    "--layout",
+    choices=("flex", "static"),
+    default="flex",
+    help="Flow pages: LVGL flex at runtime, or positions and sizes resolved here for the --display resolution (build with -DUI_LAYOUT_CHECK=1 to compare against flex on the target).",
+  )
+  parser.add_argument(
+    "--btnmatrix-threshold",
+    type=int,
+    metavar="N",
+    help=f"Flow pages with more than N buttons draw them as one lv_btnmatrix instead of an lv_btn + lv_label each; 0 never (default {GenOptions.btnmatrix_threshold}).",
+  )
+  parser.add_argument(
+    "--events",
+    choices=("per-widget", "delegated"),
+    default="per-widget",
+    help="Click handling: one event callback per button, or bubbled clicks dispatched by one handler per screen through a ui_actions[] table.",
+  )
+  parser.add_argument("--no-style-intern", action="store_true", help="Emit per-widget local styles instead of shared lv_style_t objects.")
+  parser.add_argument(
+    "--screens",
+    action="store_true",
+    help="One screen per top-level <section> of index.html and per other web/*.html; only the first is built at boot.",
+  )
+  parser.add_argument(
+    "--screen-cache",
+    type=int,
+    default=1,
+    metavar="N",
+    help="With --screens: hidden screens kept built for quick return (LRU); 0 deletes a screen when it is left.",
+  )
+  parser.add_argument(
+    "--split-units",
+    action="store_true",
+    help="With --screens: build each screen in its own generated/screens/*.c, regenerated only when that screen (or the options) change.",
+  )
+  parser.add_argument(
+    "--ui-format",
+    choices=("c", "blob"),
+    default="c",
+    help="c: the UI compiled into ui_app.c; blob: a generic loader reads generated/ui.blob at startup ($UI_BLOB), so text and layout change without recompiling.",
+  )
+  parser.add_argument("--verify-blob", type=Path, metavar="PATH", help="Decode a ui.blob with the loader's checks, re-encode it byte for byte, print a summary and exit.")
+  parser.add_argument("--dump-ir", action="store_true", help="Print the parsed UI (screens, widgets with resolved styles, messages) as JSON and exit.")
+  parser.add_argument(
+    "--no-string-pool",
+    action="store_true",
+    help="Inline text literals and set labels with lv_label_set_text (LVGL heap copies) instead of one static ui_strings[] table.",
+  )
+  parser.add_argument("--color-depth", type=int, choices=(8, 16, 32), default=32, help="LV_COLOR_DEPTH and the pixel format <img> assets are converted to (16 = RGB565).")
+  parser.add_argument("--color-16-swap", action="store_true", help="With --color-depth 16, byte-swap RGB565 (LV_COLOR_16_SWAP) for SPI displays.")
+  parser.add_argument("--img-alpha", choices=("auto", "always", "never"), default="auto", help="Add an alpha channel to images: only when they have transparency (default), always or never.")
+  parser.add_argument("--img-rle", action="store_true", help="Store image pixels run-length encoded in flash and expand them into RAM at start-up.")
+  parser.add_argument("--fonts", choices=("used", "all", "subset"), default="used", help="Enable only the Montserrat sizes the UI uses (default), all of them, or emit subset fonts with just the used glyphs.")
+  parser.add_argument("--font-file", metavar="TTF", help="With --fonts subset: the TTF/OTF to rasterize (must cover the UI text, e.g. a CJK font).")
+  parser.add_argument("--font-bpp", type=int, choices=(1, 2, 4, 8), default=4, help="Anti-aliasing bits per pixel of --fonts subset glyphs (default 4).")
+  parser.add_argument("--display", default="legacy", metavar="PROFILE", help="Display profile (resolution, draw buffers, refresh, rotation): a built-in name or a .toml file; see --list-displays.")
+  parser.add_argument("--list-displays", action="store_true", help="Print the built-in display profiles with their memory cost and exit.")
+  parser.add_argument("--main-loop", choices=("fixed", "adaptive"), default="fixed", help="main.c loop: lv_timer_handler every 5 ms (default), or sleep until the next timer / touch input (poll on the evdev fd).")
+  parser.add_argument("--perf-hooks", action="store_true", help="Instrument the firmware: ui_build time, event latency, lv_timer_handler histogram, LVGL memory.")
+  parser.add_argument("--perf-report-ms", type=int, default=5000, help="How often --perf-hooks prints its stats (default 5000 ms).")
+  parser.add_argument("--perf-monitor", action="store_true", help="Enable LV_USE_PERF_MONITOR / LV_USE_MEM_MONITOR overlays in lv_conf.h.")
+  parser.add_argument("--asset-store", type=Path, metavar="DIR", help="Content-addressed store shared between projects; web_snapshot files become hardlinks into it.")
+  parser.add_argument("--deps-cache", type=Path, default=default_deps_cache(), metavar="DIR", help="Shared git mirrors for lvgl/lv_drivers (default $LVGL_WEB_DEPS_CACHE or ~/.cache/lvgl_web/deps).")
+  parser.add_argument("--offline", action="store_true", help="Resolve build dependencies from --deps-cache only; never fetch.")
+  parser.add_argument("--refresh-deps", action="store_true", help="Re-fetch dependency refs instead of reusing the commits recorded in the cache.")
+  parser.add_argument("--lib-cache", type=Path, default=default_lib_cache(), metavar="DIR", help="Shared prebuilt LVGL library cache (default $LVGL_WEB_CACHE or ~/.cache/lvgl_web/lib).")
+  parser.add_argument("--no-lib-cache", action="store_true", help="Compile LVGL inside the project build tree instead of using the shared cache.")
+  parser.add_argument("--profile", action="store_true", help="Time every stage (wall/CPU/bytes/subprocesses) and print a sorted table.")
+  parser.add_argument("--profile-trace", type=Path, metavar="PATH", help="With --profile, also write a Chrome trace-event JSON file.")
+  parser.add_argument("--cprofile", nargs="?", const="", metavar="PATH", help="Run the translation stages under cProfile; print hotspots and optionally dump stats to PATH.")
   args = parser.parse_args()
-
-  ensure_dirs()
-  write_lv_conf()
-  write_lv_drv_conf()
-  write_main_c()
-  write_ui_files()
-  write_cmakelists()
-  write_build_sh()
-  copy_web_assets()
-
-  tick_header = LVGL_DIR / "tick.h"
-  tick_header.write_text(
-    textwrap.dedent(
-      """
-      #pragma once
-      #include <stdint.h>
-      #include <sys/time.h>
-      static inline uint32_t lv_tick_custom_handler(void) {
-        struct timeval tv;
-        gettimeofday(&tv, NULL);
-        return (uint32_t)(tv.tv_sec * 1000u + (uint32_t)(tv.tv_usec / 1000u));
-      }
-      """
-    ),
-    encoding="utf-8",
+  if args.list_displays:
+    print("\n".join(describe_profiles(args.color_depth)))
+    return
+  try:
+    load_profile(args.display)
+  except (ValueError, RuntimeError) as exc:
+    parser.error(str(exc))
+  if args.screen_cache < 0:
+    parser.error("--screen-cache must be 0 or more")
+  if args.btnmatrix_threshold is not None and args.btnmatrix_threshold < 0:
+    parser.error("--btnmatrix-threshold must be 0 or more")
+  if args.split_units and not args.screens:
+    parser.error("--split-units needs --screens")
+  if args.ui_format == "blob":
+    ignored = [
+      flag for flag, used in (
+        ("--split-units", args.split_units),
+        ("--fonts subset", args.fonts == "subset"),
+        ("--layout static", args.layout == "static"),
+        ("--codegen table", args.codegen == "table"),
+        ("--events delegated", args.events == "delegated"),
+        ("--btnmatrix-threshold", args.btnmatrix_threshold is not None),
+      ) if used
+    ]
+    if ignored:
+      parser.error(f"--ui-format blob builds every screen from the blob with flex layout, per-widget buttons and the Montserrat fonts; drop {' / '.join(ignored)}")
+  if args.btnmatrix_threshold is None:
+    args.btnmatrix_threshold = GenOptions.btnmatrix_threshold
+  if args.verify_blob:
+    data = args.verify_blob.read_bytes()
+    problems = blob.verify_blob(data)
+    for problem in problems:
+      print(f"[blob] {args.verify_blob}: {problem}")
+    if problems:
+      sys.exit(1)
+    print(f"[blob] {args.verify_blob}: {blob.describe(data)}; round-trip ok")
+    return
+  options = gen_options_from_args(args)
+  if args.dump_ir:
+    print(load_ir(WEB_DIR, options)[0].dump())
+    return
+  build_config = BuildConfig(
+    deps_cache=args.deps_cache,
+    lib_cache=None if args.no_lib_cache else args.lib_cache,
+    offline=args.offline,
+    refresh_deps=args.refresh_deps,
   )
+  if args.profile or args.profile_trace or args.cprofile is not None:
+    profiler.enable(cprofile=args.cprofile is not None)
+
+  if args.serve:
+    from service import serve
+
+    serve(args.serve, args.jobs)
+    return
+
+  if args.batch:
+    if args.build:
+      print("[batch] --build is ignored in --batch mode; run each project's build.sh instead.")
+    sys.exit(run_batch(args.batch, args.batch_out, args.jobs, options, args.asset_store))
+
+  if args.watch:
+    watch_loop(build_config if args.build else None, args.debounce, args.poll, options, args.asset_store)
+    return
+
+  with profiler.stage("generate_all"):
+    out = generate_all(options=options)
+  out.report()
+  print(copy_web_assets(asset_store=args.asset_store).summary())
 
   if args.build:
-    maybe_build()
+    with profiler.stage("maybe_build"):
+      maybe_build(build_config)
   print("LVGL sources generated under ./lvgl. Run main.py --build on Linux to compile.")
+  profiler.report()
+  if args.profile_trace:
+    profiler.write_trace(args.profile_trace)
+  if args.cprofile is not None:
+    profiler.cprofile_report(dump=Path(args.cprofile) if args.cprofile else None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""Content-hash aware output layer for generated files.
+
+Every generated file goes through OutputWriter, which compares the SHA-256 of the
+new content with what is already on disk and only rewrites files whose bytes
+changed. Untouched files keep their mtime, so CMake only rebuilds what really
+depends on the edit. A small JSON manifest records the hash, size and mtime of
+each output so unchanged files can be recognised without re-reading them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+MANIFEST_NAME = ".gen_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def sha256_bytes(data: bytes) -> str:
+  return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 16) -> str:
+  digest = hashlib.sha256()
+  with path.open("rb") as fh:
+    for chunk in iter(lambda: fh.read(chunk_size), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+class OutputWriter:
+  """Write files under `root`, skipping those whose content is unchanged."""
+
+  def __init__(self, root: Path, manifest_name: str = MANIFEST_NAME) -> None:
+    self.root = Path(root)
+    self.manifest_path = self.root / manifest_name
+    self.entries: dict[str, dict] = self._load_manifest()
+    self.written: list[str] = []
+    self.skipped: list[str] = []
+    self.bytes_written = 0
+    self._dirty = False
+
+  def _load_manifest(self) -> dict[str, dict]:
+    try:
+      data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+      return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+  def _rel(self, path: Path | str) -> tuple[Path, str]:
+    target = Path(path)
+    if not target.is_absolute():
+      target = self.root / target
+    try:
+      rel = target.relative_to(self.root).as_posix()
+    except ValueError:
+      rel = target.as_posix()
+    return target, rel
+
+  def _current_hash(self, target: Path, rel: str) -> str | None:
+    """Hash of the file on disk, taken from the manifest when its stat still matches."""
+    try:
+      st = target.stat()
+    except OSError:
+      return None
+    entry = self.entries.get(rel)
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+      return entry.get("sha256")
+    return sha256_file(target)
+
+  def _record(self, target: Path, rel: str, digest: str) -> None:
+    st = target.stat()
+    entry = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if self.entries.get(rel) != entry:
+      self.entries[rel] = entry
+      self._dirty = True
+
+  @staticmethod
+  def _apply_mode(target: Path, mode: int | None) -> None:
+    if mode is not None and (target.stat().st_mode & 0o7777) != mode:
+      os.chmod(target, mode)
+
+  def write_bytes(self, path: Path | str, data: bytes, mode: int | None = None) -> bool:
+    """Write `data` to `path` unless identical bytes are already there. Returns True if written."""
+    target, rel = self._rel(path)
+    digest = sha256_bytes(data)
+    if self._current_hash(target, rel) == digest:
+      self._keep(target, rel, digest, mode)
+      return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", dir=target.parent)
+    try:
+      with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+      self._install(tmp_name, target, mode)
+    except BaseException:
+      Path(tmp_name).unlink(missing_ok=True)
+      raise
+    self._wrote(target, rel, digest, len(data))
+    return True
+
+  def write_text(self, path: Path | str, text: str, mode: int | None = None) -> bool:
+    return self.write_bytes(path, text.encode("utf-8"), mode)
+
+  def write_chunks(self, path: Path | str, chunks: Iterable[str], mode: int | None = None) -> bool:
+    """Stream text chunks into a temp file while hashing; keep the old file if the hash matches."""
+    target, rel = self._rel(path)
+    current = self._current_hash(target, rel)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", dir=target.parent)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+      with os.fdopen(fd, "wb") as fh:
+        for chunk in chunks:
+          data = chunk.encode("utf-8")
+          digest.update(data)
+          fh.write(data)
+          size += len(data)
+      if digest.hexdigest() == current:
+        Path(tmp_name).unlink()
+        self._keep(target, rel, current, mode)
+        return False
+      self._install(tmp_name, target, mode)
+    except BaseException:
+      Path(tmp_name).unlink(missing_ok=True)
+      raise
+    self._wrote(target, rel, digest.hexdigest(), size)
+    return True
+
+  @staticmethod
+  def _install(tmp_name: str, target: Path, mode: int | None) -> None:
+    os.chmod(tmp_name, mode if mode is not None else 0o644)
+    os.replace(tmp_name, target)
+
+  def _keep(self, target: Path, rel: str, digest: str, mode: int | None) -> None:
+    self._apply_mode(target, mode)
+    self._record(target, rel, digest)
+    self.skipped.append(rel)
+
+  def _wrote(self, target: Path, rel: str, digest: str, size: int) -> None:
+    self._record(target, rel, digest)
+    self.written.append(rel)
+    self.bytes_written += size
+
+  def commit(self) -> None:
+    """Persist the manifest if any entry changed."""
+    if not self._dirty:
+      return
+    self.root.mkdir(parents=True, exist_ok=True)
+    payload = {"version": MANIFEST_VERSION, "files": dict(sorted(self.entries.items()))}
+    self.manifest_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    self._dirty = False
+
+  def report(self) -> None:
+    print(f"[output] {len(self.written)} file(s) written, {len(self.skipped)} unchanged")
+    if self.written:
+      print(f"[output]   written:   {', '.join(self.written)}")
+    if self.skipped:
+      print(f"[output]   unchanged: {', '.join(self.skipped)}")
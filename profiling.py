@@ -0,0 +1,128 @@
+"""Stage timing for `main.py --profile` / `--cprofile`.
+
+`profiler.stage(name)` is a context manager recording wall-clock and CPU time,
+bytes written (when given an OutputWriter) and nesting, cheap enough to leave in
+place when profiling is off. Results print as a tree, slowest stage first at each level, and can
+be dumped in Chrome trace-event format (open in chrome://tracing or Perfetto).
+Stages marked `hot=True` are additionally run under cProfile with --cprofile.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+class StageRecord:
+  __slots__ = ("name", "category", "start", "wall", "cpu", "bytes", "depth", "args", "children")
+
+  def __init__(self, name: str, category: str, start: float, depth: int, args: dict):
+    self.name = name
+    self.category = category
+    self.start = start
+    self.wall = 0.0
+    self.cpu = 0.0
+    self.bytes = 0
+    self.depth = depth
+    self.args = args
+    self.children: list[StageRecord] = []
+
+
+class Profiler:
+  def __init__(self) -> None:
+    self.enabled = False
+    self.records: list[StageRecord] = []
+    self._stack: list[StageRecord] = []
+    self._origin = time.perf_counter()
+    self._cprofile: cProfile.Profile | None = None
+
+  def enable(self, cprofile: bool = False) -> None:
+    self.enabled = True
+    self._origin = time.perf_counter()
+    if cprofile:
+      self._cprofile = cProfile.Profile()
+
+  @contextmanager
+  def stage(self, name: str, out=None, category: str = "stage", hot: bool = False, **args) -> Iterator[StageRecord | None]:
+    if not self.enabled:
+      yield None
+      return
+    record = StageRecord(name, category, time.perf_counter(), len(self._stack), args)
+    if self._stack:
+      self._stack[-1].children.append(record)
+    bytes_before = out.bytes_written if out is not None else 0
+    cpu_before = time.process_time()
+    profile = self._cprofile if hot else None
+    self._stack.append(record)
+    if profile is not None:
+      profile.enable()
+    try:
+      yield record
+    finally:
+      if profile is not None:
+        profile.disable()
+      self._stack.pop()
+      record.wall = time.perf_counter() - record.start
+      record.cpu = time.process_time() - cpu_before
+      if out is not None:
+        record.bytes += out.bytes_written - bytes_before
+      self.records.append(record)
+
+  def report(self) -> None:
+    if not self.enabled or not self.records:
+      return
+    roots = [r for r in self.records if r.depth == 0]
+    total = sum(r.wall for r in roots)
+    print(f"[profile] {'stage':<36} {'wall ms':>10} {'cpu ms':>10} {'bytes':>10} {'share':>7}")
+
+    def emit(records: list[StageRecord]) -> None:
+      # Siblings sorted slowest first; children stay under their parent.
+      for r in sorted(records, key=lambda r: r.wall, reverse=True):
+        name = ("  " * r.depth + r.name)[:36]
+        share = f"{r.wall / total:6.1%}" if total else ""
+        size = str(r.bytes) if r.bytes else ""
+        print(f"[profile] {name:<36} {r.wall * 1000:>10.2f} {r.cpu * 1000:>10.2f} {size:>10} {share:>7}")
+        emit(r.children)
+
+    emit(roots)
+    print(f"[profile] total {total * 1000:.2f} ms across top-level stages")
+
+  def write_trace(self, path: Path) -> None:
+    pid, tid = os.getpid(), threading.get_ident() & 0xFFFF
+    events = [
+      {
+        "name": r.name,
+        "cat": r.category,
+        "ph": "X",
+        "ts": round((r.start - self._origin) * 1e6, 1),
+        "dur": round(r.wall * 1e6, 1),
+        "pid": pid,
+        "tid": tid,
+        "args": dict(r.args, cpu_ms=round(r.cpu * 1000, 3), bytes=r.bytes),
+      }
+      for r in sorted(self.records, key=lambda r: r.start)
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+    print(f"[profile] trace written to {path}")
+
+  def cprofile_report(self, limit: int = 25, dump: Path | None = None) -> None:
+    if self._cprofile is None:
+      return
+    if dump is not None:
+      self._cprofile.dump_stats(str(dump))
+      print(f"[cprofile] raw stats written to {dump}")
+    buf = io.StringIO()
+    pstats.Stats(self._cprofile, stream=buf).sort_stats("cumulative").print_stats(limit)
+    print("[cprofile] translation stage hotspots (cumulative):")
+    print(buf.getvalue().rstrip())
+
+
+profiler = Profiler()
@@ -0,0 +1,226 @@
+"""`main.py --serve`: a long-running translation service speaking JSON lines.
+
+  python main.py --serve                      # requests on stdin, responses on stdout
+  python main.py --serve /tmp/lvgl_web.sock   # Unix socket; every connection is its own stream
+  python main.py --serve - --jobs 8           # worker processes (default: CPU count)
+
+One request per line; only "html" is required, "options" are GenOptions fields:
+
+  {"id": 1, "html": "<h1>Hi</h1>", "js": "const messages = ['a'];", "options": {"codegen": "table"}}
+  {"id": 2, "html": "...", "pages": {"about": "<p>..."}, "options": {"screens": true}}
+  {"id": 3, "op": "stats"}
+
+Requests run concurrently on a process pool, so responses come back in
+completion order; match them by "id". Results are cached by
+translator.output_key (inputs, options and generator version); identical
+requests still in flight share one translation. Every response reports its
+latency, and a line per request goes to stderr:
+
+  {"id": 1, "ok": true, "cached": false, "ms": 8.4, "worker_ms": 6.9, "key": "...",
+   "files": {"generated/ui_app.c": "..."}, "binary": {"generated/ui.blob": "<base64>"},
+   "images": {"ui_img_logo_81c272": "img/logo.png"}, "fonts": {"16": "Hi"}, "stats": {...}, "notes": [...]}
+  {"id": 4, "ok": false, "error": "TypeError: ...", "ms": 0.2}
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+
+from translator import output_key, translate
+from util import GenOptions
+
+LINE_LIMIT = 64 * 1024 * 1024  # one request line (the whole page) may be large
+
+
+def _translate_job(html: str, js: str, options: dict, pages: dict[str, str] | None) -> dict:
+  """Worker process: run translate() and return a JSON-ready result."""
+  start = time.perf_counter()
+  result = translate(html, js, GenOptions(**options), pages)
+  files, binary = {}, {}
+  for rel, data in result.files.items():
+    try:
+      files[rel] = data.decode("utf-8")
+    except UnicodeDecodeError:
+      binary[rel] = base64.b64encode(data).decode("ascii")
+  return {
+    "key": result.key,
+    "files": files,
+    "binary": binary,
+    "images": result.images,
+    "fonts": {str(size): "".join(sorted(chars)) for size, chars in result.fonts.chars.items()},
+    "stats": result.stats,
+    "notes": result.notes,
+    "worker_ms": round((time.perf_counter() - start) * 1000.0, 3),
+  }
+
+
+class TranslationService:
+  """Cache, in-flight deduplication and latency accounting around a worker pool."""
+
+  def __init__(self, executor: Executor, cache_size: int = 256) -> None:
+    self.executor = executor
+    self.cache_size = cache_size
+    self.cache: OrderedDict[str, dict] = OrderedDict()
+    self.pending: dict[str, asyncio.Future] = {}
+    self.latencies: list[float] = []
+    self.requests = self.hits = self.errors = 0
+
+  async def handle(self, line: str) -> dict:
+    start = time.perf_counter()
+    request_id = None
+    try:
+      request = json.loads(line)
+      if not isinstance(request, dict):
+        raise ValueError("a request must be a JSON object")
+      request_id = request.get("id")
+      if request.get("op") == "stats":
+        return {"id": request_id, "ok": True, **self.stats()}
+      response = await self._translate(request)
+    except Exception as exc:  # reported to the client instead of ending the service
+      self.errors += 1
+      response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    ms = (time.perf_counter() - start) * 1000.0
+    self.requests += 1
+    self.latencies.append(ms)
+    del self.latencies[:-10000]
+    status = "cache hit" if response.get("cached") else response.get("error") or f"{response['worker_ms']:.1f} ms in worker"
+    print(f"[serve] {request_id}: {ms:.1f} ms ({status})", file=sys.stderr)
+    return {"id": request_id, **response, "ms": round(ms, 3)}
+
+  async def _translate(self, request: dict) -> dict:
+    html, js = request["html"], request.get("js", "")
+    options, pages = request.get("options") or {}, request.get("pages")
+    key = output_key(html, js, GenOptions(**options), pages)  # also rejects unknown option names
+    if key in self.cache:
+      self.cache.move_to_end(key)
+      self.hits += 1
+      return {"ok": True, "cached": True, **self.cache[key]}
+    if key in self.pending:
+      self.hits += 1
+      return {"ok": True, "cached": True, **await asyncio.shield(self.pending[key])}
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(self.executor, _translate_job, html, js, options, pages)
+    self.pending[key] = future
+    try:
+      result = await future
+    finally:
+      del self.pending[key]
+    self.cache[key] = result
+    while len(self.cache) > self.cache_size:
+      self.cache.popitem(last=False)
+    return {"ok": True, "cached": False, **result}
+
+  def stats(self) -> dict:
+    ordered = sorted(self.latencies)
+
+    def pct(p: float) -> float:
+      return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+    return {
+      "requests": self.requests,
+      "cache_hits": self.hits,
+      "errors": self.errors,
+      "cached_results": len(self.cache),
+      "p50_ms": round(pct(0.50), 3),
+      "p95_ms": round(pct(0.95), 3),
+      "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+  async def serve_lines(self, readline, write) -> None:
+    """Answer every request line concurrently; `readline()` returns b"" at the end, `write(data)` sends one response."""
+    lock = asyncio.Lock()
+    tasks: set[asyncio.Task] = set()
+
+    async def answer(line: str) -> None:
+      response = await self.handle(line)
+      async with lock:  # keeps response lines whole
+        await write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    while True:
+      try:
+        line = await readline()
+      except ValueError as exc:  # longer than LINE_LIMIT: the stream cannot be resynchronized
+        print(f"[serve] {exc}", file=sys.stderr)
+        break
+      if not line:
+        break
+      if line.strip():
+        task = asyncio.create_task(answer(line.decode("utf-8", errors="replace")))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+      await asyncio.gather(*tasks)
+
+  async def serve_stdio(self) -> None:
+    # A reader thread instead of pipe transports: stdin/stdout may also be regular files.
+    # It is a daemon so that an interrupted service does not wait for the next line.
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue[bytes] = asyncio.Queue()
+
+    def pump() -> None:
+      try:
+        for line in iter(sys.stdin.buffer.readline, b""):
+          loop.call_soon_threadsafe(lines.put_nowait, line)
+        loop.call_soon_threadsafe(lines.put_nowait, b"")
+      except RuntimeError:  # the loop is already closed
+        pass
+
+    threading.Thread(target=pump, name="serve-stdin", daemon=True).start()
+
+    async def write(data: bytes) -> None:
+      sys.stdout.buffer.write(data)
+      sys.stdout.buffer.flush()
+
+    await self.serve_lines(lines.get, write)
+
+  async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    async def write(data: bytes) -> None:
+      writer.write(data)
+      await writer.drain()
+
+    try:
+      await self.serve_lines(reader.readline, write)
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+
+
+async def _serve(socket_path: Path | None, jobs: int, cache_size: int) -> None:
+  with ProcessPoolExecutor(max_workers=jobs) as executor:
+    service = TranslationService(executor, cache_size)
+    if socket_path is None:
+      print(f"[serve] reading JSON-line requests from stdin with {jobs} worker(s)", file=sys.stderr)
+      await service.serve_stdio()
+      return
+    socket_path.unlink(missing_ok=True)
+    server = await asyncio.start_unix_server(service.serve_connection, path=str(socket_path), limit=LINE_LIMIT)
+    print(f"[serve] listening on {socket_path} with {jobs} worker(s)", file=sys.stderr)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+      loop.add_signal_handler(sig, stop.set)
+    try:
+      async with server:
+        await stop.wait()
+      print("[serve] stopped", file=sys.stderr)
+    finally:
+      socket_path.unlink(missing_ok=True)
+
+
+def serve(target: str, jobs: int | None = None, cache_size: int = 256) -> None:
+  """Run until stdin closes (`target` "-") or forever on the Unix socket `target`."""
+  socket_path = None if target == "-" else Path(target)
+  try:
+    asyncio.run(_serve(socket_path, max(1, jobs or os.cpu_count() or 1), cache_size))
+  except KeyboardInterrupt:
+    pass
@@ -0,0 +1,140 @@
+"""Differential `web/` -> `lvgl/web_snapshot` sync.
+
+Files are compared by size/mtime against the manifest of the previous sync and
+only hashed when the stat changed; only files whose content changed are
+written, files removed from the source are deleted from the snapshot. New
+content is placed with a reflink (copy-on-write clone) where the filesystem
+supports it and a plain copy otherwise.
+
+With a content-addressed store (`--asset-store DIR`), every blob is kept once as
+`DIR/ab/abcdef...` and snapshots hardlink to it, so identical assets shared by
+many projects occupy disk space once. Snapshot files are then shared inodes and
+must be treated as read-only.
+"""
+from __future__ import annotations
+
+import errno
+import json
+import os
+import shutil
+from pathlib import Path
+
+try:
+  import fcntl
+except ImportError:  # not POSIX: plain copies only
+  fcntl = None
+
+from output import sha256_file
+
+MANIFEST_NAME = ".snapshot_manifest.json"
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+class SyncStats:
+  def __init__(self) -> None:
+    self.copied = 0
+    self.linked = 0
+    self.unchanged = 0
+    self.removed = 0
+    self.bytes = 0
+
+  def summary(self) -> str:
+    return (
+      f"[snapshot] {self.copied} copied, {self.linked} linked, {self.unchanged} unchanged, "
+      f"{self.removed} removed ({self.bytes} bytes written)"
+    )
+
+
+def _reflink_or_copy(src: Path, dst: Path) -> bool:
+  """Clone `src` to `dst`; returns True if it was a reflink, False for a byte copy."""
+  if fcntl is None:
+    shutil.copy2(src, dst)
+    return False
+  try:
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+      fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+    shutil.copystat(src, dst)
+    return True
+  except OSError as exc:
+    if exc.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EBADF, errno.ENOSYS):
+      raise
+  shutil.copy2(src, dst)
+  return False
+
+
+def store_blob(store: Path, src: Path, digest: str) -> Path:
+  """Add `src` to the content-addressed store (no-op if the blob exists) and return the blob path."""
+  blob = store / digest[:2] / digest
+  if blob.exists():
+    return blob
+  blob.parent.mkdir(parents=True, exist_ok=True)
+  tmp = blob.with_name(f".{digest}.{os.getpid()}.tmp")
+  _reflink_or_copy(src, tmp)
+  os.chmod(tmp, 0o444)
+  os.replace(tmp, blob)
+  return blob
+
+
+def _place(src: Path, dst: Path, digest: str, store: Path | None, stats: SyncStats) -> None:
+  dst.parent.mkdir(parents=True, exist_ok=True)
+  tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+  if store is not None:
+    blob = store_blob(store, src, digest)
+    try:
+      os.link(blob, tmp)
+      os.replace(tmp, dst)
+      stats.linked += 1
+      return
+    except OSError:  # store on another filesystem; fall back to a private copy
+      tmp.unlink(missing_ok=True)
+  if _reflink_or_copy(src, tmp):
+    stats.linked += 1
+  else:
+    stats.copied += 1
+    stats.bytes += src.stat().st_size
+  os.replace(tmp, dst)
+
+
+def _load_manifest(path: Path) -> dict[str, list]:
+  try:
+    return json.loads(path.read_text(encoding="utf-8"))
+  except (OSError, ValueError):
+    return {}
+
+
+def sync_tree(src_root: Path, dest_root: Path, manifest_path: Path, store: Path | None = None) -> SyncStats:
+  """Make `dest_root` mirror `src_root`, touching only what changed since the last sync."""
+  stats = SyncStats()
+  old = _load_manifest(manifest_path)
+  new: dict[str, list] = {}
+  for dirpath, _, filenames in os.walk(src_root):
+    for name in sorted(filenames):
+      src = Path(dirpath) / name
+      rel = src.relative_to(src_root).as_posix()
+      dst = dest_root / rel
+      st = src.stat()
+      prev = old.get(rel)
+      dst_ok = dst.is_file() and dst.stat().st_size == st.st_size
+      if prev and dst_ok and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+        new[rel] = prev
+        stats.unchanged += 1
+        continue
+      digest = sha256_file(src)
+      new[rel] = [st.st_size, st.st_mtime_ns, digest]
+      if dst_ok and (prev[2] == digest if prev else sha256_file(dst) == digest):
+        stats.unchanged += 1
+        continue
+      _place(src, dst, digest, store, stats)
+  if dest_root.exists():
+    for dirpath, dirnames, filenames in os.walk(dest_root, topdown=False):
+      for name in filenames:
+        path = Path(dirpath) / name
+        if path.relative_to(dest_root).as_posix() not in new:
+          path.unlink()
+          stats.removed += 1
+      if Path(dirpath) != dest_root and not os.listdir(dirpath):
+        os.rmdir(dirpath)
+  tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+  tmp.write_text(json.dumps(new, sort_keys=True), encoding="utf-8")
+  os.replace(tmp, manifest_path)
+  return stats
@@ -0,0 +1,166 @@
+"""In-memory translation: `translate(html, js, options) -> Outputs`.
+
+The inputs are strings and nothing is written: the result holds the generated
+sources as bytes keyed by their path under the LVGL tree. Two reads remain: a
+`display` option naming a .toml profile is loaded (`--layout static` lays pages
+out for it), and `output_key` hashes the generator's own sources once per
+process. The key covers the resolved profile fields, not the .toml path, so
+an edited panel file gives a new key.
+
+main.py writes these same pieces to disk (adding the IR cache, incremental
+split units and the project files); `main.py --serve` (service.py) answers
+translation requests with it from a long-running process.
+
+Images and fonts stay with the caller because they are files, not text:
+
+  - images: `Outputs.images` maps each symbol the sources reference to its
+    <img src>; imgconv converts them (main.py write_images);
+  - fonts: `Outputs.fonts` is the usage lv_conf.h and `--fonts subset` are
+    configured from (main.py write_lv_conf / write_fonts).
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+from typing import Iterator, NamedTuple
+
+import blob
+from ir import display_fields, generator_digest
+from output import sha256_bytes
+from util import (
+  IMAGE_TAGS,
+  FontUsage,
+  GenOptions,
+  GenReport,
+  Node,
+  Screen,
+  SimpleParser,
+  font_usage,
+  image_symbol,
+  iter_c,
+  parse_messages_text,
+  screen_header_lines,
+  split_screens,
+  unique_screens,
+)
+
+OUTPUTS_VERSION = 1
+# Every module that shapes translate() output.
+_SOURCES = ("util.py", "layout.py", "jslex.py", "display.py", "blob.py", "translator.py")
+
+
+class Outputs(NamedTuple):
+  files: dict[str, bytes]  # path under the LVGL tree -> content
+  images: dict[str, str]  # image symbol -> <img src>, converted by the caller
+  fonts: FontUsage
+  stats: dict[str, int]
+  notes: list[str]
+  key: str  # output_key() of the inputs: equal keys give equal outputs
+
+
+def parse_nodes(html: str) -> list[Node]:
+  parser = SimpleParser()
+  parser.feed(html)
+  return parser.nodes if parser.nodes else [Node("p", "(empty)", {})]
+
+
+def parse_html(
+  html: str, options: GenOptions | None = None, pages: dict[str, str] | None = None
+) -> tuple[list[Node], list[Screen] | None]:
+  """All nodes plus, with --screens, their split into screens.
+
+  `html` is index.html; `pages` are the other web/*.html files by stem, in order.
+  """
+  if options is None or not options.screens:
+    return parse_nodes(html), None
+  parser = SimpleParser()
+  parser.feed(html)
+  screens = split_screens(parser)
+  for name, text in (pages or {}).items():
+    parser = SimpleParser()
+    parser.feed(text)
+    screens.append(Screen(name, parser.nodes))
+  for screen in screens:
+    screen.nodes = screen.nodes or [Node("p", "(empty)", {})]
+  screens = unique_screens(screens)
+  return [n for screen in screens for n in screen.nodes], screens
+
+
+def ui_header(screens: list[Screen] | None = None) -> str:
+  text = "\n#pragma once\nvoid ui_build(void);\n"
+  if screens:
+    text += "\n" + "\n".join(screen_header_lines(screens)) + "\n"
+  return text
+
+
+def iter_ui_source(
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions | None = None,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+  unit: int | None = None,
+) -> Iterator[str]:
+  yield '#include "ui_app.h"\n'
+  yield from iter_c(nodes, messages, options, report, screens=screens, unit=unit)
+
+
+def blob_files(
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+) -> dict[str, bytes]:
+  """--ui-format blob: generated/ui.blob, the generic loader, the linked-in fallback copy and a ui_app.c that loads it."""
+  report = report if report is not None else GenReport()
+  ui = blob.build_ui(nodes, messages, screens)
+  data = blob.encode(ui)
+  problems = blob.verify_blob(data, ui)
+  if problems:
+    raise blob.BlobError("round-trip check failed: " + "; ".join(problems))
+  images = sorted({image_symbol(n) for n in nodes if n.tag in IMAGE_TAGS})
+  report.add("blob_bytes", len(data))
+  report.note(f"blob: {blob.describe(data)}; round-trip ok")
+  defaults = GenOptions()
+  for field in ("split_units", "layout", "codegen", "events", "btnmatrix_threshold"):
+    if getattr(options, field) != getattr(defaults, field):
+      report.note(f"blob: {field}={getattr(options, field)!r} does not apply to --ui-format blob and was ignored")
+  texts = {
+    "generated/ui_blob.h": blob.loader_header(),
+    "generated/ui_blob.c": blob.loader_source(),
+    "generated/ui_blob_data.c": blob.data_source(data),
+    "generated/ui_app.c": blob.app_source(images, bool(screens), options.perf_hooks),
+  }
+  return {"generated/ui.blob": data, **{rel: text.encode("utf-8") for rel, text in texts.items()}}
+
+
+def output_key(html: str, js: str, options: GenOptions | None = None, pages: dict[str, str] | None = None) -> str:
+  """Hash of everything translate() depends on, the generator's own sources included."""
+  options = options or GenOptions()
+  head = [OUTPUTS_VERSION, generator_digest(_SOURCES), dataclasses.asdict(options), display_fields(options), sorted((pages or {}).items())]
+  return sha256_bytes(json.dumps([head, html, js], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+
+def translate(html: str, js: str, options: GenOptions | None = None, pages: dict[str, str] | None = None) -> Outputs:
+  """Translate index.html text and app.js text into the generated UI sources, in memory."""
+  options = options or GenOptions()
+  report = GenReport()
+  nodes, screens = parse_html(html, options, pages)
+  messages = parse_messages_text(js, report)
+  files: dict[str, bytes] = {"generated/ui_app.h": ui_header(screens).encode("utf-8")}
+  if options.ui_format == "blob":
+    files.update(blob_files(nodes, messages, options, report, screens))
+  else:
+    files["generated/ui_app.c"] = "".join(iter_ui_source(nodes, messages, options, report, screens)).encode("utf-8")
+    if options.split_units and screens:
+      for i, screen in enumerate(screens):
+        rel = f"generated/screens/ui_screen_{screen.symbol.lower()}.c"
+        unit_report = GenReport()
+        files[rel] = "".join(iter_ui_source(nodes, messages, options, unit_report, screens, unit=i)).encode("utf-8")
+        for stat, value in unit_report.stats.items():
+          report.add(stat, value)
+        report.notes += [f"{screen.name}: {note}" for note in unit_report.notes]
+  images = {image_symbol(n): n.attrs["src"] for n in nodes if n.tag in IMAGE_TAGS}
+  fonts = font_usage(nodes, messages, screens)
+  return Outputs(files, images, fonts, report.stats, report.notes, output_key(html, js, options, pages))
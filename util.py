@@ -1,17 +1,28 @@
 """
 Minimal HTML+JS to LVGL translator:
-- Supports text (<p>, <span>, <h1>-<h3>, <button>) and a simple click-to-cycle message array from JS.
+- Supports text (<p>, <span>, <h1>-<h3>, <button>), images (<img src>) and a simple click-to-cycle message array from JS.
 - Layout: vertical stack centered.
 """
 from __future__ import annotations
 
+import hashlib
 import re
+from dataclasses import dataclass
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
+
+from display import load_profile
+from jslex import JsScan, scan_js
+from layout import GRID_PAD, SCREEN_PAD, Box, PageLayout, check_layout, resolve_page
 
 TEXT_TAGS = {"p", "span", "h1", "h2", "h3"}
 BUTTON_TAGS = {"button"}
+IMAGE_TAGS = {"img"}
+FONT_SIZES = (16, 18, 22, 30, 36)
+DEFAULT_FONT_SIZE = 16  # LV_FONT_DEFAULT; the theme draws every unstyled label with it
+BUILTIN_GLYPHS = range(0x20, 0x7F)  # LVGL's bundled Montserrat fonts cover printable ASCII only
+_C_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
 
 
 def parse_style(style: str) -> dict[str, str]:
@@ -62,20 +73,75 @@ def parse_css_color(value: str | None) -> int | None:
   return (r << 16) | (g << 8) | b
 
 
-def pick_font(size_px: int | None) -> str | None:
+def nearest_font_size(size_px: int | None) -> int | None:
   if size_px is None:
     return None
-  options = [16, 18, 22, 30, 36]
-  nearest = min(options, key=lambda v: abs(v - size_px))
-  return f"&lv_font_montserrat_{nearest}"
+  return min(FONT_SIZES, key=lambda v: abs(v - size_px))
+
+
+def pick_font(size_px: int | None) -> str | None:
+  nearest = nearest_font_size(size_px)
+  return None if nearest is None else f"&lv_font_montserrat_{nearest}"
+
+
+def c_string(text: str) -> str:
+  """Quote `text` as a C string literal (UTF-8 passes through, control chars become octal escapes)."""
+  out = ['"']
+  for ch in text:
+    code = ord(ch)
+    if ch in _C_ESCAPES:
+      out.append(_C_ESCAPES[ch])
+    elif code < 0x20 or code == 0x7F:
+      out.append(f"\\{code:03o}")
+    elif ch == "?" and out[-1].endswith("?"):
+      out.append("\\?")  # avoid forming trigraphs such as ??=
+    else:
+      out.append(ch)
+  out.append('"')
+  return "".join(out)
+
+
+def _first_length(*values: str | None) -> int | None:
+  for value in values:
+    length = parse_css_length(value)
+    if length is not None:
+      return length
+  return None
+
+
+class ResolvedStyle:
+  """Inline style and data-* geometry of one node, parsed once into ints (None when unset).
+
+  Images also take the HTML width/height attributes, and their size alone does not
+  switch the page to absolute layout (it is baked into the converted bitmap).
+  """
+  __slots__ = ("x", "y", "w", "h", "color", "bg_color", "font", "positioned")
+
+  def __init__(self, style: dict[str, str], attrs: dict[str, str], image: bool = False):
+    self.x = _first_length(style.get("left"), attrs.get("data-x"))
+    self.y = _first_length(style.get("top"), attrs.get("data-y"))
+    self.w = _first_length(style.get("width"), attrs.get("data-w"), attrs.get("width") if image else None)
+    self.h = _first_length(style.get("height"), attrs.get("data-h"), attrs.get("height") if image else None)
+    self.color = parse_css_color(style.get("color"))
+    self.bg_color = parse_css_color(style.get("background-color") or style.get("background"))
+    self.font = nearest_font_size(parse_css_length(style.get("font-size")))
+    sized = () if image else ("width", "height")
+    self.positioned = (
+      style.get("position") == "absolute"
+      or any(k in style for k in ("left", "top", *sized))
+      or any(k in attrs for k in ("data-x", "data-y", *("data-" + k[0] for k in sized)))
+    )
 
 
 class Node:
+  __slots__ = ("tag", "text", "attrs", "style", "resolved")
+
   def __init__(self, tag: str, text: str, attrs: dict[str, str]):
     self.tag = tag
     self.text = text.strip()
     self.attrs = attrs
     self.style = parse_style(attrs.get("style", ""))
+    self.resolved = ResolvedStyle(self.style, attrs, tag in IMAGE_TAGS)
 
 
 class SimpleParser(HTMLParser):
@@ -85,14 +151,28 @@ class SimpleParser(HTMLParser):
     self._current_tag: str | None = None
     self._buffer: List[str] = []
     self._current_attrs: dict[str, str] = {}
+    self.sections: list[tuple[str, int]] = []  # top-level <section>: (id, index of its first node)
+    self._section_depth = 0
 
   def handle_starttag(self, tag, attrs):
+    if tag == "section":
+      if self._section_depth == 0:
+        self.sections.append((dict(attrs).get("id") or "", len(self.nodes)))
+      self._section_depth += 1
+      return
+    if tag in IMAGE_TAGS:
+      attrs = {k: (v if v is not None else "") for k, v in attrs}
+      if attrs.get("src"):
+        self.nodes.append(Node(tag, "", attrs))
+      return
     if tag in TEXT_TAGS or tag in BUTTON_TAGS:
       self._current_tag = tag
       self._buffer = []
       self._current_attrs = {k: (v if v is not None else "") for k, v in attrs}
 
   def handle_endtag(self, tag):
+    if tag == "section":
+      self._section_depth = max(0, self._section_depth - 1)
     if tag == self._current_tag:
       self._flush(tag)
       self._current_tag = None
@@ -110,181 +190,1405 @@ class SimpleParser(HTMLParser):
     self._buffer = []
 
 
-def parse_messages(js_path: Path) -> list[str]:
+class Screen:
+  """One page of a `--screens` UI: a top-level <section> of index.html or another web/*.html file."""
+  __slots__ = ("name", "nodes")
+
+  def __init__(self, name: str, nodes: list[Node]):
+    self.name = name
+    self.nodes = nodes
+
+  @property
+  def symbol(self) -> str:
+    return re.sub(r"\W", "_", self.name, flags=re.ASCII).upper()
+
+
+def split_screens(parser: SimpleParser, name: str = "main") -> list[Screen]:
+  """One screen per top-level <section> (named by its id); nodes before the first section join it."""
+  nodes = parser.nodes
+  if not parser.sections:
+    return [Screen(name, nodes)]
+  screens = []
+  for i, (section_id, start) in enumerate(parser.sections):
+    end = parser.sections[i + 1][1] if i + 1 < len(parser.sections) else len(nodes)
+    screens.append(Screen(section_id or f"{name}_{i}", nodes[0 if i == 0 else start:end]))
+  return screens
+
+
+def unique_screens(screens: list[Screen]) -> list[Screen]:
+  """Make the C symbols unique (`a-b` and `a_b` would both become UI_SCREEN_A_B)."""
+  seen: set[str] = set()
+  for screen in screens:
+    base, n = screen.name, 2
+    while screen.symbol in seen or not screen.symbol.strip("_"):
+      screen.name = f"{base}_{n}" if base.strip("_") else f"screen_{n}"
+      n += 1
+    seen.add(screen.symbol)
+  return screens
+
+
+def screen_header_lines(screens: list[Screen]) -> Iterator[str]:
+  """ui_app.h additions for --screens: screen ids and the navigation entry point."""
+  yield "/* Screen ids for ui_show_screen(); ui_build() builds only the first one. */"
+  yield "enum {"
+  for i, screen in enumerate(screens):
+    yield f"  UI_SCREEN_{screen.symbol} = {i},"
+  yield "  UI_SCREEN_COUNT"
+  yield "};"
+  yield "void ui_show_screen(int id);"
+
+
+def parse_messages(js_path: Path, report: GenReport | None = None) -> list[str]:
   if not js_path.exists():
     return []
-  text = js_path.read_text(encoding="utf-8", errors="ignore")
-  m = re.search(r"messages\s*=\s*\[([^\]]+)\]", text)
-  if not m:
+  with js_path.open(encoding="utf-8", errors="ignore") as fh:
+    return _messages(scan_js(fh), report)
+
+
+def parse_messages_text(text: str, report: GenReport | None = None) -> list[str]:
+  return _messages(scan_js(text), report)
+
+
+def _messages(scan: JsScan, report: GenReport | None) -> list[str]:
+  """String items of the `messages` array in source order; lexer/extractor diagnostics go to the report."""
+  if report is not None:
+    for diag in scan.diagnostics:
+      report.note(f"js: {diag}")
+  items = scan.constants.get("messages")
+  if not isinstance(items, list):
     return []
-  raw = m.group(1)
-  parts = re.findall(r'"([^"]+)"', raw) + re.findall(r"'([^']+)'", raw)
-  return [p.strip() for p in parts if p.strip()]
-
-
-def generate_c(nodes: list[Node], messages: list[str]) -> str:
-  title = next((n.text for n in nodes if n.tag in ("h1", "h2", "h3")), "LVGL Demo")
-  text_nodes = [n for n in nodes if n.tag in TEXT_TAGS]
-  button_nodes = [n for n in nodes if n.tag in BUTTON_TAGS]
-  button_texts = [n.text for n in button_nodes]
-  btn_text = button_texts[0] if button_texts else "Click"
-  multi_buttons = len(button_texts) > 1
-  first_text = text_nodes[0].text if text_nodes else ""
-  if not first_text:
-    first_text = "Tap a cell"
-  use_messages = bool(messages)
-  if use_messages:
-    msgs = messages
+  return [item.strip() for item in items if isinstance(item, str) and item.strip()]
+
+
+def image_symbol(node: Node) -> str:
+  """C symbol of the lv_img_dsc_t converted for this <img>; unique per (src, requested size)."""
+  src = node.attrs.get("src", "")
+  box = node.resolved
+  stem = re.sub(r"[^0-9a-zA-Z]+", "_", Path(src.split("?", 1)[0]).stem).strip("_").lower() or "img"
+  digest = hashlib.sha1(src.encode("utf-8")).hexdigest()[:6]
+  size = "" if box.w is None and box.h is None else f"_{box.w or 0}x{box.h or 0}"
+  return f"ui_img_{stem}_{digest}{size}"
+
+
+@dataclass
+class GenOptions:
+  """Code generation switches; the defaults match `python main.py` without flags."""
+  intern_styles: bool = True
+  string_pool: bool = True  # one deduplicated ui_strings[] + lv_label_set_text_static
+  screens: bool = False  # one screen per top-level <section> / web/*.html, built on first navigation
+  screen_cache: int = 1  # --screens: hidden screens kept built (LRU); 0 deletes a screen once it is left
+  split_units: bool = False  # --screens: each screen in its own generated/screens/*.c translation unit
+  ui_format: str = "c"  # "c" (generated code) or "blob" (generated/ui.blob read by a generic loader, see blob.py)
+  codegen: str = "unrolled"  # "unrolled" or "table"
+  btnmatrix_threshold: int = 32  # flow pages with more buttons get one lv_btnmatrix; 0 never
+  events: str = "per-widget"  # "per-widget" (a callback per button) or "delegated" (one bubbled handler per screen)
+  layout: str = "flex"  # "flex" (LVGL lays flow pages out at runtime) or "static" (positions resolved here)
+  perf_hooks: bool = False
+  perf_report_ms: int = 5000
+  perf_monitor: bool = False
+  color_depth: int = 32  # LV_COLOR_DEPTH; also the pixel format images are converted to
+  color_16_swap: bool = False
+  image_alpha: str = "auto"  # "auto" (only images with transparency), "always" or "never"
+  image_rle: bool = False
+  fonts: str = "used"  # "used" (enable only referenced Montserrat sizes), "all" or "subset"
+  font_file: str | None = None  # TTF/OTF rasterized by --fonts subset
+  font_bpp: int = 4
+  display: str = "legacy"  # display.py profile name or .toml path
+  main_loop: str = "fixed"  # "fixed" (5 ms usleep) or "adaptive" (sleep until the next timer or input)
+
+  @property
+  def font_prefix(self) -> str:
+    return "ui_font_" if self.fonts == "subset" else "lv_font_montserrat_"
+
+
+class FontUsage:
+  """Font sizes the generated UI references and the characters drawn with each of them."""
+
+  def __init__(self) -> None:
+    self.chars: dict[int, set[str]] = {DEFAULT_FONT_SIZE: set()}
+
+  def add(self, size: int | None, text: str) -> None:
+    self.chars.setdefault(size or DEFAULT_FONT_SIZE, set()).update(text)
+
+  @property
+  def sizes(self) -> list[int]:
+    return sorted(self.chars)
+
+  def codepoints(self, size: int) -> list[int]:
+    return sorted(cp for cp in map(ord, self.chars.get(size, ())) if cp >= 0x20)
+
+  def outside_builtin(self) -> list[str]:
+    """Characters that the bundled Montserrat fonts would render as boxes."""
+    return sorted({ch for chars in self.chars.values() for ch in chars if ord(ch) >= 0x20 and ord(ch) not in BUILTIN_GLYPHS})
+
+
+def font_usage(nodes: list[Node], messages: list[str], screens: list[Screen] | None = None) -> FontUsage:
+  """Which text ends up in which font size; mirrors the layout decisions of _iter_lines."""
+  if screens:
+    usage = FontUsage()
+    for screen in screens:
+      for size, chars in font_usage(screen.nodes, messages).chars.items():
+        usage.chars.setdefault(size, set()).update(chars)
+    return usage
+  usage = FontUsage()
+  texts = [n for n in nodes if n.tag in TEXT_TAGS]
+  buttons = [n for n in nodes if n.tag in BUTTON_TAGS]
+  if any(n.resolved.positioned for n in nodes):
+    for node in texts + buttons:
+      usage.add(node.resolved.font, node.text)
+    display_font = texts[0].resolved.font if texts else None
+    if not texts:
+      usage.add(None, "Tap a cell")
   else:
-    msgs = [first_text]
-  msg_array = ",\n  ".join(f"\"{m}\"" for m in msgs)
-  grid_cols = min(10, max(1, len(button_texts))) if multi_buttons else 1
-  grid_rows = (len(button_texts) + grid_cols - 1) // grid_cols if multi_buttons else 1
-  btn_w_pct = max(1, 100 // grid_cols) if multi_buttons else 100
-  btn_h_pct = max(1, 100 // grid_rows) if multi_buttons else 100
-  use_absolute = any(
-    n.style.get("position") == "absolute"
-    or any(k in n.style for k in ("left", "top", "width", "height"))
-    or any(k in n.attrs for k in ("data-x", "data-y", "data-w", "data-h"))
-    for n in nodes
+    # Flow layout ignores inline styles: title, display label and buttons use LV_FONT_DEFAULT.
+    display_font = None
+    usage.add(None, next((n.text for n in nodes if n.tag in ("h1", "h2", "h3")), "LVGL Demo"))
+    usage.add(None, texts[0].text if texts else "Tap a cell")
+    for text in [n.text for n in buttons] or ["Click"]:
+      usage.add(None, text)
+  # Clicks replace the display label's text with a message or a button caption.
+  for text in messages or [n.text for n in buttons]:
+    usage.add(display_font, text)
+  return usage
+
+
+class GenReport:
+  """Counters and human-readable notes collected while generating."""
+
+  def __init__(self) -> None:
+    self.stats: dict[str, int] = {}
+    self.notes: list[str] = []
+
+  def add(self, key: str, value: int = 1) -> None:
+    self.stats[key] = self.stats.get(key, 0) + value
+
+  def note(self, message: str) -> None:
+    self.notes.append(message)
+
+
+def generate_c(
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions | None = None,
+  report: GenReport | None = None,
+  screens: list[Screen] | None = None,
+  unit: int | None = None,
+) -> str:
+  return "".join(iter_c(nodes, messages, options, report, screens=screens, unit=unit))
+
+
+def iter_c(
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions | None = None,
+  report: GenReport | None = None,
+  chunk_lines: int = 256,
+  screens: list[Screen] | None = None,
+  unit: int | None = None,
+) -> Iterator[str]:
+  """Stream the translation unit in chunks of `chunk_lines` lines so it never sits in memory whole.
+
+  With `split_units`, `unit=None` is ui_app.c (shared state and the screen runtime)
+  and `unit=i` the file that builds screens[i].
+  """
+  batch: list[str] = []
+  sep = ""
+  lines = _iter_lines(nodes, messages, options or GenOptions(), report if report is not None else GenReport(), screens, unit)
+  for line in lines:
+    batch.append(line)
+    if len(batch) >= chunk_lines:
+      yield sep + "\n".join(batch)
+      sep = "\n"
+      batch.clear()
+  if batch:
+    yield sep + "\n".join(batch)
+
+
+def _string_array_lines(name: str, items: list[str]) -> Iterator[str]:
+  yield f"static const char * {name}[] = {{"
+  last = len(items) - 1
+  for i, item in enumerate(items):
+    yield f"  {c_string(item)}{',' if i < last else ''}"
+  yield "};"
+
+
+def _geometry_lines(var: str, box: ResolvedStyle) -> Iterator[str]:
+  if box.w is not None or box.h is not None:
+    w = box.w if box.w is not None else "LV_SIZE_CONTENT"
+    h = box.h if box.h is not None else "LV_SIZE_CONTENT"
+    yield f"  lv_obj_set_size({var}, {w}, {h});"
+  if box.x is not None or box.y is not None:
+    yield f"  lv_obj_set_pos({var}, {box.x if box.x is not None else 0}, {box.y if box.y is not None else 0});"
+
+
+def _text_props(box: ResolvedStyle) -> tuple[tuple[str, int], ...]:
+  props = []
+  if box.color is not None:
+    props.append(("text_color", box.color))
+  if box.font is not None:
+    props.append(("text_font", box.font))
+  return tuple(props)
+
+
+def _bg_props(box: ResolvedStyle) -> tuple[tuple[str, int], ...]:
+  return (("bg_color", box.bg_color),) if box.bg_color is not None else ()
+
+
+def _style_value(prop: str, value: int, font_prefix: str = "lv_font_montserrat_") -> str:
+  if prop == "text_font":
+    return f"&{font_prefix}{value}"
+  return f"lv_color_hex(0x{value:06x})"
+
+
+class StyleTable:
+  """Interns identical style property sets into shared static lv_style_t objects."""
+
+  def __init__(self, font_prefix: str = "lv_font_montserrat_") -> None:
+    self.ids: dict[tuple, int] = {}
+    self.uses = 0
+    self.font_prefix = font_prefix
+
+  def intern(self, props: tuple) -> None:
+    if props:
+      self.ids.setdefault(props, len(self.ids))
+      self.uses += len(props)
+
+  def decl_lines(self) -> Iterator[str]:
+    for idx in range(len(self.ids)):
+      yield f"static lv_style_t ui_style_{idx};"
+    yield ""
+    yield "static void ui_styles_init(void) {"
+    for props, idx in self.ids.items():
+      yield f"  lv_style_init(&ui_style_{idx});"
+      for prop, value in props:
+        yield f"  lv_style_set_{prop}(&ui_style_{idx}, {_style_value(prop, value, self.font_prefix)});"
+    yield "}"
+
+
+def _style_lines(var: str, props: tuple, styles: StyleTable | None, font_prefix: str = "lv_font_montserrat_") -> Iterator[str]:
+  if not props:
+    return
+  if styles is not None:
+    yield f"  lv_obj_add_style({var}, &ui_style_{styles.ids[props]}, 0);"
+    return
+  for prop, value in props:
+    yield f"  lv_obj_set_style_{prop}({var}, {_style_value(prop, value, font_prefix)}, 0);"
+
+
+class StringPool:
+  """All UI text as one deduplicated `ui_strings[]` table in .rodata.
+
+  Labels point into it with lv_label_set_text_static, so LVGL keeps no heap copy of
+  the text. Disabled (`--no-string-pool`), text is inlined as literals and set with
+  lv_label_set_text as before; `--codegen=table` then still owns its own ui_strings.
+  """
+
+  def __init__(self, enabled: bool = True) -> None:
+    self.enabled = enabled
+    self.ids: dict[str, int] = {}
+    self.refs = 0
+    self.labels = 0
+    self.heap_bytes = 0  # label text LVGL would have copied to its heap at build time
+
+  def intern(self, text: str) -> int:
+    return self.ids.setdefault(text, len(self.ids))
+
+  @property
+  def idx_type(self) -> str:
+    return "uint16_t" if len(self.ids) <= 0xFFFF else "uint32_t"
+
+  @property
+  def set_text(self) -> str:
+    return "lv_label_set_text_static" if self.enabled else "lv_label_set_text"
+
+  def ref(self, text: str) -> str:
+    """C expression for `text`."""
+    self.refs += 1
+    return f"ui_strings[{self.ids[text]}]" if self.enabled else c_string(text)
+
+  def label(self, text: str) -> None:
+    """Account for a label created with `text`."""
+    self.labels += 1
+    self.heap_bytes += len(text.encode("utf-8")) + 1
+
+  def label_line(self, var: str, text: str, indent: str = "  ") -> str:
+    self.label(text)
+    return f"{indent}{self.set_text}({var}, {self.ref(text)});"
+
+  def decl_lines(self) -> Iterator[str]:
+    yield from _string_array_lines("const ui_strings", list(self.ids))
+
+  def report_to(self, report: GenReport, messages: list[str]) -> None:
+    if not self.enabled or not self.ids:
+      return
+    report.add("pooled_strings", len(self.ids))
+    report.add("static_labels", self.labels)
+    report.add("label_heap_bytes_saved", self.heap_bytes)
+    rotation = ""
+    if messages:
+      longest = max(len(m.encode("utf-8")) + 1 for m in messages)
+      rotation = f"; message switches no longer realloc up to {longest} bytes per click"
+    report.note(
+      f"strings: {len(self.ids)} unique texts in ui_strings[] for {self.refs} references; "
+      f"{self.labels} static labels keep {self.heap_bytes} bytes of text out of the LVGL heap{rotation}"
+    )
+
+
+class ActionTable:
+  """`--events delegated`: what a click does, as deduplicated (kind, argument) rows.
+
+  Clickable widgets set LV_OBJ_FLAG_EVENT_BUBBLE and store a 1-based row index as
+  their user data; one LV_EVENT_CLICKED handler on the screen looks the row up, so
+  no widget owns an event descriptor. A new behaviour is a new UI_ACT_* kind and
+  one more case in the dispatcher.
+  """
+  KINDS = ("UI_ACT_NEXT_MESSAGE", "UI_ACT_SHOW_TEXT", "UI_ACT_SCREEN")
+
+  def __init__(self, pool: StringPool, own_texts: bool) -> None:
+    self.pool = pool
+    self.own_texts = own_texts  # no ui_strings[] to index: keep a ui_action_texts[] table
+    self.ids: dict[tuple[str, str], int] = {}
+    self.texts: dict[str, int] = {}
+    self.widgets = 0
+
+  def index(self, kind: str, arg: str = "") -> int:
+    """1-based row for (kind, arg); SHOW_TEXT takes the text, SCREEN a UI_SCREEN_* id."""
+    if kind == "UI_ACT_SHOW_TEXT":
+      if self.own_texts:
+        self.texts.setdefault(arg, len(self.texts))
+      else:
+        self.pool.intern(arg)
+    return self.ids.setdefault((kind, arg), len(self.ids)) + 1
+
+  @property
+  def idx_type(self) -> str:
+    return "uint16_t" if len(self.ids) < 0xFFFF else "uint32_t"
+
+  def user_data_lines(self, var: str, kind: str, arg: str = "", indent: str = "  ") -> Iterator[str]:
+    self.widgets += 1
+    yield f"{indent}lv_obj_add_flag({var}, LV_OBJ_FLAG_EVENT_BUBBLE);"
+    yield f"{indent}lv_obj_set_user_data({var}, (void *)(uintptr_t){self.index(kind, arg)});"
+
+  def decl_lines(self, perf: bool) -> Iterator[str]:
+    kinds = {kind for kind, _ in self.ids}
+    texts = "ui_action_texts" if self.own_texts else "ui_strings"
+    yield "enum { " + ", ".join(f"{kind} = {i}" for i, kind in enumerate(self.KINDS)) + " };"
+    yield ""
+    yield "typedef struct {"
+    yield "  uint8_t kind;"
+    yield f"  uint16_t arg; /* UI_ACT_SHOW_TEXT: index into {texts}; UI_ACT_SCREEN: screen id */"
+    yield "} ui_action_t;"
+    yield ""
+    if self.texts:
+      yield from _string_array_lines("const ui_action_texts", list(self.texts))
+    yield "static const ui_action_t ui_actions[] = {"
+    for kind, arg in self.ids:
+      if kind == "UI_ACT_SHOW_TEXT":
+        arg = str(self.texts[arg] if self.own_texts else self.pool.ids[arg])
+        self.pool.refs += not self.own_texts
+      yield f"  {{{kind}, {arg or 0}}},"
+    yield "};"
+    yield ""
+    yield "static void ui_event_dispatch(lv_event_t * e) {"
+    yield "  uintptr_t action = (uintptr_t)lv_obj_get_user_data(lv_event_get_target(e));"
+    yield "  if (action == 0 || action > sizeof(ui_actions) / sizeof(ui_actions[0])) return;"
+    yield "  const ui_action_t * a = &ui_actions[action - 1];"
+    yield "  switch (a->kind) {"
+    if "UI_ACT_NEXT_MESSAGE" in kinds:
+      yield "  case UI_ACT_NEXT_MESSAGE:"
+      yield "    btn_event_cb(e);"
+      yield "    break;"
+    if "UI_ACT_SHOW_TEXT" in kinds:
+      yield "  case UI_ACT_SHOW_TEXT:"
+      if perf:
+        yield "    UI_PERF_SCOPE_BEGIN();"
+      yield f"    {self.pool.set_text}(display_label, {texts}[a->arg]);"
+      if perf:
+        yield "    UI_PERF_EVENT_END();"
+      yield "    break;"
+    if "UI_ACT_SCREEN" in kinds:
+      yield "  case UI_ACT_SCREEN:"
+      yield "    ui_show_screen(a->arg);"
+      yield "    break;"
+    yield "  }"
+    yield "}"
+    yield ""
+
+  def report_to(self, report: GenReport, screens: int) -> None:
+    if not self.widgets:
+      return
+    report.add("delegated_widgets", self.widgets)
+    report.add("event_dscs_saved", self.widgets - screens)
+    report.note(
+      f"events: {self.widgets} clickable widgets share {screens} bubbled handler(s) and {len(self.ids)} "
+      f"ui_actions rows; {self.widgets} per-widget event descriptors (~{self.widgets * 12} bytes of heap) "
+      f"become {screens}"
+    )
+
+
+class WidgetTable:
+  """`--codegen=table`: const widget descriptors in .rodata plus one instantiation loop."""
+
+  def __init__(self, font_prefix: str = "lv_font_montserrat_", pool: StringPool | None = None) -> None:
+    self.pool = pool if pool is not None else StringPool(enabled=False)
+    self.strings = self.pool.ids
+    self.images: dict[str, int] = {}
+    self.styles = StyleTable(font_prefix)
+    self.count = 0
+    self.nav = False  # some descriptor switches screens: adds the `screen` field
+    self.actions: ActionTable | None = None  # --events delegated: an `action` row instead of `event`
+
+  def string_id(self, text: str) -> int:
+    return self.pool.intern(text)
+
+  def collect(self, node: Node) -> None:
+    self.count += 1
+    if node.tag in IMAGE_TAGS:
+      self.images.setdefault(image_symbol(node), len(self.images))
+      return
+    self.string_id(node.text)
+    if node.tag in BUTTON_TAGS:
+      self.styles.intern(_bg_props(node.resolved))
+    self.styles.intern(_text_props(node.resolved))
+
+  def decl_lines(self) -> Iterator[str]:
+    idx_type = "uint16_t" if max(len(self.strings), len(self.images), len(self.styles.ids) + 1) <= 0xFFFF else "uint32_t"
+    fonts = sorted({v for props in self.styles.ids for k, v in props if k == "text_font"})
+    font_ids = {size: i for i, size in enumerate(fonts)}
+    yield "enum { UI_W_LABEL = 0, UI_W_BUTTON = 1" + (", UI_W_IMAGE = 2 };" if self.images else " };")
+    yield "enum { UI_F_POS = 0x01, UI_F_SIZE = 0x02, UI_F_DISPLAY = 0x04 };"
+    if self.actions is None:
+      yield "enum { UI_EV_NONE = 0, UI_EV_NEXT_MESSAGE = 1, UI_EV_SHOW_TEXT = 2" + (", UI_EV_SCREEN = 3 };" if self.nav else " };")
+    yield ""
+    yield "typedef struct {"
+    yield "  lv_coord_t x, y, w, h;"
+    yield f"  {idx_type} text;       /* index into ui_strings{' (ui_images for UI_W_IMAGE)' if self.images else ''} */"
+    yield f"  {idx_type} text_style; /* 1-based index into ui_styles, 0 = none */"
+    yield f"  {idx_type} bg_style;   /* 1-based index into ui_styles, 0 = none */"
+    yield "  uint8_t kind;"
+    yield "  uint8_t flags;"
+    if self.actions is not None:
+      yield f"  {self.actions.idx_type} action;     /* 1-based index into ui_actions, 0 = none */"
+    else:
+      yield "  uint8_t event;"
+    if self.nav:
+      yield "  uint8_t screen;     /* UI_EV_SCREEN target */"
+    yield "} ui_widget_desc_t;"
+    yield ""
+    if not self.pool.enabled:  # otherwise the shared pool is declared at the top of the file
+      yield from self.pool.decl_lines()
+      yield ""
+    if self.images:
+      yield "static const lv_img_dsc_t * const ui_images[] = {"
+      yield ",\n".join(f"  &{sym}" for sym in self.images)
+      yield "};"
+      yield ""
+    if fonts:
+      yield "static const lv_font_t * const ui_fonts[] = {"
+      yield ",\n".join(f"  &{self.styles.font_prefix}{size}" for size in fonts)
+      yield "};"
+      yield ""
+    if self.styles.ids:
+      yield "enum { UI_S_TEXT_COLOR = 0x01, UI_S_TEXT_FONT = 0x02, UI_S_BG_COLOR = 0x04 };"
+      yield ""
+      yield "typedef struct {"
+      yield "  uint32_t color;"
+      yield "  uint8_t flags;"
+      yield "  uint8_t font; /* index into ui_fonts */"
+      yield "} ui_style_desc_t;"
+      yield ""
+      yield "static const ui_style_desc_t ui_style_descs[] = {"
+      for props in self.styles.ids:
+        flags, color, font = [], 0, 0
+        for prop, value in props:
+          if prop == "text_font":
+            flags.append("UI_S_TEXT_FONT")
+            font = font_ids[value]
+          else:
+            flags.append("UI_S_TEXT_COLOR" if prop == "text_color" else "UI_S_BG_COLOR")
+            color = value
+        yield f"  {{0x{color:06x}, {' | '.join(flags)}, {font}}},"
+      yield "};"
+      yield f"static lv_style_t ui_styles[{len(self.styles.ids)}];"
+      yield ""
+      yield "static void ui_styles_init(void) {"
+      yield "  for (uint32_t i = 0; i < sizeof(ui_style_descs) / sizeof(ui_style_descs[0]); i++) {"
+      yield "    const ui_style_desc_t * d = &ui_style_descs[i];"
+      yield "    lv_style_init(&ui_styles[i]);"
+      yield "    if (d->flags & UI_S_TEXT_COLOR) lv_style_set_text_color(&ui_styles[i], lv_color_hex(d->color));"
+      if fonts:
+        yield "    if (d->flags & UI_S_TEXT_FONT) lv_style_set_text_font(&ui_styles[i], ui_fonts[d->font]);"
+      yield "    if (d->flags & UI_S_BG_COLOR) lv_style_set_bg_color(&ui_styles[i], lv_color_hex(d->color));"
+      yield "  }"
+      yield "}"
+      yield ""
+
+  def desc_line(
+    self,
+    node: Node,
+    event: str,
+    display: bool,
+    size: tuple[str, str] | None = None,
+    styled: bool = True,
+    screen: str | None = None,
+    pos: tuple[int, int] | None = None,
+  ) -> str:
+    box = node.resolved
+    image = node.tag in IMAGE_TAGS
+    flags = []
+    x = y = w = h = "0"
+    if size is not None:
+      flags.append("UI_F_SIZE")
+      w, h = size
+    elif box.w is not None or box.h is not None:
+      flags.append("UI_F_SIZE")
+      w = str(box.w) if box.w is not None else "LV_SIZE_CONTENT"
+      h = str(box.h) if box.h is not None else "LV_SIZE_CONTENT"
+    if pos is not None:
+      flags.append("UI_F_POS")
+      x, y = map(str, pos)
+    elif box.x is not None or box.y is not None:
+      flags.append("UI_F_POS")
+      x = str(box.x if box.x is not None else 0)
+      y = str(box.y if box.y is not None else 0)
+    if display:
+      flags.append("UI_F_DISPLAY")
+    text_props = _text_props(box) if styled and not image else ()
+    text_style = self.styles.ids[text_props] + 1 if text_props else 0
+    bg_props = _bg_props(box) if styled and node.tag in BUTTON_TAGS else ()
+    bg_style = self.styles.ids[bg_props] + 1 if bg_props else 0
+    if not image:
+      self.pool.label(node.text)
+      self.pool.refs += 1
+    kind = "UI_W_IMAGE" if image else "UI_W_BUTTON" if node.tag in BUTTON_TAGS else "UI_W_LABEL"
+    ref = self.images[image_symbol(node)] if image else self.strings[node.text]
+    if self.actions is not None and event != "UI_EV_NONE":
+      self.actions.widgets += 1
+      if screen is not None:
+        event = str(self.actions.index("UI_ACT_SCREEN", screen))
+      elif event == "UI_EV_NEXT_MESSAGE":
+        event = str(self.actions.index("UI_ACT_NEXT_MESSAGE"))
+      else:
+        event = str(self.actions.index("UI_ACT_SHOW_TEXT", node.text))
+    elif self.actions is not None:
+      event = "0"
+    elif screen is not None:
+      event = "UI_EV_SCREEN"
+    target = f", {screen or 0}" if self.nav else ""
+    return (
+      f"  {{{x}, {y}, {w}, {h}, {ref}, {text_style}, {bg_style}, "
+      f"{kind}, {' | '.join(flags) or '0'}, {event}{target}}},"
+    )
+
+  def builder_lines(self) -> Iterator[str]:
+    yield "static void ui_build_widgets(lv_obj_t * parent, const ui_widget_desc_t * descs, uint32_t count) {"
+    yield "  for (uint32_t i = 0; i < count; i++) {"
+    yield "    const ui_widget_desc_t * d = &descs[i];"
+    if self.images:
+      yield "    if (d->kind == UI_W_IMAGE) {"
+      yield "      lv_obj_t * img = lv_img_create(parent);"
+      yield "      lv_img_set_src(img, ui_images[d->text]);"
+      yield "      if (d->flags & UI_F_SIZE) lv_obj_set_size(img, d->w, d->h);"
+      yield "      if (d->flags & UI_F_POS) lv_obj_set_pos(img, d->x, d->y);"
+      yield "      continue;"
+      yield "    }"
+    yield "    const char * text = ui_strings[d->text];"
+    yield "    lv_obj_t * obj;"
+    yield "    lv_obj_t * label;"
+    yield "    if (d->kind == UI_W_BUTTON) {"
+    yield "      obj = lv_btn_create(parent);"
+    yield "      label = lv_label_create(obj);"
+    yield "      lv_obj_center(label);"
+    if self.styles.ids:
+      yield "      if (d->bg_style) lv_obj_add_style(obj, &ui_styles[d->bg_style - 1], 0);"
+    yield "    } else {"
+    yield "      obj = lv_label_create(parent);"
+    yield "      label = obj;"
+    yield "    }"
+    yield f"    {self.pool.set_text}(label, text);"
+    if self.styles.ids:
+      yield "    if (d->text_style) lv_obj_add_style(label, &ui_styles[d->text_style - 1], 0);"
+    yield "    if (d->flags & UI_F_SIZE) lv_obj_set_size(obj, d->w, d->h);"
+    yield "    if (d->flags & UI_F_POS) lv_obj_set_pos(obj, d->x, d->y);"
+    yield "    if (d->flags & UI_F_DISPLAY) display_label = label;"
+    if self.actions is not None:
+      yield "    if (d->action) {"
+      yield "      lv_obj_add_flag(obj, LV_OBJ_FLAG_EVENT_BUBBLE);"
+      yield "      lv_obj_set_user_data(obj, (void *)(uintptr_t)d->action);"
+    else:
+      yield "    if (d->event == UI_EV_NEXT_MESSAGE) {"
+      yield "      lv_obj_add_event_cb(obj, btn_event_cb, LV_EVENT_CLICKED, NULL);"
+      yield "    } else if (d->event == UI_EV_SHOW_TEXT) {"
+      yield "      lv_obj_add_event_cb(obj, btn_event_cb, LV_EVENT_CLICKED, (void *)text);"
+      if self.nav:
+        yield "    } else if (d->event == UI_EV_SCREEN) {"
+        yield "      lv_obj_add_event_cb(obj, ui_nav_event_cb, LV_EVENT_CLICKED, (void *)(uintptr_t)d->screen);"
+    yield "    }"
+    yield "  }"
+    yield "}"
+    yield ""
+
+  def report_to(self, report: GenReport) -> None:
+    report.add("table_widgets", self.count)
+    report.add("table_strings", len(self.strings))
+    if self.images:
+      report.add("table_images", len(self.images))
+    report.add("shared_styles", len(self.styles.ids))
+    report.note(
+      f"table: {self.count} widget descriptors, {len(self.strings)} unique strings, "
+      f"{len(self.styles.ids)} shared styles"
+    )
+
+
+class _Page:
+  """Layout decisions for the nodes of one screen (the whole document without --screens)."""
+
+  def __init__(self, nodes: list[Node], suffix: str = ""):
+    self.nodes = nodes
+    self.title = next((n.text for n in nodes if n.tag in ("h1", "h2", "h3")), "LVGL Demo")
+    self.has_text = any(n.tag in TEXT_TAGS for n in nodes)
+    self.first_text = next((n.text for n in nodes if n.tag in TEXT_TAGS), "") or "Tap a cell"
+    self.button_texts = [n.text for n in nodes if n.tag in BUTTON_TAGS]
+    self.button = next((n for n in nodes if n.tag in BUTTON_TAGS), None)
+    self.btn_text = self.button_texts[0] if self.button_texts else "Click"
+    self.multi_buttons = len(self.button_texts) > 1
+    self.grid_cols = min(10, max(1, len(self.button_texts))) if self.multi_buttons else 1
+    self.grid_rows = (len(self.button_texts) + self.grid_cols - 1) // self.grid_cols if self.multi_buttons else 1
+    self.btn_w_pct = max(1, 100 // self.grid_cols) if self.multi_buttons else 100
+    self.btn_h_pct = max(1, 100 // self.grid_rows) if self.multi_buttons else 100
+    self.use_absolute = any(n.resolved.positioned for n in nodes)
+    self.images = [n for n in nodes if n.tag in IMAGE_TAGS]
+    self.suffix = suffix  # per-screen symbol suffix of this page's arrays
+    self.widgets = f"ui_widgets{suffix}"  # table mode: name of this page's descriptor array
+    self.layout: PageLayout | None = None  # --layout static: boxes resolved at generation time
+    self.matrix = False  # the button grid is one lv_btnmatrix
+
+
+# Rough heap cost of LVGL v8.3 objects on a 32-bit target (struct plus allocator header).
+_HEAP_OBJ = 44
+_HEAP_LABEL = 84
+_HEAP_BTNMATRIX = 64
+_HEAP_SPEC_ATTR = 40  # objects with children or event callbacks
+_HEAP_EVENT_DSC = 12
+_HEAP_LOCAL_STYLE = 24  # one object's local style block with a couple of properties
+_HEAP_MATRIX_BUTTON = 10  # lv_area_t + ctrl bits per matrix button
+
+
+def _matrix_cost(page: _Page, pool: StringPool) -> tuple[int, int, int, int]:
+  """(objects, heap bytes) of the button grid as lv_btn objects and as one lv_btnmatrix."""
+  n = len(page.button_texts)
+  button = _HEAP_OBJ + _HEAP_SPEC_ATTR + _HEAP_EVENT_DSC + _HEAP_LOCAL_STYLE  # lv_btn, its event, its size
+  label = _HEAP_LABEL + _HEAP_LOCAL_STYLE  # lv_label, centered
+  texts = 0 if pool.enabled else sum(len(t.encode("utf-8")) + 1 for t in page.button_texts)
+  before = _HEAP_OBJ + _HEAP_SPEC_ATTR + _HEAP_LOCAL_STYLE + n * (button + label) + texts
+  cells = page.grid_rows * page.grid_cols
+  after = (
+    _HEAP_BTNMATRIX + _HEAP_SPEC_ATTR + _HEAP_LOCAL_STYLE
+    + _HEAP_EVENT_DSC + cells * _HEAP_MATRIX_BUTTON
   )
-  lines = []
-  lines.append('#include "lvgl.h"')
-  lines.append("")
-  lines.append("static lv_obj_t * display_label;")
-  if use_messages:
-    lines.append(f"static const char * messages[] = {{\n  {msg_array}\n}};")
-    lines.append("static int msg_idx = 0;")
-    lines.append("")
-    lines.append("static void btn_event_cb(lv_event_t * e) {")
-    lines.append("  msg_idx = (msg_idx + 1) % (sizeof(messages)/sizeof(messages[0]));")
-    lines.append("  lv_label_set_text(display_label, messages[msg_idx]);")
-    lines.append("}")
+  return 1 + 2 * n, before, 1, after
+
+
+def _matrix_lines(page: _Page, nav: dict[int, str], layout: PageLayout | None) -> Iterator[str]:
+  """The button grid of a flow page as one lv_btnmatrix (rows of grid_cols, hidden fillers).
+
+  Like the lv_btn grid it replaces, buttons keep the theme colours; inline colours apply to absolute pages only.
+  """
+  sfx = page.suffix
+  n = len(page.button_texts)
+  cells = page.grid_rows * page.grid_cols
+  yield "  lv_obj_t * btnm = lv_btnmatrix_create(scr);"
+  if layout is not None:
+    yield f"  lv_obj_set_pos(btnm, {layout.grid.x}, {layout.grid.y});"
+    yield f"  lv_obj_set_size(btnm, {layout.grid.w}, {layout.grid.h});"
   else:
-    if multi_buttons:
-      label_array = ",\n  ".join(f"\"{m}\"" for m in button_texts)
-      lines.append(f"static const char * button_labels[] = {{\n  {label_array}\n}};")
-      lines.append("")
-    lines.append("static void btn_event_cb(lv_event_t * e) {")
-    lines.append("  const char * label = (const char *)lv_event_get_user_data(e);")
-    lines.append("  if (label) {")
-    lines.append("    lv_label_set_text(display_label, label);")
-    lines.append("  }")
-    lines.append("}")
-  lines.append("")
-  lines.append("void ui_build(void) {")
-  lines.append("  lv_obj_t * layer = lv_layer_top();")
-  lines.append("  lv_obj_t * scr = lv_obj_create(layer);")
-  lines.append("  lv_obj_remove_style_all(scr);")
-  lines.append("  lv_obj_set_size(scr, lv_pct(100), lv_pct(100));")
-  lines.append("  lv_obj_set_style_bg_color(scr, lv_color_hex(0x0b1d36), 0);")
-  lines.append("  lv_obj_set_style_bg_opa(scr, LV_OPA_COVER, 0);")
-  lines.append("  lv_obj_clear_flag(scr, LV_OBJ_FLAG_SCROLLABLE);")
-  lines.append("  lv_obj_add_flag(scr, LV_OBJ_FLAG_CLICKABLE);")
-  if use_absolute:
-    created_label = False
-    button_idx = 0
-    for idx, node in enumerate(nodes):
-      if node.tag in TEXT_TAGS:
-        lines.append(f"  lv_obj_t * label_{idx} = lv_label_create(scr);")
-        lines.append(f"  lv_label_set_text(label_{idx}, \"{node.text}\");")
-        if not created_label:
-          lines.append(f"  display_label = label_{idx};")
-          created_label = True
-        text_color = parse_css_color(node.style.get("color"))
-        if text_color is not None:
-          lines.append(f"  lv_obj_set_style_text_color(label_{idx}, lv_color_hex(0x{text_color:06x}), 0);")
-        font_ptr = pick_font(parse_css_length(node.style.get("font-size")))
-        if font_ptr:
-          lines.append(f"  lv_obj_set_style_text_font(label_{idx}, {font_ptr}, 0);")
-        left = parse_css_length(node.style.get("left")) or parse_css_length(node.attrs.get("data-x"))
-        top = parse_css_length(node.style.get("top")) or parse_css_length(node.attrs.get("data-y"))
-        width = parse_css_length(node.style.get("width")) or parse_css_length(node.attrs.get("data-w"))
-        height = parse_css_length(node.style.get("height")) or parse_css_length(node.attrs.get("data-h"))
-        if width is not None or height is not None:
-          lines.append(f"  lv_obj_set_size(label_{idx}, {width if width is not None else 'LV_SIZE_CONTENT'}, {height if height is not None else 'LV_SIZE_CONTENT'});")
-        if left is not None or top is not None:
-          lines.append(f"  lv_obj_set_pos(label_{idx}, {left if left is not None else 0}, {top if top is not None else 0});")
-      elif node.tag in BUTTON_TAGS:
-        lines.append(f"  lv_obj_t * btn_{idx} = lv_btn_create(scr);")
-        left = parse_css_length(node.style.get("left")) or parse_css_length(node.attrs.get("data-x"))
-        top = parse_css_length(node.style.get("top")) or parse_css_length(node.attrs.get("data-y"))
-        width = parse_css_length(node.style.get("width")) or parse_css_length(node.attrs.get("data-w"))
-        height = parse_css_length(node.style.get("height")) or parse_css_length(node.attrs.get("data-h"))
-        if width is not None or height is not None:
-          lines.append(f"  lv_obj_set_size(btn_{idx}, {width if width is not None else 'LV_SIZE_CONTENT'}, {height if height is not None else 'LV_SIZE_CONTENT'});")
-        if left is not None or top is not None:
-          lines.append(f"  lv_obj_set_pos(btn_{idx}, {left if left is not None else 0}, {top if top is not None else 0});")
-        bg_color = parse_css_color(node.style.get("background-color") or node.style.get("background"))
-        if bg_color is not None:
-          lines.append(f"  lv_obj_set_style_bg_color(btn_{idx}, lv_color_hex(0x{bg_color:06x}), 0);")
-        lines.append(f"  lv_obj_t * btn_label_{idx} = lv_label_create(btn_{idx});")
-        lines.append(f"  lv_label_set_text(btn_label_{idx}, \"{node.text}\");")
-        lines.append(f"  lv_obj_center(btn_label_{idx});")
-        label_color = parse_css_color(node.style.get("color"))
-        if label_color is not None:
-          lines.append(f"  lv_obj_set_style_text_color(btn_label_{idx}, lv_color_hex(0x{label_color:06x}), 0);")
-        font_ptr = pick_font(parse_css_length(node.style.get("font-size")))
-        if font_ptr:
-          lines.append(f"  lv_obj_set_style_text_font(btn_label_{idx}, {font_ptr}, 0);")
-        if use_messages:
-          lines.append(f"  lv_obj_add_event_cb(btn_{idx}, btn_event_cb, LV_EVENT_CLICKED, NULL);")
-        else:
-          label_ref = f"button_labels[{button_idx}]" if multi_buttons else f"\"{node.text}\""
-          lines.append(f"  lv_obj_add_event_cb(btn_{idx}, btn_event_cb, LV_EVENT_CLICKED, (void *){label_ref});")
-        if multi_buttons:
-          button_idx += 1
-    if not text_nodes:
-      lines.append("  display_label = lv_label_create(scr);")
-      lines.append(f"  lv_label_set_text(display_label, \"{first_text}\");")
-      lines.append("  lv_obj_set_pos(display_label, 0, 0);")
+    yield "  lv_obj_set_size(btnm, lv_pct(100), lv_pct(100));"
+    yield "  lv_obj_set_flex_grow(btnm, 1);"
+  yield "  lv_obj_set_style_bg_opa(btnm, LV_OPA_TRANSP, 0);"
+  yield "  lv_obj_set_style_border_width(btnm, 0, 0);"
+  yield "  lv_obj_set_style_pad_all(btnm, 4, 0);"
+  yield "  lv_obj_set_style_pad_row(btnm, 4, 0);"
+  yield "  lv_obj_set_style_pad_column(btnm, 4, 0);"
+  yield f"  lv_btnmatrix_set_map(btnm, ui_btnm_map{sfx});"
+  yield "  lv_btnmatrix_set_btn_ctrl_all(btnm, LV_BTNMATRIX_CTRL_CLICK_TRIG | LV_BTNMATRIX_CTRL_NO_REPEAT);"
+  if cells > n:
+    yield f"  for (uint16_t i = {n}; i < {cells}; i++) lv_btnmatrix_set_btn_ctrl(btnm, i, LV_BTNMATRIX_CTRL_HIDDEN);"
+  yield f"  lv_obj_add_event_cb(btnm, ui_btnm_event_cb, LV_EVENT_VALUE_CHANGED, {f'(void *)ui_btnm_nav{sfx}' if nav else 'NULL'});"
+
+
+def _matrix_decl_lines(page: _Page, nav: dict[int, str]) -> Iterator[str]:
+  sfx = page.suffix
+  texts = page.button_texts + [" "] * (page.grid_rows * page.grid_cols - len(page.button_texts))
+  rows = [texts[i:i + page.grid_cols] for i in range(0, len(texts), page.grid_cols)]
+  yield f"static const char * ui_btnm_map{sfx}[] = {{"
+  for row in rows:
+    yield "  " + ", ".join(map(c_string, row)) + ","
+    if row is not rows[-1]:
+      yield '  "\\n",'
+  yield '  "",'
+  yield "};"
+  if nav:
+    targets = [f"{nav[i]} + 1" if i in nav else "0" for i in range(len(page.button_texts))]
+    yield f"static const uint8_t ui_btnm_nav{sfx}[] = {{{', '.join(targets)}}}; /* screen + 1, 0 = none */"
+  yield ""
+
+
+def _static_layout(page: _Page, name: str, options: GenOptions, report: GenReport) -> PageLayout | None:
+  """Resolve a flow page for the display profile, or None (with a note) to keep runtime flex."""
+  if any(n.resolved.w is None or n.resolved.h is None for n in page.images):
+    report.note(f"layout: {name}: images without width and height keep the flex layout")
+    return None
+  width, height = load_profile(options.display).ui_resolution()
+  layout = resolve_page(
+    width,
+    height,
+    page.title,
+    page.first_text,
+    [(n.resolved.w, n.resolved.h) for n in page.images],
+    len(page.button_texts) if page.multi_buttons else 1,
+    page.btn_w_pct,
+    page.btn_h_pct,
+    page.btn_text,
+  )
+  problems = check_layout(layout)
+  if problems:
+    report.note(f"layout: {name}: static layout differs from flex, keeping flex ({'; '.join(problems[:3])})")
+    return None
+  if layout.grid is not None and not page.matrix and layout.columns < page.grid_cols:
+    report.note(
+      f"layout: {name}: {page.grid_cols} grid columns of {page.btn_w_pct}% leave no room for the "
+      f"{GRID_PAD} px gaps; flex (and the static layout) wrap after {layout.columns}"
+    )
+  cells = len(layout.cells) if layout.grid is not None and not page.matrix else 0
+  report.add("static_layout_objects", 3 + len(layout.images) + cells)
+  return layout
+
+
+def _static_label_lines(var: str, box: Box, layout: PageLayout, indent: str = "  ") -> Iterator[str]:
+  # Full content width with centered text: the text lands where flex would center the
+  # content-sized label, without depending on the estimated text width.
+  yield f"{indent}lv_obj_set_pos({var}, 0, {box.y});"
+  yield f"{indent}lv_obj_set_size({var}, {layout.width - 2 * SCREEN_PAD}, {box.h});"
+  yield f"{indent}lv_obj_set_style_text_align({var}, LV_TEXT_ALIGN_CENTER, 0);"
+
+
+def _layout_check_lines() -> Iterator[str]:
+  """-DUI_LAYOUT_CHECK=1: re-run a static page through LVGL flex and log objects that move."""
+  yield "#ifndef UI_LAYOUT_CHECK"
+  yield "#define UI_LAYOUT_CHECK 0"
+  yield "#endif"
+  yield "#if UI_LAYOUT_CHECK"
+  yield "#include <stdio.h>"
+  yield ""
+  yield "static void ui_layout_check(lv_obj_t * scr, lv_obj_t * grid, lv_coord_t btn_w_pct, lv_coord_t btn_h_pct) {"
+  yield "  lv_obj_t * parents[2] = {scr, grid};"
+  yield "  uint32_t count = lv_obj_get_child_cnt(scr) + (grid ? lv_obj_get_child_cnt(grid) : 0);"
+  yield "  lv_area_t * expected = lv_mem_alloc(count * sizeof(lv_area_t));"
+  yield "  if (expected == NULL) return;"
+  yield "  lv_obj_update_layout(scr);"
+  yield "  uint32_t n = 0;"
+  yield "  for (int p = 0; p < 2 && parents[p]; p++) {"
+  yield "    for (uint32_t i = 0; i < lv_obj_get_child_cnt(parents[p]); i++) {"
+  yield "      lv_obj_get_coords(lv_obj_get_child(parents[p], i), &expected[n++]);"
+  yield "    }"
+  yield "  }"
+  yield "  /* Back to the runtime layout the static positions stand in for. */"
+  yield "  lv_obj_set_flex_flow(scr, LV_FLEX_FLOW_COLUMN);"
+  yield "  lv_obj_set_flex_align(scr, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER);"
+  yield "  for (uint32_t i = 0; i < lv_obj_get_child_cnt(scr); i++) {"
+  yield "    lv_obj_t * child = lv_obj_get_child(scr, i);"
+  yield "    if (lv_obj_check_type(child, &lv_label_class)) lv_obj_set_width(child, LV_SIZE_CONTENT);"
+  yield "    if (lv_obj_check_type(child, &lv_btn_class)) lv_obj_set_size(child, LV_SIZE_CONTENT, LV_SIZE_CONTENT);"
+  yield "  }"
+  yield "  if (grid) {"
+  yield "    lv_obj_set_flex_flow(grid, LV_FLEX_FLOW_ROW_WRAP);"
+  yield "    lv_obj_set_flex_align(grid, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_START, LV_FLEX_ALIGN_START);"
+  yield "    lv_obj_set_flex_grow(grid, 1);"
+  yield "    for (uint32_t i = 0; i < lv_obj_get_child_cnt(grid); i++) {"
+  yield "      lv_obj_set_size(lv_obj_get_child(grid, i), lv_pct(btn_w_pct), lv_pct(btn_h_pct));"
+  yield "    }"
+  yield "  }"
+  yield "  lv_obj_update_layout(scr);"
+  yield "  uint32_t moved = 0;"
+  yield "  n = 0;"
+  yield "  for (int p = 0; p < 2 && parents[p]; p++) {"
+  yield "    for (uint32_t i = 0; i < lv_obj_get_child_cnt(parents[p]); i++) {"
+  yield "      lv_obj_t * child = lv_obj_get_child(parents[p], i);"
+  yield "      lv_area_t got;"
+  yield "      lv_obj_get_coords(child, &got);"
+  yield "      lv_area_t * want = &expected[n++];"
+  yield "      bool same = got.y1 == want->y1 && got.y2 == want->y2;"
+  yield "      if (lv_obj_check_type(child, &lv_label_class)) {"
+  yield "        /* Static labels span the content width with centered text: compare the centers. */"
+  yield "        int dx = (got.x1 + got.x2) - (want->x1 + want->x2);"
+  yield "        same = same && dx >= -2 && dx <= 2;"
+  yield "      } else {"
+  yield "        same = same && got.x1 == want->x1 && got.x2 == want->x2;"
+  yield "      }"
+  yield "      if (!same) {"
+  yield "        moved++;"
+  yield '        printf("[ui] layout: %s child %u static (%d,%d)-(%d,%d) flex (%d,%d)-(%d,%d)\\n", p ? "grid" : "screen", (unsigned)i,'
+  yield "               want->x1, want->y1, want->x2, want->y2, got.x1, got.y1, got.x2, got.y2);"
+  yield "      }"
+  yield "    }"
+  yield "  }"
+  yield '  printf("[ui] layout check: %u of %u objects differ from flex\\n", (unsigned)moved, (unsigned)count);'
+  yield "  lv_mem_free(expected);"
+  yield "}"
+  yield "#endif"
+
+
+def _root_lines(indent: str = "  ") -> Iterator[str]:
+  yield f"{indent}lv_obj_t * layer = lv_layer_top();"
+  yield f"{indent}lv_obj_t * scr = lv_obj_create(layer);"
+  yield f"{indent}lv_obj_remove_style_all(scr);"
+  yield f"{indent}lv_obj_set_size(scr, lv_pct(100), lv_pct(100));"
+  yield f"{indent}lv_obj_set_style_bg_color(scr, lv_color_hex(0x0b1d36), 0);"
+  yield f"{indent}lv_obj_set_style_bg_opa(scr, LV_OPA_COVER, 0);"
+  yield f"{indent}lv_obj_clear_flag(scr, LV_OBJ_FLAG_SCROLLABLE);"
+  yield f"{indent}lv_obj_add_flag(scr, LV_OBJ_FLAG_CLICKABLE);"
+
+
+def _screen_runtime_lines(screens: list[Screen], options: GenOptions) -> Iterator[str]:
+  """--screens: lazy build on first show, hide/LRU-evict on leave, time-to-first-frame log."""
+  yield "#ifndef UI_SCREEN_CACHE"
+  yield f"#define UI_SCREEN_CACHE {options.screen_cache} /* hidden screens kept built; older ones are deleted */"
+  yield "#endif"
+  yield "#ifndef UI_SCREEN_LOG"
+  yield "#define UI_SCREEN_LOG(...) printf(__VA_ARGS__)"
+  yield "#endif"
+  yield ""
+  yield "typedef struct {"
+  yield "  const char * name;"
+  yield "  void (*build)(lv_obj_t * scr);"
+  yield "  lv_obj_t * root;      /* NULL while not built */"
+  yield "  lv_obj_t * display;   /* this screen's display_label */"
+  yield "  uint32_t shown_at;    /* lv_tick_get() when navigation started */"
+  yield "  uint32_t last_used;   /* LRU clock when last hidden */"
+  yield "  bool frame_pending;   /* time-to-first-frame not reported yet */"
+  yield "} ui_screen_t;"
+  yield ""
+  yield "static ui_screen_t ui_screens[UI_SCREEN_COUNT] = {"
+  for screen in screens:
+    yield f"  {{.name = {c_string(screen.name)}, .build = ui_screen_{screen.symbol.lower()}_build}},"
+  yield "};"
+  yield "static int ui_active = -1;"
+  yield "static uint32_t ui_lru_clock;"
+  yield ""
+  yield "static lv_obj_t * ui_screen_root(void) {"
+  yield from _root_lines()
+  yield "  return scr;"
+  yield "}"
+  yield ""
+  yield "static void ui_first_frame_cb(lv_event_t * e) {"
+  yield "  ui_screen_t * s = (ui_screen_t *)lv_event_get_user_data(e);"
+  yield "  if (!s->frame_pending) return;"
+  yield "  s->frame_pending = false;"
+  yield '  UI_SCREEN_LOG("[ui] screen %s: first frame %u ms after navigation\\n", s->name, (unsigned)lv_tick_elaps(s->shown_at));'
+  yield "}"
+  yield ""
+  yield "static void ui_screen_evict(void) {"
+  yield "  for (;;) {"
+  yield "    int built = 0;"
+  yield "    int lru = -1;"
+  yield "    for (int i = 0; i < UI_SCREEN_COUNT; i++) {"
+  yield "      if (i == ui_active || ui_screens[i].root == NULL) continue;"
+  yield "      built++;"
+  yield "      if (lru < 0 || ui_screens[i].last_used < ui_screens[lru].last_used) lru = i;"
+  yield "    }"
+  yield "    if (built <= UI_SCREEN_CACHE) return;"
+  yield "    /* Async: the click that navigated away may still be dispatching on this tree. */"
+  yield "    lv_obj_del_async(ui_screens[lru].root);"
+  yield "    ui_screens[lru].root = NULL;"
+  yield "    ui_screens[lru].display = NULL;"
+  yield "  }"
+  yield "}"
+  yield ""
+  yield "void ui_show_screen(int id) {"
+  yield "  if (id < 0 || id >= UI_SCREEN_COUNT || id == ui_active) return;"
+  yield "  ui_screen_t * s = &ui_screens[id];"
+  yield "  s->shown_at = lv_tick_get();"
+  yield "  s->frame_pending = true;"
+  yield "  if (s->root == NULL) {"
+  yield "    s->root = ui_screen_root();"
+  yield "    display_label = NULL;"
+  yield "    s->build(s->root);"
+  yield "    s->display = display_label;"
+  yield "    lv_obj_add_event_cb(s->root, ui_first_frame_cb, LV_EVENT_DRAW_POST_END, s);"
+  yield '    UI_SCREEN_LOG("[ui] screen %s: built in %u ms\\n", s->name, (unsigned)lv_tick_elaps(s->shown_at));'
+  yield "  } else {"
+  yield "    lv_obj_clear_flag(s->root, LV_OBJ_FLAG_HIDDEN);"
+  yield "  }"
+  yield "  if (ui_active >= 0) {"
+  yield "    lv_obj_add_flag(ui_screens[ui_active].root, LV_OBJ_FLAG_HIDDEN);"
+  yield "    ui_screens[ui_active].last_used = ++ui_lru_clock;"
+  yield "  }"
+  yield "  ui_active = id;"
+  yield "  display_label = s->display;"
+  yield "  ui_screen_evict();"
+  yield "}"
+  yield ""
+
+
+def _iter_lines(
+  nodes: list[Node],
+  messages: list[str],
+  options: GenOptions,
+  report: GenReport,
+  screens: list[Screen] | None = None,
+  unit: int | None = None,
+) -> Iterator[str]:
+  if screens:
+    pages = [_Page(screen.nodes, f"_{screen.symbol.lower()}") for screen in screens]
+    screen_ids = {screen.name: f"UI_SCREEN_{screen.symbol}" for screen in screens}
   else:
-    lines.append("  lv_obj_set_flex_flow(scr, LV_FLEX_FLOW_COLUMN);")
-    lines.append("  lv_obj_set_flex_align(scr, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER);")
-    lines.append("  lv_obj_set_style_pad_all(scr, 20, 0);")
-    lines.append("")
-    lines.append("  lv_obj_t * title = lv_label_create(scr);")
-    lines.append(f"  lv_label_set_text(title, \"{title}\");")
-    lines.append("  lv_obj_set_style_text_color(title, lv_color_hex(0x8ab4ff), 0);")
-    lines.append("")
-    lines.append("  display_label = lv_label_create(scr);")
-    lines.append(f"  lv_label_set_text(display_label, \"{first_text}\");")
-    lines.append("  lv_obj_set_style_text_font(display_label, LV_FONT_DEFAULT, 0);")
-    lines.append("  lv_obj_set_style_pad_bottom(display_label, 12, 0);")
-    lines.append("")
-    if multi_buttons:
-      lines.append("  lv_obj_t * grid = lv_obj_create(scr);")
-      lines.append("  lv_obj_remove_style_all(grid);")
-      lines.append("  lv_obj_set_size(grid, lv_pct(100), lv_pct(100));")
-      lines.append("  lv_obj_set_style_bg_opa(grid, LV_OPA_TRANSP, 0);")
-      lines.append("  lv_obj_set_style_pad_all(grid, 4, 0);")
-      lines.append("  lv_obj_set_style_pad_row(grid, 4, 0);")
-      lines.append("  lv_obj_set_style_pad_column(grid, 4, 0);")
-      lines.append("  lv_obj_set_flex_flow(grid, LV_FLEX_FLOW_ROW_WRAP);")
-      lines.append("  lv_obj_set_flex_align(grid, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_START, LV_FLEX_ALIGN_START);")
-      lines.append("  lv_obj_set_flex_grow(grid, 1);")
-      for idx, label in enumerate(button_texts):
-        lines.append("  {")
-        lines.append("    lv_obj_t * btn = lv_btn_create(grid);")
-        lines.append(f"    lv_obj_set_size(btn, lv_pct({btn_w_pct}), lv_pct({btn_h_pct}));")
-        lines.append("    lv_obj_t * btn_label = lv_label_create(btn);")
-        lines.append(f"    lv_label_set_text(btn_label, \"{label}\");")
-        lines.append("    lv_obj_center(btn_label);")
-        if use_messages:
-          lines.append("    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);")
-        else:
-          lines.append(f"    lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, (void *)button_labels[{idx}]);")
-        lines.append("  }")
+    pages = [_Page(nodes)]
+    screen_ids = {}
+  names = [s.name for s in screens] if screens else ["main"]
+  images = [n for page in pages for n in page.nodes if n.tag in IMAGE_TAGS]
+  split = bool(screens) and options.split_units
+  if split:
+    # Only this unit's screen gets tables and a build function; ui_app.c gets none.
+    keep = [] if unit is None else [unit]
+    pages, names = [pages[i] for i in keep], [names[i] for i in keep]
+  elif unit is not None:
+    raise ValueError("unit= needs screens and split_units")
+  for page in pages:
+    threshold = options.btnmatrix_threshold
+    page.matrix = page.multi_buttons and not page.use_absolute and 0 < threshold < len(page.button_texts)
+  if options.layout == "static":
+    for page, name in zip(pages, names):
+      if not page.use_absolute:
+        page.layout = _static_layout(page, name, options, report)
+  elif options.layout != "flex":
+    raise ValueError(f"Unknown layout mode: {options.layout!r}")
+  use_messages = bool(messages)
+  msgs = messages
+  single = pages[0] if not screens else None  # button_labels[] only exists for a single unpooled page
+
+  def nav_target(node: Node | None) -> str | None:
+    target = node.attrs.get("data-screen") if node is not None and screens else None
+    if target is not None and target not in screen_ids:
+      report.note(f"screens: button {node.text!r} targets unknown screen {target!r}")
+      return None
+    return screen_ids.get(target) if target is not None else None
+
+  if options.events not in ("per-widget", "delegated"):
+    raise ValueError(f"Unknown events mode: {options.events!r}")
+  delegated = options.events == "delegated"
+  has_nav = not delegated and any(
+    n.tag in BUTTON_TAGS and n.attrs.get("data-screen") in screen_ids
+    for page in pages if not page.matrix for n in page.nodes
+  )
+  matrix_pages = [page for page in pages if page.matrix]
+  matrix_nav: dict[int, dict[int, str]] = {}  # id(page) -> button index -> UI_SCREEN_*
+  for page in matrix_pages:
+    buttons = [n for n in page.nodes if n.tag in BUTTON_TAGS]
+    targets = {i: nav_target(n) for i, n in enumerate(buttons)}
+    matrix_nav[id(page)] = {i: t for i, t in targets.items() if t is not None}
+  pool = StringPool(options.string_pool)
+  def action(node: Node | None, text: str) -> tuple[str, str]:
+    target = nav_target(node)
+    if target is not None:
+      return "UI_ACT_SCREEN", target
+    return ("UI_ACT_NEXT_MESSAGE", "") if use_messages else ("UI_ACT_SHOW_TEXT", text)
+
+  def clickable(page: _Page) -> list[tuple[Node | None, str]]:
+    """(node, caption) of the buttons a page creates outside a button matrix."""
+    if page.matrix:
+      return []
+    if page.use_absolute or page.multi_buttons:
+      return [(n, n.text) for n in page.nodes if n.tag in BUTTON_TAGS]
+    return [(page.button, page.btn_text)]
+
+  def navigates(node: Node | None) -> bool:
+    return node is not None and node.attrs.get("data-screen") in screen_ids
+
+  # btn_event_cb is needed unless every button outside a matrix navigates (a screen of links).
+  shows_text = any(
+    not page.matrix and (not clickable(page) or not all(navigates(node) for node, _ in clickable(page))) for page in pages
+  )
+
+  table: WidgetTable | None = None
+  if options.codegen == "table":
+    table = WidgetTable(options.font_prefix, pool)
+    table.nav = has_nav
+    for page in pages:
+      for node in page.nodes:
+        if page.use_absolute and (node.tag in TEXT_TAGS or node.tag in BUTTON_TAGS or node.tag in IMAGE_TAGS):
+          table.collect(node)
+        elif not page.use_absolute and page.multi_buttons and not page.matrix and node.tag in BUTTON_TAGS:
+          table.string_id(node.text)
+          table.count += 1
+  elif options.codegen != "unrolled":
+    raise ValueError(f"Unknown codegen mode: {options.codegen!r}")
+  if table is not None and table.count:
+    shows_text = True  # ui_build_widgets references btn_event_cb
+  actions: ActionTable | None = None
+  if delegated:
+    # Without the pool only a non-empty widget table declares ui_strings[].
+    actions = ActionTable(pool, own_texts=not pool.enabled and (table is None or not table.count))
+    for page in pages:
+      for node, text in clickable(page):
+        actions.index(*action(node, text))
+    if table is not None:
+      table.actions = actions
+  if pool.enabled:
+    # Same order as the references below; the table's strings (if any) are already in.
+    texts = list(msgs) if use_messages and unit is None else []
+    if not use_messages and single is not None and single.multi_buttons and not single.matrix and table is None:
+      texts += single.button_texts
+    for page in pages:
+      if page.use_absolute:
+        texts += [n.text for n in page.nodes if n.tag in TEXT_TAGS or n.tag in BUTTON_TAGS] if table is None else []
+        texts += [] if page.has_text else [page.first_text]
+      else:
+        buttons = [] if page.matrix else page.button_texts if page.multi_buttons else [page.btn_text]
+        texts += [page.title, page.first_text] + buttons
+    for text in texts:
+      pool.intern(text)
+  styles: StyleTable | None = None
+  if any(page.use_absolute for page in pages) and options.intern_styles and table is None:
+    styles = StyleTable(options.font_prefix)
+    for page in pages:
+      for node in page.nodes if page.use_absolute else ():
+        if node.tag in BUTTON_TAGS:
+          styles.intern(_bg_props(node.resolved))
+        if node.tag in TEXT_TAGS or node.tag in BUTTON_TAGS:
+          styles.intern(_text_props(node.resolved))
+
+  perf = options.perf_hooks
+  if screens:
+    yield "#include <stdio.h>"
+  yield '#include "lvgl.h"'
+  if perf:
+    yield '#include "ui_perf.h"'
+  if images:
+    yield '#include "images/ui_images.h"'
+    if unit is None:
+      report.add("images", len({image_symbol(n) for n in images}))
+  yield ""
+  if not split:
+    yield "static lv_obj_t * display_label;"
+  else:
+    yield "extern lv_obj_t * display_label;" if unit is not None else "lv_obj_t * display_label;"
+  if pool.enabled and pool.ids:
+    yield from pool.decl_lines()
+    yield ""
+  if use_messages and unit is not None:
+    yield "void btn_event_cb(lv_event_t * e); /* ui_app.c: one message rotation for every screen */"
+  elif use_messages:
+    if pool.enabled:
+      yield f"static const {pool.idx_type} messages[] = {{{', '.join(str(pool.ids[m]) for m in msgs)}}};"
+      pool.refs += len(msgs)
+    else:
+      yield from _string_array_lines("messages", msgs)
+    yield "static int msg_idx = 0;"
+    yield ""
+    yield f"{'' if split else 'static '}void btn_event_cb(lv_event_t * e) {{"
+    if perf:
+      yield "  UI_PERF_SCOPE_BEGIN();"
+    yield "  msg_idx = (msg_idx + 1) % (sizeof(messages)/sizeof(messages[0]));"
+    message = "ui_strings[messages[msg_idx]]" if pool.enabled else "messages[msg_idx]"
+    yield f"  {pool.set_text}(display_label, {message});"
+    if perf:
+      yield "  UI_PERF_EVENT_END();"
+    yield "}"
+  elif shows_text and not delegated:
+    if single is not None and single.multi_buttons and not single.matrix and table is None and not pool.enabled:
+      yield from _string_array_lines("button_labels", single.button_texts)
+      yield ""
+    yield "static void btn_event_cb(lv_event_t * e) {"
+    if perf:
+      yield "  UI_PERF_SCOPE_BEGIN();"
+    yield "  const char * label = (const char *)lv_event_get_user_data(e);"
+    yield "  if (label) {"
+    yield f"    {pool.set_text}(display_label, label);"
+    yield "  }"
+    if perf:
+      yield "  UI_PERF_EVENT_END();"
+    yield "}"
+  if use_messages or (shows_text and not delegated):
+    yield ""
+  if matrix_pages:
+    for page in matrix_pages:
+      yield from _matrix_decl_lines(page, matrix_nav[id(page)])
+    yield "/* One handler for every button of a matrix; the selected index picks the action. */"
+    yield "static void ui_btnm_event_cb(lv_event_t * e) {"
+    yield "  lv_obj_t * btnm = lv_event_get_target(e);"
+    yield "  uint16_t id = lv_btnmatrix_get_selected_btn(btnm);"
+    yield "  if (id == LV_BTNMATRIX_BTN_NONE) return;"
+    if any(matrix_nav.values()):
+      yield "  const uint8_t * nav = (const uint8_t *)lv_event_get_user_data(e);"
+      yield "  if (nav && nav[id]) {"
+      yield "    ui_show_screen(nav[id] - 1);"
+      yield "    return;"
+      yield "  }"
+    if use_messages:
+      yield "  btn_event_cb(e);"
     else:
-      lines.append("  lv_obj_t * btn = lv_btn_create(scr);")
-      lines.append(f"  lv_obj_set_size(btn, LV_SIZE_CONTENT, LV_SIZE_CONTENT);")
-      lines.append(f"  lv_obj_set_style_pad_all(btn, 10, 0);")
-      lines.append(f"  lv_obj_t * btn_label = lv_label_create(btn);")
-      lines.append(f"  lv_label_set_text(btn_label, \"{btn_text}\");")
-      lines.append("  lv_obj_center(btn_label);")
-      if use_messages:
-        lines.append("  lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, NULL);")
+      if perf:
+        yield "  UI_PERF_SCOPE_BEGIN();"
+      yield f"  {pool.set_text}(display_label, lv_btnmatrix_get_btn_text(btnm, id));"
+      if perf:
+        yield "  UI_PERF_EVENT_END();"
+    yield "}"
+    yield ""
+    for page, name in zip(pages, names):
+      if page.matrix:
+        objects, before, objects_after, after = _matrix_cost(page, pool)
+        report.add("btnmatrix_buttons", len(page.button_texts))
+        report.add("objects_saved", objects - objects_after)
+        report.add("heap_bytes_saved", before - after)
+        report.note(
+          f"btnmatrix: {name}: {len(page.button_texts)} buttons in one lv_btnmatrix: {objects} -> {objects_after} "
+          f"LVGL objects, ~{before / 1024:.1f} KiB -> ~{after / 1024:.1f} KiB heap (estimated, 32-bit LVGL v8.3)"
+        )
+  if has_nav:
+    yield "static void ui_nav_event_cb(lv_event_t * e) {"
+    yield "  ui_show_screen((int)(uintptr_t)lv_event_get_user_data(e));"
+    yield "}"
+    yield ""
+  if styles is not None and styles.ids:
+    yield from styles.decl_lines()
+    yield ""
+    report.add("shared_styles", len(styles.ids))
+    report.add("local_style_props_removed", styles.uses)
+    report.note(f"styles: {len(styles.ids)} shared lv_style_t replace {styles.uses} local style properties")
+  if table is not None:
+    if table.count:  # a matrix-only UI has no descriptors
+      yield from table.decl_lines()
+      event = "UI_EV_NEXT_MESSAGE" if use_messages else "UI_EV_SHOW_TEXT"
+      for page in pages:
+        descs = []
+        display_pending = True
+        for node in page.nodes:
+          if page.use_absolute and node.tag in IMAGE_TAGS:
+            descs.append(table.desc_line(node, "UI_EV_NONE", False))
+          elif page.use_absolute and (node.tag in TEXT_TAGS or node.tag in BUTTON_TAGS):
+            is_text = node.tag in TEXT_TAGS
+            descs.append(table.desc_line(
+              node, "UI_EV_NONE" if is_text else event, is_text and display_pending, screen=nav_target(node),
+            ))
+            display_pending = display_pending and not is_text
+          elif not page.use_absolute and page.multi_buttons and not page.matrix and node.tag in BUTTON_TAGS:
+            pos = None
+            size = (f"LV_PCT({page.btn_w_pct})", f"LV_PCT({page.btn_h_pct})")
+            if page.layout is not None:
+              cell = page.layout.cells[len(descs)]
+              pos, size = (cell.x, cell.y), (str(cell.w), str(cell.h))
+            descs.append(table.desc_line(node, event, False, size, styled=False, screen=nav_target(node), pos=pos))
+        if not descs:
+          continue
+        yield f"static const ui_widget_desc_t {page.widgets}[] = {{"
+        yield from descs
+        yield "};"
+        yield ""
+      yield from table.builder_lines()
+    if pages:
+      table.report_to(report)
+
+  if actions is not None and actions.ids:
+    yield from actions.decl_lines(perf)
+
+  def event_lines(var: str, node: Node | None, text: str, array_idx: int | None = None, indent: str = "  ") -> Iterator[str]:
+    if actions is not None:
+      yield from actions.user_data_lines(var, *action(node, text), indent=indent)
+      return
+    target = nav_target(node)
+    if target is not None:
+      yield f"{indent}lv_obj_add_event_cb({var}, ui_nav_event_cb, LV_EVENT_CLICKED, (void *)(uintptr_t){target});"
+    elif use_messages:
+      yield f"{indent}lv_obj_add_event_cb({var}, btn_event_cb, LV_EVENT_CLICKED, NULL);"
+    else:
+      label_ref = f"button_labels[{array_idx}]" if array_idx is not None else pool.ref(text)
+      yield f"{indent}lv_obj_add_event_cb({var}, btn_event_cb, LV_EVENT_CLICKED, (void *){label_ref});"
+
+  def body(page: _Page) -> Iterator[str]:
+    widgets = page.widgets
+    if page.use_absolute and table is not None:
+      yield f"  ui_build_widgets(scr, {widgets}, sizeof({widgets}) / sizeof({widgets}[0]));"
+      if not page.has_text:
+        yield "  display_label = lv_label_create(scr);"
+        yield pool.label_line("display_label", page.first_text)
+        yield "  lv_obj_set_pos(display_label, 0, 0);"
+    elif page.use_absolute:
+      created_label = False
+      button_idx = 0
+      for idx, node in enumerate(page.nodes):
+        box = node.resolved
+        if node.tag in TEXT_TAGS:
+          var = f"label_{idx}"
+          yield f"  lv_obj_t * {var} = lv_label_create(scr);"
+          yield pool.label_line(var, node.text)
+          if not created_label:
+            yield f"  display_label = {var};"
+            created_label = True
+          yield from _style_lines(var, _text_props(box), styles, options.font_prefix)
+          yield from _geometry_lines(var, box)
+        elif node.tag in BUTTON_TAGS:
+          var = f"btn_{idx}"
+          yield f"  lv_obj_t * {var} = lv_btn_create(scr);"
+          yield from _geometry_lines(var, box)
+          yield from _style_lines(var, _bg_props(box), styles)
+          label_var = f"btn_label_{idx}"
+          yield f"  lv_obj_t * {label_var} = lv_label_create({var});"
+          yield pool.label_line(label_var, node.text)
+          yield f"  lv_obj_center({label_var});"
+          yield from _style_lines(label_var, _text_props(box), styles, options.font_prefix)
+          unpooled_array = page is single and page.multi_buttons and not pool.enabled
+          yield from event_lines(var, node, node.text, button_idx if unpooled_array else None)
+          if page.multi_buttons:
+            button_idx += 1
+        elif node.tag in IMAGE_TAGS:
+          var = f"img_{idx}"
+          yield f"  lv_obj_t * {var} = lv_img_create(scr);"
+          yield f"  lv_img_set_src({var}, &{image_symbol(node)});"
+          yield from _geometry_lines(var, box)
+      if not page.has_text:
+        yield "  display_label = lv_label_create(scr);"
+        yield pool.label_line("display_label", page.first_text)
+        yield "  lv_obj_set_pos(display_label, 0, 0);"
+    else:
+      layout = page.layout
+      if layout is None:
+        yield "  lv_obj_set_flex_flow(scr, LV_FLEX_FLOW_COLUMN);"
+        yield "  lv_obj_set_flex_align(scr, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_CENTER);"
+      yield f"  lv_obj_set_style_pad_all(scr, {SCREEN_PAD}, 0);"
+      yield ""
+      yield "  lv_obj_t * title = lv_label_create(scr);"
+      yield pool.label_line("title", page.title)
+      yield "  lv_obj_set_style_text_color(title, lv_color_hex(0x8ab4ff), 0);"
+      if layout is not None:
+        yield from _static_label_lines("title", layout.title, layout)
+      yield ""
+      yield "  display_label = lv_label_create(scr);"
+      yield pool.label_line("display_label", page.first_text)
+      yield "  lv_obj_set_style_text_font(display_label, LV_FONT_DEFAULT, 0);"
+      yield "  lv_obj_set_style_pad_bottom(display_label, 12, 0);"
+      if layout is not None:
+        yield from _static_label_lines("display_label", layout.display, layout)
+      yield ""
+      for idx, node in enumerate(page.images):
+        var = f"img_{idx}"
+        yield f"  lv_obj_t * {var} = lv_img_create(scr);"
+        yield f"  lv_img_set_src({var}, &{image_symbol(node)});"
+        yield from _geometry_lines(var, node.resolved)
+        if layout is not None:
+          yield f"  lv_obj_set_pos({var}, {layout.images[idx].x}, {layout.images[idx].y});"
+      if page.images:
+        yield ""
+      if page.matrix:
+        yield from _matrix_lines(page, matrix_nav[id(page)], layout)
+      elif page.multi_buttons:
+        yield "  lv_obj_t * grid = lv_obj_create(scr);"
+        yield "  lv_obj_remove_style_all(grid);"
+        if layout is not None:
+          yield f"  lv_obj_set_pos(grid, {layout.grid.x}, {layout.grid.y});"
+          yield f"  lv_obj_set_size(grid, {layout.grid.w}, {layout.grid.h});"
+        else:
+          yield "  lv_obj_set_size(grid, lv_pct(100), lv_pct(100));"
+        yield "  lv_obj_set_style_bg_opa(grid, LV_OPA_TRANSP, 0);"
+        yield "  lv_obj_set_style_pad_all(grid, 4, 0);"
+        yield "  lv_obj_set_style_pad_row(grid, 4, 0);"
+        yield "  lv_obj_set_style_pad_column(grid, 4, 0);"
+        if actions is not None:
+          yield "  lv_obj_add_flag(grid, LV_OBJ_FLAG_EVENT_BUBBLE);"
+        if layout is None:
+          yield "  lv_obj_set_flex_flow(grid, LV_FLEX_FLOW_ROW_WRAP);"
+          yield "  lv_obj_set_flex_align(grid, LV_FLEX_ALIGN_CENTER, LV_FLEX_ALIGN_START, LV_FLEX_ALIGN_START);"
+          yield "  lv_obj_set_flex_grow(grid, 1);"
+        if table is not None:
+          yield f"  ui_build_widgets(grid, {widgets}, sizeof({widgets}) / sizeof({widgets}[0]));"
+        buttons = [n for n in page.nodes if n.tag in BUTTON_TAGS] if table is None else []
+        for idx, node in enumerate(buttons):
+          yield "  {"
+          yield "    lv_obj_t * btn = lv_btn_create(grid);"
+          if layout is not None:
+            cell = layout.cells[idx]
+            yield f"    lv_obj_set_pos(btn, {cell.x}, {cell.y});"
+            yield f"    lv_obj_set_size(btn, {cell.w}, {cell.h});"
+          else:
+            yield f"    lv_obj_set_size(btn, lv_pct({page.btn_w_pct}), lv_pct({page.btn_h_pct}));"
+          yield "    lv_obj_t * btn_label = lv_label_create(btn);"
+          yield pool.label_line("btn_label", node.text, "    ")
+          yield "    lv_obj_center(btn_label);"
+          unpooled_array = page is single and not pool.enabled
+          yield from event_lines("btn", node, node.text, idx if unpooled_array else None, "    ")
+          yield "  }"
       else:
-        lines.append(f"  lv_obj_add_event_cb(btn, btn_event_cb, LV_EVENT_CLICKED, (void *)\"{btn_text}\");")
-  lines.append("}")
-  return "\n".join(lines)
+        yield "  lv_obj_t * btn = lv_btn_create(scr);"
+        if layout is not None:
+          yield f"  lv_obj_set_pos(btn, {layout.button.x}, {layout.button.y});"
+          yield f"  lv_obj_set_size(btn, {layout.button.w}, {layout.button.h});"
+        else:
+          yield "  lv_obj_set_size(btn, LV_SIZE_CONTENT, LV_SIZE_CONTENT);"
+        yield "  lv_obj_set_style_pad_all(btn, 10, 0);"
+        yield "  lv_obj_t * btn_label = lv_label_create(btn);"
+        yield pool.label_line("btn_label", page.btn_text)
+        yield "  lv_obj_center(btn_label);"
+        yield from event_lines("btn", page.button, page.btn_text)
+      if layout is not None:
+        yield "#if UI_LAYOUT_CHECK"
+        grid = "btnm" if page.matrix else "grid" if page.multi_buttons else "NULL"
+        yield f"  ui_layout_check(scr, {grid}, {page.btn_w_pct}, {page.btn_h_pct});"
+        yield "#endif"
+    if actions is not None and clickable(page):
+      yield "  lv_obj_add_event_cb(scr, ui_event_dispatch, LV_EVENT_CLICKED, NULL);"
+
+  init_styles = (styles is not None and styles.ids) or (table is not None and table.styles.ids)
+  if any(page.layout is not None for page in pages):
+    yield from _layout_check_lines()
+    yield ""
+  if split and unit is not None:
+    yield f"void ui_screen_{screens[unit].symbol.lower()}_build(lv_obj_t * scr) {{"
+    if init_styles:
+      # The styles are this file's own; rebuilding an evicted screen must not re-init them.
+      yield "  static bool styles_ready;"
+      yield "  if (!styles_ready) {"
+      yield "    ui_styles_init();"
+      yield "    styles_ready = true;"
+      yield "  }"
+    yield from body(pages[0])
+    yield "}"
+    if actions is not None:
+      actions.report_to(report, sum(1 for page in pages if clickable(page)))
+    pool.report_to(report, [])
+    return
+  if split:
+    for screen in screens:
+      yield f"void ui_screen_{screen.symbol.lower()}_build(lv_obj_t * scr); /* screens/ui_screen_{screen.symbol.lower()}.c */"
+    yield ""
+  elif screens:
+    for screen, page in zip(screens, pages):
+      yield f"static void ui_screen_{screen.symbol.lower()}_build(lv_obj_t * scr) {{"
+      yield from body(page)
+      yield "}"
+      yield ""
+  if screens:
+    yield from _screen_runtime_lines(screens, options)
+  yield "void ui_build(void) {"
+  if perf:
+    yield "  UI_PERF_SCOPE_BEGIN();"
+  if init_styles and not split:
+    yield "  ui_styles_init();"
+  if images:
+    yield "  ui_images_init();"
+  if screens:
+    yield "  ui_show_screen(0);"
+  else:
+    yield from _root_lines()
+    yield from body(pages[0])
+  if perf:
+    yield "  UI_PERF_BUILD_END();"
+  yield "}"
+  if screens:
+    built = sum(1 for n in screens[0].nodes if n.tag in TEXT_TAGS or n.tag in BUTTON_TAGS or n.tag in IMAGE_TAGS)
+    report.add("screens", len(screens))
+    report.note(
+      f"screens: {len(screens)} ({', '.join(s.name for s in screens)}); boot builds only {screens[0].name!r} "
+      f"({built} widgets), the rest on first navigation; UI_SCREEN_CACHE={options.screen_cache}"
+    )
+  if actions is not None:
+    actions.report_to(report, sum(1 for page in pages if clickable(page)))
+  pool.report_to(report, msgs if use_messages else [])
@@ -0,0 +1,162 @@
+"""File watchers for `main.py --watch`.
+
+InotifyWatcher uses the Linux inotify API through ctypes (no extra dependencies);
+PollingWatcher compares stat snapshots and works everywhere. Both expose
+`wait(timeout)` returning the set of changed paths, and `wait_debounced()` which
+keeps collecting events until the tree has been quiet for the debounce window.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import platform
+import select
+import struct
+import time
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+  IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+  | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+# inotify_add_watch errors for a directory removed or renamed before its watch was added.
+_VANISHED = (errno.ENOENT, errno.ENOTDIR)
+
+
+class BaseWatcher:
+  def wait(self, timeout: float | None) -> set[Path]:
+    raise NotImplementedError
+
+  def wait_debounced(self, debounce: float) -> set[Path]:
+    """Block until something changes, then absorb follow-up events until quiet for `debounce` seconds."""
+    changed = self.wait(None)
+    while True:
+      more = self.wait(debounce)
+      if not more:
+        return changed
+      changed |= more
+
+  def close(self) -> None:
+    pass
+
+
+class InotifyWatcher(BaseWatcher):
+  def __init__(self, root: Path) -> None:
+    self.root = Path(root)
+    libc_name = ctypes.util.find_library("c") or "libc.so.6"
+    self._libc = ctypes.CDLL(libc_name, use_errno=True)
+    self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if self._fd < 0:
+      raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    self._dirs: dict[int, Path] = {}
+    if not self._add_tree(self.root):
+      raise FileNotFoundError(errno.ENOENT, "cannot watch a missing directory", str(self.root))
+
+  def _add_watch(self, path: Path) -> bool:
+    """False if `path` is already gone; any other failure raises."""
+    wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(path)), WATCH_MASK)
+    if wd < 0:
+      err = ctypes.get_errno()
+      if err in _VANISHED:
+        return False
+      raise OSError(err, f"inotify_add_watch failed for {path}")
+    self._dirs[wd] = path
+    return True
+
+  def _add_tree(self, root: Path) -> bool:
+    if not self._add_watch(root):
+      return False
+    for dirpath, dirnames, _ in os.walk(root):
+      for name in dirnames:
+        self._add_watch(Path(dirpath) / name)
+    return True
+
+  def wait(self, timeout: float | None) -> set[Path]:
+    ready, _, _ = select.select([self._fd], [], [], timeout)
+    if not ready:
+      return set()
+    changed: set[Path] = set()
+    while True:
+      try:
+        data = os.read(self._fd, 64 * 1024)
+      except BlockingIOError:
+        break
+      if not data:
+        break
+      offset = 0
+      while offset < len(data):
+        wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        name = data[offset:offset + length].split(b"\0", 1)[0]
+        offset += length
+        base = self._dirs.get(wd)
+        if base is None:
+          continue
+        if mask & IN_IGNORED:
+          self._dirs.pop(wd, None)
+          continue
+        path = base / os.fsdecode(name) if name else base
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+          self._add_tree(path)  # may already be gone again; it is still reported
+        changed.add(path)
+    return changed
+
+  def close(self) -> None:
+    if self._fd >= 0:
+      os.close(self._fd)
+      self._fd = -1
+
+
+class PollingWatcher(BaseWatcher):
+  def __init__(self, root: Path, interval: float = 0.2) -> None:
+    self.root = Path(root)
+    self.interval = interval
+    self._snapshot = self._scan()
+
+  def _scan(self) -> dict[Path, tuple[int, int]]:
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for dirpath, _, filenames in os.walk(self.root):
+      for name in filenames:
+        path = Path(dirpath) / name
+        try:
+          st = path.stat()
+        except OSError:
+          continue
+        snapshot[path] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+  def wait(self, timeout: float | None) -> set[Path]:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+      current = self._scan()
+      changed = {p for p in current.keys() | self._snapshot.keys() if current.get(p) != self._snapshot.get(p)}
+      self._snapshot = current
+      if changed:
+        return changed
+      if deadline is not None and time.monotonic() >= deadline:
+        return set()
+      time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+
+def make_watcher(root: Path, force_polling: bool = False) -> BaseWatcher:
+  """Prefer inotify on Linux, falling back to polling when it is unavailable."""
+  if not force_polling and platform.system().lower() == "linux":
+    try:
+      return InotifyWatcher(root)
+    except (OSError, AttributeError) as exc:
+      print(f"[watch] inotify unavailable ({exc}); falling back to polling")
+  return PollingWatcher(root)